@@ -1,4 +1,7 @@
 # app/__init__.py - application factory
+import os
+import sys
+
 from flask import Flask
 from flask_migrate import Migrate
 from sqlalchemy import create_engine, text
@@ -9,6 +12,8 @@ from dotenv import load_dotenv
 from app.config import Config
 from app.extensions import db, login_manager
 
+MIGRATIONS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "migrations"))
+
 
 def _ensure_database(uri: str) -> None:
     """For MySQL: create the database if it doesn't exist to avoid connection errors."""
@@ -34,50 +39,123 @@ def _ensure_database(uri: str) -> None:
         engine.dispose()
 
 
-def create_app(config_override=None) -> Flask:
-    load_dotenv()
-    app = Flask(__name__, template_folder="../templates", static_folder="../static")
-    app.config.from_object(Config)
-    if config_override:
-        app.config.update(config_override)
-
-    from app.logging_config import configure_logging
-    from app.errors import register_error_handlers
-
-    configure_logging(app)
-
-    # Ensure DB exists (for MySQL) before binding SQLAlchemy.
-    _ensure_database(app.config["SQLALCHEMY_DATABASE_URI"])
-
-    db.init_app(app)
-    login_manager.init_app(app)
-    Migrate(app, db)
+def _schema_cli_invoked(argv=None) -> bool:
+    """True when this process runs `flask schema ...`.
 
-    # Import models so metadata is registered before create_all.
-    from app import models  # noqa: F401
+    Those commands decide how to create, stamp or migrate the database, so
+    boot must not create the database or tables before they run.
+    """
+    argv = sys.argv if argv is None else argv
+    if not argv or not (os.path.basename(argv[0]) == "flask" or argv[0].endswith(os.path.join("flask", "__main__.py"))):
+        return False
+    args = iter(argv[1:])
+    for arg in args:
+        if arg in {"-A", "--app", "-e", "--env-file"}:
+            next(args, None)
+        elif not arg.startswith("-"):
+            return arg == "schema"
+    return False
 
-    # Auto-create tables on startup to prevent "table does not exist" errors in dev.
-    with app.app_context():
-        try:
-            db.create_all()
-        except OperationalError as exc:
-            # Surface a clear error rather than failing lazily later.
-            raise RuntimeError(f"Database connection failed: {exc}") from exc
 
-    from app.models import User  # noqa: F401
-    from app.auth.routes import auth_bp
-    from app.main.routes import main_bp
-    from app.customer.routes import customer_bp
-    from app.restaurant.routes import restaurant_bp
-    from app.admin.routes import admin_bp
+def create_app(config_override=None) -> Flask:
+    from app.boot import BootTimer
+
+    timer = BootTimer()
+    with timer.phase("config"):
+        load_dotenv()
+        app = Flask(__name__, template_folder="../templates", static_folder="../static")
+        app.config.from_object(Config)
+        if config_override:
+            app.config.update(config_override)
+    app.extensions["boot_timer"] = timer
+    fast_boot = app.config.get("FAST_BOOT", False)
+    schema_cli = _schema_cli_invoked()
 
-    app.register_blueprint(main_bp)
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(customer_bp)
-    app.register_blueprint(restaurant_bp)
-    app.register_blueprint(admin_bp)
+    from app.logging_config import configure_logging
+    from app.errors import register_error_handlers
 
-    register_error_handlers(app)
+    with timer.phase("logging"):
+        configure_logging(app)
+
+    # Ensure DB exists (for MySQL) before binding SQLAlchemy. Fast boot leaves
+    # this to `flask schema upgrade`.
+    if not fast_boot and not schema_cli:
+        with timer.phase("ensure_database"):
+            _ensure_database(app.config["SQLALCHEMY_DATABASE_URI"])
+
+    with timer.phase("init_db"):
+        from app.db_pool import engine_options
+        from app.db_routing import init_db_routing
+
+        init_db_routing(app)
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
+        db.init_app(app)
+        login_manager.init_app(app)
+        from app.schema_state import include_object
+
+        Migrate(app, db, directory=MIGRATIONS_DIR, include_object=include_object)
+
+        from app.cart_store import init_cart_store
+
+        init_cart_store(app)
+
+    with timer.phase("models"):
+        # Import models so metadata is registered before create_all.
+        from app import models  # noqa: F401
+        from app import restaurant_stats  # noqa: F401  (registers the stats flush hook)
+        from app import menu_cache  # noqa: F401  (registers menu invalidation hooks)
+        from app import coupon_index  # noqa: F401  (registers coupon invalidation hooks)
+        from app import identity  # noqa: F401  (registers principal invalidation hooks)
+        from app import owner_context  # noqa: F401  (registers branch scope invalidation hooks)
+        from app import search_index  # noqa: F401  (registers search document maintenance and FTS DDL)
+        from app import delivery_areas  # noqa: F401  (registers branch coverage maintenance)
+        from app import branch_locator  # noqa: F401  (registers branch location invalidation hooks)
+
+    if schema_cli:
+        # `flask schema upgrade` inspects the database as it is before touching it.
+        pass
+    elif fast_boot:
+        from app.schema_state import init_schema_check
+
+        with timer.phase("schema_check"), app.app_context():
+            init_schema_check(app, db.engine, db.metadata)
+    else:
+        # Auto-create tables on startup to prevent "table does not exist" errors in dev.
+        with timer.phase("create_all"), app.app_context():
+            try:
+                db.create_all()
+            except OperationalError as exc:
+                # Surface a clear error rather than failing lazily later.
+                raise RuntimeError(f"Database connection failed: {exc}") from exc
+
+    with timer.phase("blueprints"):
+        from app.models import User  # noqa: F401
+        from app.auth.routes import auth_bp
+        from app.main.routes import main_bp
+        from app.customer.routes import customer_bp
+        from app.restaurant.routes import restaurant_bp
+        from app.admin.routes import admin_bp
+
+        app.register_blueprint(main_bp)
+        app.register_blueprint(auth_bp)
+        app.register_blueprint(customer_bp)
+        app.register_blueprint(restaurant_bp)
+        app.register_blueprint(admin_bp)
+
+    with timer.phase("hooks"):
+        register_error_handlers(app)
+
+        from app.sql_profiler import init_sql_profiler
+
+        init_sql_profiler(app)
+
+        from app.metrics import init_metrics
+
+        init_metrics(app)
+
+        from app.commands import register_commands
+
+        register_commands(app)
 
     def add_alias(alias: str, target: str):
         view = app.view_functions.get(target)
@@ -117,7 +195,10 @@ def create_app(config_override=None) -> Flask:
         "admin_restaurants": "admin.admin_restaurants",
         "admin_products": "admin.admin_products",
     }
-    for alias, target in aliases.items():
-        add_alias(alias, target)
+    with timer.phase("aliases"):
+        for alias, target in aliases.items():
+            add_alias(alias, target)
 
+    timer.stop()
+    app.logger.info("boot %s fast_boot=%s", timer.summary(), fast_boot)
     return app
@@ -1,8 +1,8 @@
 # app/admin/routes.py - admin panel routes
-from flask import render_template, request, redirect, url_for, flash, abort
+from flask import render_template, request, redirect, url_for, flash, abort, jsonify
 from flask_login import login_user, current_user
 from werkzeug.security import check_password_hash
-from sqlalchemy import or_
+from sqlalchemy import false
 
 from app.admin import admin_bp
 from app.extensions import db
@@ -10,15 +10,27 @@ from app.models import (
     User,
     UserRole,
     Restaurant,
-    RestaurantBranch,
     Product,
     ProductCategory,
     Order,
     OrderStatusHistory,
     ProductPriceHistory,
 )
-from app.order_status import can_transition, status_choices, is_valid_status
-from app.pagination import paginate
+from app.order_status import (
+    STATUS_ORDER,
+    TRANSITION_MESSAGES,
+    TransitionResult,
+    is_valid_status,
+    status_choices,
+    transition_order,
+    transition_orders,
+)
+from app.db_pool import pool_status
+from app.bulk_status import handle_bulk_status
+from app.db_routing import replica_read
+from app.loading import order_detail_options, order_list_options
+from app.pagination import paginate_keyset
+from app.search_index import order_search_filter
 
 
 def admin_required():
@@ -57,6 +69,7 @@ def dashboard():
 
 
 @admin_bp.route("/admin/restaurants", endpoint="admin_restaurants")
+@replica_read
 def restaurants():
     gate = admin_required()
     if gate:
@@ -77,34 +90,34 @@ def restaurant_toggle(restaurant_id):
     return redirect(url_for("admin.admin_restaurants"))
 
 
+@admin_bp.route("/admin/diagnostics/pool", endpoint="admin_pool_diagnostics")
+def pool_diagnostics():
+    gate = admin_required()
+    if gate:
+        return gate
+    return jsonify(pool_status(db.engine))
+
+
 @admin_bp.route("/admin/orders", endpoint="admin_orders")
+@replica_read
 def orders():
     gate = admin_required()
     if gate:
         return gate
     status_filter = request.args.get("status")
     search_query = (request.args.get("q") or "").strip()
-    query = Order.query
+    query = Order.query.options(*order_list_options("admin"))
     if status_filter and is_valid_status(status_filter):
         query = query.filter(Order.status == status_filter)
     else:
         status_filter = ""
     if search_query:
-        if search_query.isdigit():
-            query = query.filter(Order.id == int(search_query))
-        else:
-            query = (
-                query.join(User, Order.user_id == User.id)
-                .join(RestaurantBranch, Order.branch_id == RestaurantBranch.id)
-                .join(Restaurant, RestaurantBranch.restaurant_id == Restaurant.id)
-                .filter(or_(User.name.ilike(f"%{search_query}%"), Restaurant.name.ilike(f"%{search_query}%")))
-            )
-    page = request.args.get("page", 1, type=int)
-    per_page = 12
-    orders_list, page, pages, total = paginate(query.order_by(Order.id.desc()), page, per_page)
-    for order in orders_list:
+        condition = order_search_filter(search_query, db.engine.dialect.name)
+        query = query.filter(condition if condition is not None else false())
+    pager = paginate_keyset(query, Order.id, request.args.get("cursor"), per_page=12, with_total=True)
+    for order in pager.items:
         order.status_options = status_choices(order.status)
-    return render_template("admin/orders.html", orders=orders_list, status_filter=status_filter, search_query=search_query, page=page, pages=pages)
+    return render_template("admin/orders.html", orders=pager.items, status_filter=status_filter, search_query=search_query, pager=pager, bulk_statuses=STATUS_ORDER)
 
 
 @admin_bp.route("/admin/orders/<int:order_id>", endpoint="admin_order_detail")
@@ -112,7 +125,7 @@ def order_detail(order_id):
     gate = admin_required()
     if gate:
         return gate
-    order = Order.query.get_or_404(order_id)
+    order = Order.query.options(*order_detail_options()).filter(Order.id == order_id).first_or_404()
     status_history = (
         OrderStatusHistory.query.filter_by(order_id=order.id)
         .order_by(OrderStatusHistory.changed_at.desc())
@@ -127,27 +140,25 @@ def order_status_update(order_id):
     if gate:
         return gate
     order = Order.query.get_or_404(order_id)
-    new_status = request.form.get("status", order.status)
-    old_status = order.status
-    if not is_valid_status(new_status):
-        flash("Invalid status.", "danger")
-    elif not can_transition(old_status, new_status):
-        flash("Invalid status transition.", "danger")
-    elif new_status != old_status:
-        order.status = new_status
-        db.session.add(
-            OrderStatusHistory(
-                order_id=order.id,
-                old_status=old_status,
-                new_status=new_status,
-                changed_by_user_id=current_user.id,
-            )
-        )
+    expected = request.form.get("current_status") or order.status
+    result = transition_order(order.id, expected, request.form.get("status", expected), current_user.id)
+    if result == TransitionResult.UPDATED:
         db.session.commit()
-        flash("Order status updated.", "success")
+    if result in TRANSITION_MESSAGES:
+        flash(*TRANSITION_MESSAGES[result])
     return redirect(url_for("admin.admin_orders"))
 
 
+@admin_bp.route("/admin/orders/bulk-status", methods=["POST"])
+def order_status_bulk():
+    gate = admin_required()
+    if gate:
+        return gate
+    return handle_bulk_status(
+        lambda order_ids, new_status: transition_orders(order_ids, new_status, current_user.id), "admin.admin_orders"
+    )
+
+
 def _load_restaurant_context(selected_restaurant_id):
     restaurants = Restaurant.query.order_by(Restaurant.name).all()
     categories = []
@@ -157,6 +168,7 @@ def _load_restaurant_context(selected_restaurant_id):
 
 
 @admin_bp.route("/admin/products", endpoint="admin_products")
+@replica_read
 def products():
     gate = admin_required()
     if gate:
@@ -4,6 +4,7 @@ from flask_login import login_user, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from app.auth import auth_bp
+from app.cuisines import assign_default_cuisine
 from app.extensions import db
 from app.models import User, UserRole, Restaurant
 
@@ -126,15 +127,15 @@ def restaurant_register():
             )
             db.session.add(user)
             db.session.flush()
-            db.session.add(
-                Restaurant(
-                    owner_id=user.id,
-                    name=restaurant_name,
-                    phone=phone,
-                    tax_number=tax_number or None,
-                    is_active=True,
-                )
+            restaurant = Restaurant(
+                owner_id=user.id,
+                name=restaurant_name,
+                phone=phone,
+                tax_number=tax_number or None,
+                is_active=True,
             )
+            db.session.add(restaurant)
+            assign_default_cuisine(db.session, restaurant)
             db.session.commit()
             login_user(user)
             flash("Kayıt başarılı, giriş yapıldı.", "success")
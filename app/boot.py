@@ -0,0 +1,31 @@
+# app/boot.py - wall-clock breakdown of create_app phases
+import time
+from contextlib import contextmanager
+
+
+class BootTimer:
+    """Collects named phase durations; create_app logs summary() once it is done."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.elapsed = None
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def stop(self) -> float:
+        self.elapsed = time.perf_counter() - self.started
+        return self.elapsed
+
+    def total(self) -> float:
+        return self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+
+    def summary(self) -> str:
+        parts = [f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.phases.items()]
+        return f"total={self.total() * 1000:.1f}ms " + " ".join(parts)
@@ -0,0 +1,138 @@
+# app/branch_locator.py - in-process k-d tree over active branch locations for nearest-branch routing
+import math
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.db_routing import primary_read
+from app.extensions import db
+from app.models import Neighborhood, RestaurantBranch
+from app.session_changes import on_commit, record_change
+
+DEFAULT_TTL = 300
+EARTH_RADIUS_KM = 6371.0
+
+
+def distance_km(a, b) -> float:
+    """Great-circle distance between two (latitude, longitude) points."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+class KdTree:
+    """Static 2-d tree over (latitude, longitude, key) points.
+
+    Points are projected onto a plane around their mean latitude, which is
+    accurate enough for picking the closest branch within a city.
+    """
+
+    def __init__(self, points):
+        points = list(points)
+        self.size = len(points)
+        mean_lat = sum(p[0] for p in points) / len(points) if points else 0.0
+        self._scale = math.cos(math.radians(mean_lat))
+        self._root = self._build([(self._project(lat, lon), key) for lat, lon, key in points], 0)
+
+    def _project(self, lat, lon):
+        return (math.radians(lon) * self._scale * EARTH_RADIUS_KM, math.radians(lat) * EARTH_RADIUS_KM)
+
+    def _build(self, items, depth):
+        if not items:
+            return None
+        axis = depth % 2
+        items.sort(key=lambda item: item[0][axis])
+        mid = len(items) // 2
+        return (items[mid], axis, self._build(items[:mid], depth + 1), self._build(items[mid + 1:], depth + 1))
+
+    def nearest(self, lat, lon, accept=None):
+        """Key of the closest point whose key passes accept, or None."""
+        target = self._project(lat, lon)
+        best = [None, math.inf]
+
+        def visit(node):
+            if node is None:
+                return
+            (point, key), axis, left, right = node
+            d2 = (point[0] - target[0]) ** 2 + (point[1] - target[1]) ** 2
+            if d2 < best[1] and (accept is None or accept(key)):
+                best[0], best[1] = key, d2
+            gap = target[axis] - point[axis]
+            near, far = (left, right) if gap < 0 else (right, left)
+            visit(near)
+            if gap * gap < best[1]:
+                visit(far)
+
+        visit(self._root)
+        return best[0]
+
+
+class BranchLocator:
+    """One k-d tree per restaurant over its active branches that have coordinates.
+
+    Branches are placed at their neighborhood's coordinates. The trees are
+    rebuilt lazily after a commit touches branches or neighborhoods, and after
+    BRANCH_LOCATOR_TTL so other workers' writes show up too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._trees = {}
+        self._expires_at = 0.0
+        self.stats = {"lookups": 0, "refreshes": 0}
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._expires_at = 0.0
+
+    @primary_read
+    def _refresh_if_stale(self) -> None:
+        if time.monotonic() < self._expires_at:
+            return
+        with self._lock:
+            if time.monotonic() < self._expires_at:
+                return
+            rows = db.session.execute(
+                select(RestaurantBranch.restaurant_id, Neighborhood.latitude, Neighborhood.longitude, RestaurantBranch.id)
+                .join(Neighborhood, Neighborhood.id == RestaurantBranch.neighborhood_id)
+                .where(
+                    RestaurantBranch.is_active == True,  # noqa: E712
+                    Neighborhood.latitude.is_not(None),
+                    Neighborhood.longitude.is_not(None),
+                )
+            )
+            points = {}
+            for restaurant_id, lat, lon, branch_id in rows:
+                points.setdefault(restaurant_id, []).append((float(lat), float(lon), branch_id))
+            ttl = current_app.config.get("BRANCH_LOCATOR_TTL", DEFAULT_TTL) if has_app_context() else DEFAULT_TTL
+            self._trees = {restaurant_id: KdTree(p) for restaurant_id, p in points.items()}
+            self._expires_at = time.monotonic() + ttl
+            self.stats["refreshes"] += 1
+
+    def nearest(self, restaurant_id: int, point, eligible=None):
+        """Id of the restaurant's active branch closest to point, limited to eligible ids when given."""
+        self._refresh_if_stale()
+        self.stats["lookups"] += 1
+        tree = self._trees.get(restaurant_id)
+        if tree is None or point is None:
+            return None
+        return tree.nearest(*point, accept=None if eligible is None else eligible.__contains__)
+
+
+branch_locator = BranchLocator()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_branch_changes(session, _flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (RestaurantBranch, Neighborhood)):
+            record_change(session, "branch_locations_changed")
+            return
+
+
+@on_commit("branch_locations_changed")
+def _invalidate_after_commit(_changes):
+    branch_locator.invalidate()
@@ -0,0 +1,74 @@
+# app/bulk_status.py - request parsing and responses shared by the admin and owner bulk-status views
+from flask import abort, current_app, flash, jsonify, redirect, request, url_for
+
+from app.extensions import db
+from app.order_status import TransitionResult
+
+DEFAULT_MAX_ORDERS = 100
+
+
+def parse_order_ids(raw_ids):
+    """Turn posted order ids into distinct ints, dropping anything that isn't a positive integer.
+
+    Only a list or tuple is accepted; a bare string would otherwise be read digit by digit.
+    """
+    if not isinstance(raw_ids, (list, tuple)):
+        return []
+    ids = []
+    for raw in raw_ids:
+        try:
+            oid = int(raw)
+        except (TypeError, ValueError):
+            continue
+        if oid > 0:
+            ids.append(oid)
+    return list(dict.fromkeys(ids))
+
+
+def bulk_summary(results: dict) -> dict:
+    counts = {}
+    for result in results.values():
+        counts[result] = counts.get(result, 0) + 1
+    return counts
+
+
+def handle_bulk_status(apply, redirect_endpoint: str):
+    """Shared body of the bulk-status endpoints.
+
+    Reads order ids and the target status from a JSON object or a form, calls
+    apply(order_ids, new_status) -> {order_id: TransitionResult}, commits when
+    anything changed, and answers with JSON or a flash plus redirect. More
+    than BULK_STATUS_MAX_ORDERS ids are refused without touching any order.
+    """
+    payload = request.get_json(silent=True) if request.is_json else None
+    if request.is_json and not isinstance(payload, dict):
+        abort(400)
+    if payload is not None:
+        order_ids = parse_order_ids(payload.get("order_ids"))
+        new_status = payload.get("status") or ""
+    else:
+        order_ids = parse_order_ids(request.form.getlist("order_ids"))
+        new_status = request.form.get("status") or ""
+    limit = current_app.config.get("BULK_STATUS_MAX_ORDERS", DEFAULT_MAX_ORDERS)
+    if len(order_ids) > limit:
+        message = f"At most {limit} orders can be updated at once."
+        if payload is not None:
+            return jsonify({"error": message}), 400
+        flash(message, "danger")
+        return redirect(url_for(redirect_endpoint))
+    results = apply(order_ids, new_status)
+    summary = bulk_summary(results)
+    if summary.get(TransitionResult.UPDATED):
+        db.session.commit()
+    if payload is not None:
+        return jsonify(
+            {
+                "status": new_status,
+                "results": [{"order_id": oid, "result": result} for oid, result in results.items()],
+                "summary": summary,
+            }
+        )
+    updated = summary.get(TransitionResult.UPDATED, 0)
+    skipped = len(results) - updated
+    flash(f"{updated} orders updated, {skipped} skipped.", "success" if updated and not skipped else "warning")
+    return redirect(url_for(redirect_endpoint))
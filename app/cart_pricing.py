@@ -0,0 +1,109 @@
+# app/cart_pricing.py - batched cart pricing shared by cart, summary and checkout
+from datetime import datetime
+
+from flask import g, has_request_context
+
+from app.coupon_index import coupon_index
+from app.models import Product, UserCoupon, DiscountType
+
+
+class PricedCart:
+    """Priced snapshot of a session cart: lines, totals and the applied coupon."""
+
+    def __init__(self, lines, subtotal, discount, coupon):
+        self.lines = lines
+        self.subtotal = subtotal
+        self.discount = discount
+        self.total = max(0, subtotal - discount)
+        self.coupon = coupon
+
+    @property
+    def totals(self):
+        return {"subtotal": self.subtotal, "discount": self.discount, "total": self.total}
+
+    @property
+    def restaurant_id(self):
+        return self.lines[0]["product"].restaurant_id if self.lines else None
+
+    def __bool__(self):
+        return bool(self.lines)
+
+
+def load_cart_products(product_ids):
+    """Load every product referenced by the cart with a single IN query."""
+    ids = {int(pid) for pid in product_ids}
+    if not ids:
+        return {}
+    return {p.id: p for p in Product.query.filter(Product.id.in_(ids)).all()}
+
+
+def coupon_discount(coupon_obj, subtotal, user_id=None):
+    """Return the discount a CouponEntry grants on subtotal, or None if it doesn't apply.
+
+    Everything but the per-user limit comes from the coupon index; a coupon with
+    max_usage_per_user costs one UserCoupon lookup.
+    """
+    if not coupon_obj or not coupon_obj.is_active:
+        return None
+    if not coupon_obj.is_valid_at(datetime.utcnow()):
+        return None
+    if subtotal < float(coupon_obj.min_order_amount or 0):
+        return None
+    if coupon_obj.max_usage_per_user:
+        usage = UserCoupon.query.filter_by(user_id=user_id, coupon_id=coupon_obj.id).first()
+        if usage and usage.usage_count >= coupon_obj.max_usage_per_user:
+            return None
+    if coupon_index.is_exhausted(coupon_obj.id):
+        return None
+    if coupon_obj.discount_type == DiscountType.PERCENT:
+        discount = subtotal * float(coupon_obj.value) / 100
+    else:
+        discount = float(coupon_obj.value)
+    return min(discount, subtotal)
+
+
+def _build_priced_cart(cart_data, coupon_info, user_id):
+    products = load_cart_products(cart_data.keys())
+    lines = []
+    subtotal = 0
+    for pid, qty in cart_data.items():
+        product = products.get(int(pid))
+        if not product:
+            continue
+        line_total = float(product.price) * qty
+        subtotal += line_total
+        lines.append(
+            {
+                "id": product.id,
+                "name": product.name,
+                "quantity": qty,
+                "unit_price": product.price,
+                "subtotal": line_total,
+                "product": product,
+            }
+        )
+
+    discount = 0
+    coupon_obj = None
+    if coupon_info:
+        candidate = coupon_index.get_by_id(coupon_info.get("id"))
+        applied = coupon_discount(candidate, subtotal, user_id)
+        if applied is not None:
+            coupon_obj = candidate
+            discount = applied
+    return PricedCart(lines, subtotal, discount, coupon_obj)
+
+
+def price_cart(cart_data, coupon_info=None, user_id=None):
+    """Price a cart once per request; repeated calls with the same input reuse the snapshot."""
+    if not has_request_context():
+        return _build_priced_cart(cart_data, coupon_info, user_id)
+    key = (
+        tuple(sorted((str(pid), qty) for pid, qty in cart_data.items())),
+        coupon_info.get("id") if coupon_info else None,
+        user_id,
+    )
+    cache = g.setdefault("priced_carts", {})
+    if key not in cache:
+        cache[key] = _build_priced_cart(cart_data, coupon_info, user_id)
+    return cache[key]
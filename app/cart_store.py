@@ -0,0 +1,208 @@
+# app/cart_store.py - server-side cart storage keyed by an opaque cart id
+import threading
+from abc import ABC, abstractmethod
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app, session
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import Cart, CartItem
+
+DEFAULT_IDLE_TTL = 7 * 24 * 3600
+SESSION_KEY = "cart_id"
+
+
+class CartStore(ABC):
+    """Carts are {product_id: quantity} dicts with int keys.
+
+    Every mutation refreshes the cart's idle timer; a cart untouched for
+    idle_ttl seconds reads as empty and is dropped by purge_expired().
+    """
+
+    def __init__(self, idle_ttl: int = DEFAULT_IDLE_TTL):
+        self.idle_ttl = idle_ttl
+
+    @abstractmethod
+    def get(self, cart_id) -> dict:
+        ...
+
+    @abstractmethod
+    def add(self, cart_id, product_id: int, delta: int = 1) -> int:
+        """Change a line's quantity by delta and return the new quantity (0 removes it)."""
+
+    @abstractmethod
+    def remove(self, cart_id, product_id: int) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self, cart_id) -> None:
+        ...
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        ...
+
+
+class MemoryCartStore(CartStore):
+    """Process-local store for tests and single-process development."""
+
+    def __init__(self, idle_ttl: int = DEFAULT_IDLE_TTL):
+        super().__init__(idle_ttl)
+        self._lock = threading.Lock()
+        self._carts = {}
+
+    def _live(self, cart_id, now):
+        entry = self._carts.get(cart_id)
+        if entry and now - entry[0] > self.idle_ttl:
+            del self._carts[cart_id]
+            return None
+        return entry
+
+    def get(self, cart_id) -> dict:
+        if not cart_id:
+            return {}
+        with self._lock:
+            entry = self._live(cart_id, time.monotonic())
+            return dict(entry[1]) if entry else {}
+
+    def add(self, cart_id, product_id: int, delta: int = 1) -> int:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live(cart_id, now) or self._carts.setdefault(cart_id, [now, {}])
+            entry[0] = now
+            quantity = entry[1].get(product_id, 0) + delta
+            if quantity > 0:
+                entry[1][product_id] = quantity
+            else:
+                entry[1].pop(product_id, None)
+            return max(quantity, 0)
+
+    def remove(self, cart_id, product_id: int) -> None:
+        with self._lock:
+            entry = self._live(cart_id, time.monotonic())
+            if entry:
+                entry[0] = time.monotonic()
+                entry[1].pop(product_id, None)
+
+    def clear(self, cart_id) -> None:
+        if not cart_id:
+            return
+        with self._lock:
+            self._carts.pop(cart_id, None)
+
+    def purge_expired(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [cid for cid, entry in self._carts.items() if now - entry[0] > self.idle_ttl]
+            for cid in expired:
+                del self._carts[cid]
+        return len(expired)
+
+
+class DatabaseCartStore(CartStore):
+    """Cart and CartItem rows; quantities change with UPDATE ... SET quantity = quantity + delta.
+
+    Mutations run in db.session's transaction; the calling route commits them.
+    """
+
+    def _cutoff(self):
+        return datetime.utcnow() - timedelta(seconds=self.idle_ttl)
+
+    def get(self, cart_id) -> dict:
+        if not cart_id:
+            return {}
+        rows = db.session.execute(
+            select(CartItem.product_id, CartItem.quantity)
+            .join(Cart, Cart.id == CartItem.cart_id)
+            .where(CartItem.cart_id == cart_id, Cart.updated_at >= self._cutoff())
+            .order_by(CartItem.product_id)
+        )
+        return {product_id: quantity for product_id, quantity in rows}
+
+    def _touch(self, cart_id, create: bool = True) -> bool:
+        """Refresh the idle timer, emptying the cart first if it had already expired.
+
+        Returns False, without writing, when the cart does not exist and create is off.
+        """
+        now = datetime.utcnow()
+        live = db.session.execute(
+            update(Cart).where(Cart.id == cart_id, Cart.updated_at >= self._cutoff()).values(updated_at=now)
+        ).rowcount
+        if live:
+            return True
+        if not create and db.session.execute(select(Cart.id).where(Cart.id == cart_id)).scalar() is None:
+            return False
+        db.session.execute(delete(CartItem).where(CartItem.cart_id == cart_id))
+        if db.session.execute(update(Cart).where(Cart.id == cart_id).values(updated_at=now)).rowcount:
+            return True
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(Cart).values(id=cart_id, updated_at=now))
+        except IntegrityError:
+            pass  # created by a concurrent request
+        return True
+
+    def _quantity(self, cart_id, product_id):
+        return db.session.execute(
+            select(CartItem.quantity).where(CartItem.cart_id == cart_id, CartItem.product_id == product_id)
+        ).scalar()
+
+    def add(self, cart_id, product_id: int, delta: int = 1) -> int:
+        if not self._touch(cart_id, create=delta > 0):
+            return 0
+        line = (CartItem.cart_id == cart_id, CartItem.product_id == product_id)
+        bump = update(CartItem).where(*line).values(quantity=CartItem.quantity + delta)
+        if not db.session.execute(bump).rowcount and delta > 0:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(CartItem).values(cart_id=cart_id, product_id=product_id, quantity=delta))
+            except IntegrityError:
+                db.session.execute(bump)  # a concurrent add inserted the line first
+        db.session.execute(delete(CartItem).where(*line, CartItem.quantity <= 0))
+        return self._quantity(cart_id, product_id) or 0
+
+    def remove(self, cart_id, product_id: int) -> None:
+        if self._touch(cart_id, create=False):
+            db.session.execute(delete(CartItem).where(CartItem.cart_id == cart_id, CartItem.product_id == product_id))
+
+    def clear(self, cart_id) -> None:
+        if not cart_id:
+            return
+        db.session.execute(delete(CartItem).where(CartItem.cart_id == cart_id))
+        db.session.execute(delete(Cart).where(Cart.id == cart_id))
+
+    def purge_expired(self) -> int:
+        cutoff = self._cutoff()
+        expired = select(Cart.id).where(Cart.updated_at < cutoff)
+        db.session.execute(delete(CartItem).where(CartItem.cart_id.in_(expired)))
+        return db.session.execute(delete(Cart).where(Cart.updated_at < cutoff)).rowcount
+
+
+BACKENDS = {"database": DatabaseCartStore, "memory": MemoryCartStore}
+
+
+def init_cart_store(app) -> None:
+    backend = app.config.get("CART_STORE", "database")
+    if backend not in BACKENDS:
+        raise RuntimeError(f"Unknown CART_STORE backend: {backend}")
+    app.extensions["cart_store"] = BACKENDS[backend](app.config.get("CART_IDLE_TTL", DEFAULT_IDLE_TTL))
+
+
+def get_cart_store() -> CartStore:
+    return current_app.extensions["cart_store"]
+
+
+def current_cart_id(create: bool = False):
+    """The session's opaque cart id; only a new cart writes to the cookie."""
+    cart_id = session.get(SESSION_KEY)
+    if not cart_id and create:
+        cart_id = session[SESSION_KEY] = uuid.uuid4().hex
+    return cart_id
+
+
+def current_cart() -> dict:
+    return get_cart_store().get(current_cart_id())
@@ -0,0 +1,191 @@
+# app/checkout.py - idempotent order placement pipeline
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+
+from app.branch_locator import branch_locator
+from app.cart_pricing import price_cart
+from app.coupon_index import coupon_index
+from app.extensions import db
+from app.coupons import REDEMPTION_MESSAGES, RedemptionResult, redeem_coupon
+from app.models import BranchCoverage, Order, OrderItem, OrderStatus, OrderStatusHistory, RestaurantBranch, UserAddress
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 64
+
+
+class CheckoutError(Exception):
+    """Checkout cannot proceed; the message is safe to show to the customer."""
+
+    def __init__(self, message: str, category: str = "danger"):
+        super().__init__(message)
+        self.category = category
+
+
+def address_point(address):
+    """(latitude, longitude) of an address, else of its neighborhood; None when neither is known."""
+    for place in (address, address.neighborhood if address else None):
+        if place is not None and place.latitude is not None and place.longitude is not None:
+            return float(place.latitude), float(place.longitude)
+    return None
+
+
+def parse_point(latitude, longitude):
+    """(latitude, longitude) as Decimals from form text, None when both are blank.
+
+    Raises ValueError when only one is given or either is out of range.
+    """
+    latitude, longitude = (latitude or "").strip(), (longitude or "").strip()
+    if not latitude and not longitude:
+        return None
+    try:
+        point = Decimal(latitude), Decimal(longitude)
+    except InvalidOperation:
+        raise ValueError("invalid coordinates") from None
+    if not all(p.is_finite() for p in point) or not (-90 <= point[0] <= 90 and -180 <= point[1] <= 180):
+        raise ValueError("coordinates out of range")
+    return tuple(p.quantize(Decimal("0.000001")) for p in point)
+
+
+def get_branch_for_restaurant(restaurant_id: int, neighborhood_id=None, point=None):
+    """Pick the active branch to fulfil an order; None if no active branch can take it.
+
+    With a neighborhood_id only branches delivering there are candidates; among
+    them the one nearest to point wins, otherwise the lowest id.
+    """
+    if not restaurant_id:
+        return None
+    eligible = None
+    if neighborhood_id:
+        eligible = set(
+            db.session.scalars(
+                select(BranchCoverage.branch_id).where(
+                    BranchCoverage.neighborhood_id == neighborhood_id, BranchCoverage.restaurant_id == restaurant_id
+                )
+            )
+        )
+        if not eligible:
+            return None
+    if point is not None:
+        branch_id = branch_locator.nearest(restaurant_id, point, eligible)
+        branch = db.session.get(RestaurantBranch, branch_id) if branch_id else None
+        if branch is not None and branch.is_active:
+            return branch
+    query = RestaurantBranch.query.filter_by(restaurant_id=restaurant_id, is_active=True)
+    if eligible is not None:
+        query = query.filter(RestaurantBranch.id.in_(eligible))
+    return query.order_by(RestaurantBranch.id).first()
+
+
+def default_user_address(user_id: int):
+    """The address orders are delivered to: the default one, else the oldest."""
+    return (
+        UserAddress.query.options(joinedload(UserAddress.neighborhood))
+        .filter_by(user_id=user_id)
+        .order_by(UserAddress.is_default.desc(), UserAddress.id)
+        .first()
+    )
+
+
+def ensure_user_address(user_id: int, neighborhood_id: int):
+    """Fetch or create a simple default address for the user."""
+    addr = default_user_address(user_id)
+    if addr:
+        return addr
+    addr = UserAddress(
+        user_id=user_id,
+        neighborhood_id=neighborhood_id,
+        title="Varsayılan Adres",
+        address_line="Adres girilmedi (otomatik)",
+        is_default=True,
+    )
+    db.session.add(addr)
+    db.session.flush()
+    return addr
+
+
+def normalize_idempotency_key(raw):
+    key = (raw or "").strip()
+    if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        return None
+    return key
+
+
+def find_order_by_key(user_id: int, idempotency_key):
+    if not idempotency_key:
+        return None
+    return Order.query.filter_by(user_id=user_id, idempotency_key=idempotency_key).first()
+
+
+def place_order(user_id: int, cart_data, coupon_info=None, idempotency_key=None):
+    """Create an order from the cart in one transaction.
+
+    Returns (order, created). Replaying an idempotency key returns the order it
+    already produced with created=False, including when two submits race and
+    the unique (user_id, idempotency_key) constraint rejects the second one.
+    """
+    existing = find_order_by_key(user_id, idempotency_key)
+    if existing:
+        return existing, False
+    if not cart_data:
+        raise CheckoutError("Sepet boş.", "warning")
+
+    priced = price_cart(cart_data, coupon_info, user_id)
+    if not priced:
+        raise CheckoutError("Cart has invalid items.")
+    address = default_user_address(user_id)
+    branch = get_branch_for_restaurant(
+        priced.restaurant_id, address.neighborhood_id if address else None, address_point(address)
+    )
+    if not branch:
+        if address is not None:
+            raise CheckoutError("Bu restoran adresinize teslimat yapmıyor.")
+        raise CheckoutError("Bu restoran için aktif bir şube tanımlı değil.")
+
+    # Ensure we have a user address (schema requires not-null address_id)
+    address = address or ensure_user_address(user_id, branch.neighborhood_id)
+    order = Order(
+        user_id=user_id,
+        branch_id=branch.id,
+        address_id=address.id,
+        coupon_id=priced.coupon.id if priced.coupon else None,
+        status=OrderStatus.PENDING,
+        total_amount=priced.subtotal,
+        final_amount=priced.total,
+        idempotency_key=idempotency_key,
+    )
+    db.session.add(order)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        db.session.rollback()
+        existing = find_order_by_key(user_id, idempotency_key)
+        if existing:
+            return existing, False
+        raise
+
+    db.session.execute(
+        insert(OrderItem),
+        [
+            {"order_id": order.id, "product_id": line["id"], "quantity": line["quantity"], "unit_price": line["unit_price"]}
+            for line in priced.lines
+        ],
+    )
+    db.session.execute(
+        insert(OrderStatusHistory).values(
+            order_id=order.id,
+            old_status=OrderStatus.PENDING,
+            new_status=OrderStatus.PENDING,
+            changed_by_user_id=user_id,
+        )
+    )
+    if priced.coupon:
+        outcome = redeem_coupon(user_id, priced.coupon)
+        if outcome != RedemptionResult.REDEEMED:
+            if outcome == RedemptionResult.EXHAUSTED:
+                coupon_index.mark_exhausted(priced.coupon.id)
+            db.session.rollback()
+            raise CheckoutError(REDEMPTION_MESSAGES[outcome], "warning")
+    db.session.commit()
+    return order, True
@@ -0,0 +1,202 @@
+# app/commands.py - flask CLI commands for maintenance tasks
+import click
+from flask.cli import AppGroup
+
+from app.extensions import db
+
+stats_cli = AppGroup("stats", help="Restaurant listing read model.")
+cart_cli = AppGroup("cart", help="Server-side cart store.")
+schema_cli = AppGroup("schema", help="One-time schema setup for fast-boot deployments.")
+perf_cli = AppGroup("perf", help="Performance probes.")
+search_cli = AppGroup("search", help="Restaurant, dish and order search indexes.")
+cuisine_cli = AppGroup("cuisine", help="Cuisine types and restaurant cuisine links.")
+delivery_cli = AppGroup("delivery", help="Branch delivery areas.")
+
+
+@stats_cli.command("rebuild")
+def rebuild_stats_command():
+    """Backfill RestaurantStats from reviews, branches and restaurants."""
+    from app.restaurant_stats import rebuild_stats
+
+    count = rebuild_stats(db.session.connection())
+    db.session.commit()
+    click.echo(f"Rebuilt stats for {count} restaurants.")
+
+
+@search_cli.command("rebuild")
+def rebuild_search_command():
+    """Rebuild every restaurant and order search document from the source tables."""
+    from app.search_index import rebuild_search_index, reindex_orders
+
+    conn = db.session.connection()
+    count = rebuild_search_index(conn)
+    orders = reindex_orders(conn)
+    db.session.commit()
+    click.echo(f"Indexed {count} restaurants and {orders} orders.")
+
+
+@search_cli.command("refresh-orders")
+@click.option("--batch-size", type=int, default=1000, show_default=True, help="Orders reindexed per transaction.")
+def refresh_order_search_command(batch_size):
+    """Reindex orders whose customer or restaurant was renamed since they were indexed."""
+    from app.search_index import reindex_orders, stale_order_ids
+
+    total = 0
+    while True:
+        order_ids = stale_order_ids(db.session.connection(), limit=batch_size)
+        if not order_ids:
+            break
+        total += reindex_orders(db.session.connection(), order_ids)
+        db.session.commit()
+    click.echo(f"Reindexed {total} orders.")
+
+
+@cuisine_cli.command("backfill")
+def backfill_cuisines_command():
+    """Create the default cuisine types and link restaurants that have no cuisine."""
+    from app.cuisines import backfill_cuisines
+
+    count = backfill_cuisines(db.session)
+    db.session.commit()
+    click.echo(f"Linked {count} restaurants to a cuisine.")
+
+
+@delivery_cli.command("rebuild")
+def rebuild_coverage_command():
+    """Rebuild the neighborhood -> branch coverage index from branches and delivery areas."""
+    from app.delivery_areas import rebuild_coverage
+
+    count = rebuild_coverage(db.session.connection())
+    db.session.commit()
+    click.echo(f"Indexed {count} neighborhood-branch pairs.")
+
+
+@delivery_cli.command("centre")
+@click.argument("neighborhood_id", type=int)
+@click.argument("latitude")
+@click.argument("longitude")
+def set_neighborhood_centre_command(neighborhood_id, latitude, longitude):
+    """Set a neighborhood's centre point; branches there are placed at it for nearest-branch routing."""
+    from app.checkout import parse_point
+    from app.models import Neighborhood
+
+    neighborhood = db.session.get(Neighborhood, neighborhood_id)
+    if neighborhood is None:
+        raise click.BadParameter(f"no neighborhood {neighborhood_id}", param_hint="NEIGHBORHOOD_ID")
+    try:
+        point = parse_point(latitude, longitude)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc), param_hint="LATITUDE LONGITUDE") from None
+    neighborhood.latitude, neighborhood.longitude = point
+    db.session.commit()
+    click.echo(f"{neighborhood.name}: {point[0]}, {point[1]}")
+
+
+@cart_cli.command("purge")
+def purge_carts_command():
+    """Delete carts idle for longer than CART_IDLE_TTL."""
+    from app.cart_store import get_cart_store
+
+    count = get_cart_store().purge_expired()
+    db.session.commit()
+    click.echo(f"Purged {count} idle carts.")
+
+
+@schema_cli.command("upgrade")
+def upgrade_schema_command():
+    """Create the database if needed, apply migrations and record the schema fingerprint."""
+    from flask import current_app
+    from flask_migrate import stamp, upgrade
+    from sqlalchemy import inspect
+
+    from app import _ensure_database
+    from app.schema_state import BASELINE_REVISION, POST_BASELINE_TABLES, schema_differences, stamp_schema
+
+    _ensure_database(current_app.config["SQLALCHEMY_DATABASE_URI"])
+    tables = set(inspect(db.engine).get_table_names())
+    if "alembic_version" not in tables and "User" in tables:
+        # Database built by create_all/schema.sql without migrations: adopt it at
+        # head when it already matches the models, else at the baseline and migrate.
+        with db.engine.connect() as conn:
+            differences = schema_differences(conn, db.metadata)
+        if not differences:
+            stamp()
+            click.echo("Existing schema matches the models; stamped at head.")
+        elif tables & POST_BASELINE_TABLES:
+            click.echo(f"Existing schema matches neither the baseline nor head ({len(differences)} differences); not stamping.")
+            raise SystemExit(1)
+        else:
+            stamp(revision=BASELINE_REVISION)
+            upgrade()
+            click.echo(f"Existing schema stamped at baseline {BASELINE_REVISION} and upgraded.")
+    else:
+        upgrade()
+    with db.engine.connect() as conn:
+        revision = conn.exec_driver_sql("SELECT version_num FROM alembic_version").scalar()
+    fingerprint = stamp_schema(db.engine, db.metadata, revision=revision)
+    click.echo(f"Schema at {revision}, fingerprint {fingerprint[:12]}.")
+
+
+@schema_cli.command("check")
+def check_schema_command():
+    """Compare the stored fingerprint with the models; exit 1 on a mismatch."""
+    from app.schema_state import schema_fingerprint, stored_fingerprint
+
+    expected = schema_fingerprint(db.metadata)
+    with db.engine.connect() as conn:
+        stored = stored_fingerprint(conn)
+    if stored != expected:
+        click.echo(f"Schema mismatch: stored {(stored or 'none')[:12]}, models {expected[:12]}.")
+        raise SystemExit(1)
+    click.echo(f"Schema up to date ({expected[:12]}).")
+
+
+@perf_cli.command("startup")
+@click.option("--no-request", is_flag=True, help="Skip the first GET / (no database reads).")
+@click.option("--budget-ms", type=float, default=None, help="Exit 1 if create_app takes longer than this.")
+def perf_startup_command(no_request, budget_ms):
+    """Cold-start breakdown as JSON: imports, create_app phases, template compile, first request."""
+    import json
+
+    from app.perf import startup_report
+
+    report = startup_report(first_request=not no_request)
+    click.echo(json.dumps(report, indent=2, sort_keys=True))
+    if budget_ms is not None and report["create_app_ms"] > budget_ms:
+        click.echo(f"create_app took {report['create_app_ms']} ms (budget {budget_ms} ms)", err=True)
+        raise SystemExit(1)
+
+
+@perf_cli.command("locator")
+@click.option("--points", type=int, default=2000, show_default=True, help="Branch locations in the tree.")
+@click.option("--lookups", type=int, default=1000, show_default=True)
+@click.option("--budget-us", type=float, default=None, help="Exit 1 if a lookup takes longer than this on average.")
+def perf_locator_command(points, lookups, budget_us):
+    """Time nearest-branch lookups on a random k-d tree of city-sized extent, as JSON."""
+    import json
+    import random
+    import time
+
+    from app.branch_locator import KdTree
+
+    rng = random.Random(7)
+    tree = KdTree((41.0 + rng.random() * 0.3, 28.8 + rng.random() * 0.4, i) for i in range(points))
+    targets = [(41.0 + rng.random() * 0.3, 28.8 + rng.random() * 0.4) for _ in range(lookups)]
+    started = time.perf_counter()
+    for lat, lon in targets:
+        tree.nearest(lat, lon)
+    per_lookup_us = (time.perf_counter() - started) / max(1, lookups) * 1e6
+    click.echo(json.dumps({"points": points, "lookups": lookups, "per_lookup_us": round(per_lookup_us, 2)}, indent=2))
+    if budget_us is not None and per_lookup_us > budget_us:
+        click.echo(f"lookup took {per_lookup_us:.1f} us (budget {budget_us} us)", err=True)
+        raise SystemExit(1)
+
+
+def register_commands(app):
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(cart_cli)
+    app.cli.add_command(schema_cli)
+    app.cli.add_command(perf_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(cuisine_cli)
+    app.cli.add_command(delivery_cli)
@@ -10,3 +10,47 @@ class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-key")
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL") or DEFAULT_DB_URI
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    MENU_CACHE_SIZE = int(os.environ.get("MENU_CACHE_SIZE", "256"))
+    MENU_CACHE_TTL = int(os.environ.get("MENU_CACHE_TTL", "60"))
+    COUPON_USAGE_SHARDS = int(os.environ.get("COUPON_USAGE_SHARDS", "8"))
+    COUPON_INDEX_TTL = int(os.environ.get("COUPON_INDEX_TTL", "60"))
+    COUPON_INDEX_MAX_ENTRIES = int(os.environ.get("COUPON_INDEX_MAX_ENTRIES", "10000"))
+    COUPON_NEGATIVE_CACHE_SIZE = int(os.environ.get("COUPON_NEGATIVE_CACHE_SIZE", "4096"))
+    CART_STORE = os.environ.get("CART_STORE", "database")
+    CART_IDLE_TTL = int(os.environ.get("CART_IDLE_TTL", str(7 * 24 * 3600)))
+    USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", "30"))
+    USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", "4096"))
+    OWNER_CONTEXT_TTL = int(os.environ.get("OWNER_CONTEXT_TTL", "60"))
+    BRANCH_LOCATOR_TTL = int(os.environ.get("BRANCH_LOCATOR_TTL", "300"))
+    BULK_STATUS_MAX_ORDERS = int(os.environ.get("BULK_STATUS_MAX_ORDERS", "100"))
+    STRICT_LOADING = os.environ.get("STRICT_LOADING", "").lower() in {"1", "true", "yes"}
+    SQL_PROFILING = os.environ.get("SQL_PROFILING", "1").lower() in {"1", "true", "yes"}
+    SQL_PROFILE_HEADERS = os.environ.get("SQL_PROFILE_HEADERS", "").lower() in {"1", "true", "yes"}
+    SQL_NPLUSONE_THRESHOLD = int(os.environ.get("SQL_NPLUSONE_THRESHOLD", "5"))
+    SQL_ENFORCE_BUDGETS = False
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1").lower() in {"1", "true", "yes"}
+    # Shared directory for multi-worker servers; each worker writes metrics-<pid>-<start>.json there.
+    METRICS_DIR = os.environ.get("METRICS_DIR") or None
+    METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "5"))
+    # /metrics answers 404 until a token is configured.
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN") or None
+    LOG_DIR = os.environ.get("LOG_DIR") or None
+    LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+    LOG_INFO_SAMPLE_RATE = float(os.environ.get("LOG_INFO_SAMPLE_RATE", "1.0"))
+    LOG_ACCESS = os.environ.get("LOG_ACCESS", "1").lower() in {"1", "true", "yes"}
+    # Pool sizing: one connection per request thread in each worker (see app.db_pool).
+    # Leave WEB_THREADS unset for servers with no fixed thread count, such as
+    # the threaded development server that run.py starts.
+    WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    WEB_THREADS = int(os.environ["WEB_THREADS"]) if os.environ.get("WEB_THREADS") else None
+    DB_POOL_SIZE = int(os.environ["DB_POOL_SIZE"]) if os.environ.get("DB_POOL_SIZE") else None
+    DB_MAX_OVERFLOW = int(os.environ["DB_MAX_OVERFLOW"]) if os.environ.get("DB_MAX_OVERFLOW") else None
+    DB_MAX_CONNECTIONS = int(os.environ.get("DB_MAX_CONNECTIONS", "150"))
+    DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "280"))
+    DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "1").lower() in {"1", "true", "yes"}
+    # Comma-separated read replica URLs; read-only views are routed there (see app.db_routing).
+    SQLALCHEMY_REPLICA_URIS = [u.strip() for u in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+    REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", "5"))
+    # Production boot: skip CREATE DATABASE/create_all and only check the stored schema fingerprint.
+    FAST_BOOT = os.environ.get("FAST_BOOT", "").lower() in {"1", "true", "yes"}
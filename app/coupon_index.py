@@ -0,0 +1,196 @@
+# app/coupon_index.py - in-process coupon lookup with TTL refresh and negative caching
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import case, event, func, select
+from sqlalchemy.orm import Session
+
+from app.db_routing import primary_read
+from app.extensions import db
+from app.models import Coupon, CouponUsageShard
+from app.session_changes import on_commit, record_change
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_NEGATIVE_SIZE = 4096
+
+
+class CouponEntry:
+    """Detached, read-only copy of an active coupon."""
+
+    __slots__ = (
+        "id",
+        "code",
+        "discount_type",
+        "value",
+        "min_order_amount",
+        "valid_from",
+        "valid_to",
+        "max_usage_per_user",
+        "max_total_usage",
+        "is_active",
+    )
+
+    def __init__(self, coupon):
+        for name in self.__slots__:
+            setattr(self, name, getattr(coupon, name))
+        self.is_active = bool(self.is_active)
+
+    def is_valid_at(self, now: datetime) -> bool:
+        if self.valid_from and self.valid_from > now:
+            return False
+        if self.valid_to and self.valid_to < now:
+            return False
+        return True
+
+
+def _exhausted_ids(coupon_ids):
+    """Ids among coupon_ids whose usage shards are all full."""
+    if not coupon_ids:
+        return set()
+    open_shards = func.sum(case((CouponUsageShard.usage_count < CouponUsageShard.capacity, 1), else_=0))
+    return set(
+        db.session.execute(
+            select(CouponUsageShard.coupon_id)
+            .where(CouponUsageShard.coupon_id.in_(sorted(coupon_ids)))
+            .group_by(CouponUsageShard.coupon_id)
+            .having(open_shards == 0)
+        ).scalars()
+    )
+
+
+def _next_boundary(entries, now: datetime):
+    """Earliest future valid_from/valid_to, after which validity answers change."""
+    upcoming = [
+        moment
+        for entry in entries
+        for moment in (entry.valid_from, entry.valid_to)
+        if moment and moment > now
+    ]
+    return min(upcoming) if upcoming else None
+
+
+class CouponIndex:
+    """Active coupons indexed by code and id.
+
+    Normally the index holds every active coupon, so an unknown code is answered
+    without SQL. When there are more than COUPON_INDEX_MAX_ENTRIES active coupons
+    the index is partial: misses fall back to one query by code and unknown codes
+    are remembered in a bounded negative cache until the next refresh.
+
+    Capped coupons whose usage shards were all full at the last refresh, or that
+    failed a redemption since, are flagged exhausted so pricing a cart needs no
+    shard query; redemption itself still enforces the cap.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_code = {}
+        self._by_id = {}
+        self._negative = OrderedDict()
+        self._exhausted = set()
+        self._partial = False
+        self._expires_at = 0.0
+        self.stats = {"hits": 0, "misses": 0, "negative_hits": 0, "refreshes": 0}
+
+    def _config(self, key, default):
+        if has_app_context():
+            return current_app.config.get(key, default)
+        return default
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._expires_at = 0.0
+
+    def _refresh_if_stale(self) -> None:
+        if time.monotonic() < self._expires_at:
+            return
+        with self._lock:
+            if time.monotonic() < self._expires_at:
+                return
+            max_entries = self._config("COUPON_INDEX_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+            rows = Coupon.query.filter_by(is_active=True).order_by(Coupon.id.desc()).limit(max_entries + 1).all()
+            partial = len(rows) > max_entries
+            entries = [CouponEntry(c) for c in rows[:max_entries]]
+            exhausted = _exhausted_ids({e.id for e in entries if e.max_total_usage})
+            now = datetime.utcnow()
+            ttl = self._config("COUPON_INDEX_TTL", DEFAULT_TTL)
+            boundary = _next_boundary(entries, now)
+            if boundary:
+                ttl = min(ttl, max(1.0, (boundary - now).total_seconds()))
+            self._by_code = {e.code: e for e in entries}
+            self._by_id = {e.id: e for e in entries}
+            self._negative = OrderedDict()
+            self._exhausted = exhausted
+            self._partial = partial
+            self._expires_at = time.monotonic() + ttl
+            self.stats["refreshes"] += 1
+
+    def is_exhausted(self, coupon_id) -> bool:
+        return coupon_id in self._exhausted
+
+    def mark_exhausted(self, coupon_id) -> None:
+        with self._lock:
+            self._exhausted.add(coupon_id)
+
+    def _remember(self, coupon):
+        entry = CouponEntry(coupon)
+        with self._lock:
+            self._by_code[entry.code] = entry
+            self._by_id[entry.id] = entry
+        return entry
+
+    def _remember_miss(self, key) -> None:
+        limit = self._config("COUPON_NEGATIVE_CACHE_SIZE", DEFAULT_NEGATIVE_SIZE)
+        with self._lock:
+            self._negative[key] = True
+            self._negative.move_to_end(key)
+            while len(self._negative) > limit:
+                self._negative.popitem(last=False)
+
+    @primary_read
+    def _lookup(self, kind: str, key, loader):
+        self._refresh_if_stale()
+        index = self._by_code if kind == "code" else self._by_id
+        entry = index.get(key)
+        if entry:
+            self.stats["hits"] += 1
+            return entry
+        if not self._partial or (kind, key) in self._negative:
+            self.stats["negative_hits"] += 1
+            return None
+        self.stats["misses"] += 1
+        coupon = loader()
+        if coupon is None:
+            self._remember_miss((kind, key))
+            return None
+        return self._remember(coupon)
+
+    def get_by_code(self, code: str):
+        return self._lookup("code", code, lambda: Coupon.query.filter_by(code=code, is_active=True).first())
+
+    def get_by_id(self, coupon_id):
+        try:
+            coupon_id = int(coupon_id)
+        except (TypeError, ValueError):
+            return None
+        return self._lookup("id", coupon_id, lambda: Coupon.query.filter_by(id=coupon_id, is_active=True).first())
+
+
+coupon_index = CouponIndex()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_coupon_changes(session, _flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Coupon):
+            record_change(session, "coupons_changed")
+            return
+
+
+@on_commit("coupons_changed")
+def _invalidate_after_commit(_changes):
+    coupon_index.invalidate()
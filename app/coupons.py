@@ -0,0 +1,139 @@
+# app/coupons.py - coupon redemption with atomic per-user and sharded global limits
+import random
+
+from flask import current_app, has_app_context
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import CouponUsageShard, UserCoupon
+
+DEFAULT_USAGE_SHARDS = 8
+
+
+class RedemptionResult:
+    REDEEMED = "redeemed"
+    USER_LIMIT = "user_limit"
+    EXHAUSTED = "exhausted"
+
+
+REDEMPTION_MESSAGES = {
+    RedemptionResult.USER_LIMIT: "Kupon kullanım hakkınız dolmuş.",
+    RedemptionResult.EXHAUSTED: "Kupon kullanım limiti doldu.",
+}
+
+
+def _shard_count():
+    if has_app_context():
+        return max(1, int(current_app.config.get("COUPON_USAGE_SHARDS", DEFAULT_USAGE_SHARDS)))
+    return DEFAULT_USAGE_SHARDS
+
+
+def shard_capacities(cap: int, shard_count: int):
+    """Split a global cap into per-shard capacities that add up to exactly cap."""
+    if cap <= 0:
+        return []
+    shards = min(shard_count, cap)
+    base, extra = divmod(cap, shards)
+    return [base + (1 if i < extra else 0) for i in range(shards)]
+
+
+def _claim_user_slot(user_id: int, coupon) -> bool:
+    """usage_count = usage_count + 1 WHERE usage_count < max_usage_per_user, inserting the row if missing."""
+    stmt = (
+        update(UserCoupon)
+        .where(UserCoupon.user_id == user_id, UserCoupon.coupon_id == coupon.id)
+        .values(usage_count=UserCoupon.usage_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if coupon.max_usage_per_user:
+        stmt = stmt.where(UserCoupon.usage_count < coupon.max_usage_per_user)
+    if db.session.execute(stmt).rowcount == 1:
+        return True
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(UserCoupon).values(user_id=user_id, coupon_id=coupon.id, usage_count=1))
+        return True
+    except IntegrityError:
+        # The row exists: either the limit is reached or a concurrent first use just created it.
+        return db.session.execute(stmt).rowcount == 1
+
+
+def _create_shards(coupon):
+    capacities = shard_capacities(coupon.max_total_usage, _shard_count())
+    try:
+        with db.session.begin_nested():
+            db.session.execute(
+                insert(CouponUsageShard),
+                [
+                    {"coupon_id": coupon.id, "shard_id": shard_id, "capacity": capacity, "usage_count": 0}
+                    for shard_id, capacity in enumerate(capacities)
+                ],
+            )
+    except IntegrityError:
+        pass  # another checkout created them first
+
+
+def _claim_shard(coupon_id: int, shard_ids) -> bool:
+    shard_ids = list(shard_ids)
+    if not shard_ids:
+        return False
+    start = random.randrange(len(shard_ids))
+    for shard_id in shard_ids[start:] + shard_ids[:start]:
+        result = db.session.execute(
+            update(CouponUsageShard)
+            .where(
+                CouponUsageShard.coupon_id == coupon_id,
+                CouponUsageShard.shard_id == shard_id,
+                CouponUsageShard.usage_count < CouponUsageShard.capacity,
+            )
+            .values(usage_count=CouponUsageShard.usage_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            return True
+    return False
+
+
+def _claim_global_slot(coupon) -> bool:
+    """Take one unit of max_total_usage from a randomly chosen shard.
+
+    The cap is split across shard rows up front, so concurrent checkouts lock
+    different rows and the shards can never add up to more than the cap.
+    Shards are created on first redemption; changing max_total_usage later
+    needs the coupon's shard rows to be deleted so they are re-split.
+    """
+    if not coupon.max_total_usage:
+        return True
+    expected = range(len(shard_capacities(coupon.max_total_usage, _shard_count())))
+    if _claim_shard(coupon.id, expected):
+        return True
+    existing = set(
+        db.session.execute(select(CouponUsageShard.shard_id).where(CouponUsageShard.coupon_id == coupon.id)).scalars()
+    )
+    if not existing:
+        _create_shards(coupon)
+        return _claim_shard(coupon.id, expected)
+    return _claim_shard(coupon.id, sorted(existing - set(expected)))
+
+
+def coupon_exhausted(coupon) -> bool:
+    """True once every shard of a capped coupon is full (one indexed lookup).
+
+    Checked when a coupon is applied; cart pricing uses coupon_index.is_exhausted.
+    """
+    if not coupon.max_total_usage:
+        return False
+    rows = db.session.execute(
+        select(CouponUsageShard.usage_count < CouponUsageShard.capacity).where(CouponUsageShard.coupon_id == coupon.id)
+    ).scalars().all()
+    return bool(rows) and not any(rows)
+
+
+def redeem_coupon(user_id: int, coupon) -> str:
+    """Record one use of coupon inside the caller's transaction; roll back unless REDEEMED."""
+    if not _claim_user_slot(user_id, coupon):
+        return RedemptionResult.USER_LIMIT
+    if not _claim_global_slot(coupon):
+        return RedemptionResult.EXHAUSTED
+    return RedemptionResult.REDEEMED
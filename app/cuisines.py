@@ -0,0 +1,36 @@
+# app/cuisines.py - default cuisine types and cuisine links for restaurants that have none
+from sqlalchemy import select
+
+from app.models import CuisineType, Restaurant, RestaurantCuisine
+
+DEFAULT_CUISINES = ("Turk", "Burger", "Pizza", "Doner", "Tatli", "Kahve")
+
+
+def ensure_cuisine_types(session) -> list:
+    """All cuisine types by name, creating the defaults when the table is empty."""
+    cuisines = session.scalars(select(CuisineType).order_by(CuisineType.name)).all()
+    if not cuisines:
+        session.add_all(CuisineType(name=name) for name in DEFAULT_CUISINES)
+        session.flush()
+        cuisines = session.scalars(select(CuisineType).order_by(CuisineType.name)).all()
+    return cuisines
+
+
+def _default_link(restaurant_id: int, cuisines) -> RestaurantCuisine:
+    return RestaurantCuisine(restaurant_id=restaurant_id, cuisine_id=cuisines[restaurant_id % len(cuisines)].id)
+
+
+def assign_default_cuisine(session, restaurant: Restaurant) -> None:
+    """Registration hook: give a new restaurant a cuisine so it shows up under a cuisine filter."""
+    session.flush()
+    session.add(_default_link(restaurant.id, ensure_cuisine_types(session)))
+
+
+def backfill_cuisines(session) -> int:
+    """Seed the default cuisine types and link every restaurant without a cuisine; safe to run repeatedly."""
+    cuisines = ensure_cuisine_types(session)
+    linked = select(RestaurantCuisine.restaurant_id)
+    missing = session.scalars(select(Restaurant.id).where(Restaurant.id.not_in(linked)).order_by(Restaurant.id)).all()
+    session.add_all(_default_link(restaurant_id, cuisines) for restaurant_id in missing)
+    session.flush()
+    return len(missing)
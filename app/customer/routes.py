@@ -1,20 +1,18 @@
 # app/customer/routes.py - customer-facing routes
+import uuid
 from datetime import datetime
 from flask import render_template, redirect, url_for, session, flash, request, abort
 from flask_login import login_required, current_user
-from sqlalchemy import func
+from sqlalchemy import false
 
 from app.customer import customer_bp
 from app.extensions import db
 from app.models import (
     Product,
     Order,
-    OrderItem,
     Restaurant,
-    ProductCategory,
     UserRole,
     Review,
-    RestaurantBranch,
     OrderStatus,
     UserAddress,
     Neighborhood,
@@ -24,13 +22,22 @@ from app.models import (
     District,
     FavoriteRestaurant,
     FavoriteProduct,
-    Coupon,
     UserCoupon,
-    DiscountType,
     OrderStatusHistory,
+    RestaurantStats,
 )
-from app.pagination import paginate
+from app.loading import order_detail_options, order_list_options
+from app.pagination import paginate_keyset
 from app.order_status import is_valid_status
+from app.cart_pricing import price_cart
+from app.cart_store import current_cart, current_cart_id, get_cart_store
+from app.menu_cache import get_menu_snapshot
+from app.checkout import CheckoutError, default_user_address, normalize_idempotency_key, parse_point, place_order
+from app.coupon_index import coupon_index
+from app.coupons import coupon_exhausted
+from app.db_routing import replica_read
+from app.search_index import search_matches
+from app.delivery_areas import serving_restaurants
 
 
 def customer_required():
@@ -42,67 +49,7 @@ def customer_required():
 
 
 def _get_cart():
-    return session.setdefault("cart", {})
-
-
-def _calculate_cart(cart_data, coupon_info=None, user_id=None):
-    subtotal = 0
-    for pid, qty in cart_data.items():
-        product = Product.query.get(int(pid))
-        if product:
-            subtotal += float(product.price) * qty
-
-    discount = 0
-    coupon_obj = None
-    if coupon_info:
-        coupon_obj = Coupon.query.get(coupon_info.get("id"))
-        if coupon_obj and coupon_obj.is_active:
-            now_valid = True
-            if coupon_obj.valid_from and coupon_obj.valid_from > datetime.utcnow():
-                now_valid = False
-            if coupon_obj.valid_to and coupon_obj.valid_to < datetime.utcnow():
-                now_valid = False
-            if now_valid and subtotal >= float(coupon_obj.min_order_amount or 0):
-                # usage check
-                if coupon_obj.max_usage_per_user:
-                    usage = UserCoupon.query.filter_by(user_id=user_id, coupon_id=coupon_obj.id).first()
-                    if usage and usage.usage_count >= coupon_obj.max_usage_per_user:
-                        now_valid = False
-                if now_valid:
-                    if coupon_obj.discount_type == DiscountType.PERCENT:
-                        discount = subtotal * float(coupon_obj.value) / 100
-                    else:
-                        discount = float(coupon_obj.value)
-                    discount = min(discount, subtotal)
-            else:
-                coupon_obj = None
-                discount = 0
-    total = max(0, subtotal - discount)
-    return subtotal, discount, total, coupon_obj
-
-
-def _get_branch_for_restaurant(restaurant_id: int):
-    """Pick an active branch for a restaurant; return None if not available."""
-    if not restaurant_id:
-        return None
-    return RestaurantBranch.query.filter_by(restaurant_id=restaurant_id, is_active=True).first()
-
-
-def _ensure_user_address(user_id: int, neighborhood_id: int):
-    """Fetch or create a simple default address for the user."""
-    addr = UserAddress.query.filter_by(user_id=user_id).first()
-    if addr:
-        return addr
-    addr = UserAddress(
-        user_id=user_id,
-        neighborhood_id=neighborhood_id,
-        title="Varsayılan Adres",
-        address_line="Adres girilmedi (otomatik)",
-        is_default=True,
-    )
-    db.session.add(addr)
-    db.session.flush()
-    return addr
+    return current_cart()
 
 
 @customer_bp.route("/customer/dashboard", endpoint="customer_dashboard")
@@ -121,32 +68,24 @@ def dashboard():
     return render_template("customer/dashboard.html", recent_orders=recent_orders, favorite_restaurants=favorite_restaurants)
 
 
+def _delivery_address():
+    """The address checkout delivers to; the listing shows only restaurants delivering there."""
+    if not current_user.is_authenticated or current_user.role != UserRole.CUSTOMER:
+        return None
+    return default_user_address(current_user.id)
+
+
 @customer_bp.route("/customer/restaurants", endpoint="customer_restaurants")
+@replica_read
 def restaurant_list():
+    # Read-only: cuisine types and links come from `flask cuisine backfill` and restaurant registration.
     cuisines = CuisineType.query.order_by(CuisineType.name).all()
-    if not cuisines:
-        default_names = ["Turk", "Burger", "Pizza", "Doner", "Tatli", "Kahve"]
-        for name in default_names:
-            db.session.add(CuisineType(name=name))
-        db.session.commit()
-        cuisines = CuisineType.query.order_by(CuisineType.name).all()
-
-    active_restaurants = Restaurant.query.filter_by(is_active=True).all()
-    existing_links = {
-        rest_id for (rest_id,) in db.session.query(RestaurantCuisine.restaurant_id).distinct().all()
-    }
-    missing_restaurants = [r for r in active_restaurants if r.id not in existing_links]
-    if cuisines and missing_restaurants:
-        for restaurant in missing_restaurants:
-            cuisine = cuisines[restaurant.id % len(cuisines)]
-            db.session.add(RestaurantCuisine(restaurant_id=restaurant.id, cuisine_id=cuisine.id))
-        db.session.commit()
 
     search_query = (request.args.get("q") or "").strip()
     cuisine_id = request.args.get("cuisine_id", type=int)
     min_rating = request.args.get("min_rating", type=float)
-    sort = request.args.get("sort") or "rating"
-    if sort not in {"rating", "min_order"}:
+    sort = request.args.get("sort") or ("relevance" if search_query else "rating")
+    if sort not in {"rating", "min_order", "relevance"} or (sort == "relevance" and not search_query):
         sort = "rating"
     if min_rating and (min_rating < 1 or min_rating > 5):
         min_rating = None
@@ -156,53 +95,44 @@ def restaurant_list():
     page = request.args.get("page", 1, type=int)
     per_page = 9
 
-    rating_subq = (
-        db.session.query(Review.restaurant_id.label("restaurant_id"), func.avg(Review.rating).label("avg_rating"))
-        .group_by(Review.restaurant_id)
-        .subquery()
+    query = (
+        db.session.query(Restaurant, RestaurantStats.avg_rating, RestaurantStats.min_order_amount)
+        .join(RestaurantStats, RestaurantStats.restaurant_id == Restaurant.id)
+        .filter(RestaurantStats.is_active == True)
     )
-    min_order_subq = (
-        db.session.query(
-            RestaurantBranch.restaurant_id.label("restaurant_id"),
-            func.min(RestaurantBranch.min_order_amount).label("min_order"),
-        )
-        .filter(RestaurantBranch.is_active == True)
-        .group_by(RestaurantBranch.restaurant_id)
-        .subquery()
-    )
-
-    query = Restaurant.query.filter_by(is_active=True)
+    delivery_address = _delivery_address()
+    if delivery_address:
+        query = query.filter(Restaurant.id.in_(serving_restaurants(delivery_address.neighborhood_id)))
+    matches = search_matches(search_query, db.engine.dialect.name) if search_query else None
     if search_query:
-        query = query.filter(Restaurant.name.ilike(f"%{search_query}%"))
+        if matches is None:
+            query = query.filter(false())
+        else:
+            query = query.join(matches, matches.c.restaurant_id == Restaurant.id)
     if cuisine_id:
         query = query.join(RestaurantCuisine, RestaurantCuisine.restaurant_id == Restaurant.id).filter(
             RestaurantCuisine.cuisine_id == cuisine_id
         )
-
-    query = query.outerjoin(rating_subq, rating_subq.c.restaurant_id == Restaurant.id)
-    query = query.outerjoin(min_order_subq, min_order_subq.c.restaurant_id == Restaurant.id)
-
     if min_rating:
-        query = query.filter(rating_subq.c.avg_rating >= min_rating)
+        query = query.filter(RestaurantStats.avg_rating >= min_rating)
 
-    if sort == "min_order":
-        query = query.order_by(func.coalesce(min_order_subq.c.min_order, 999999).asc(), Restaurant.name.asc())
+    if sort == "relevance" and matches is not None:
+        query = query.order_by(matches.c.score.desc(), RestaurantStats.avg_rating.desc(), Restaurant.name.asc())
+    elif sort == "min_order":
+        query = query.order_by(
+            RestaurantStats.min_order_amount.is_(None), RestaurantStats.min_order_amount.asc(), Restaurant.name.asc()
+        )
     else:
-        query = query.order_by(func.coalesce(rating_subq.c.avg_rating, 0).desc(), Restaurant.name.asc())
+        query = query.order_by(RestaurantStats.avg_rating.desc(), Restaurant.name.asc())
 
-    total = query.count()
+    total = query.order_by(None).count()
     pages = max(1, (total + per_page - 1) // per_page) if total else 1
     if page < 1:
         page = 1
     if page > pages:
         page = pages
 
-    rows = (
-        query.with_entities(Restaurant, rating_subq.c.avg_rating, min_order_subq.c.min_order)
-        .limit(per_page)
-        .offset((page - 1) * per_page)
-        .all()
-    )
+    rows = query.limit(per_page).offset((page - 1) * per_page).all()
 
     restaurant_ids = [r.id for r, _, _ in rows]
     cuisine_map = {}
@@ -246,34 +176,17 @@ def restaurant_list():
         selected_cuisine_id=cuisine_id or "",
         selected_min_rating=min_rating or "",
         selected_sort=sort,
+        delivery_address=delivery_address,
         page=page,
         pages=pages,
     )
 @customer_bp.route("/customer/restaurants/<int:restaurant_id>")
+@replica_read
 def restaurant_detail(restaurant_id):
-    restaurant = Restaurant.query.get_or_404(restaurant_id)
-    branch = RestaurantBranch.query.filter_by(restaurant_id=restaurant_id, is_active=True).first()
-    avg_rating = (
-        db.session.query(func.avg(Review.rating)).filter(Review.restaurant_id == restaurant_id).scalar()
-    )
-    categories = ProductCategory.query.filter_by(restaurant_id=restaurant_id).all()
-    # simple grouping
-    cat_list = []
-    for c in categories:
-        cat_list.append(
-            {
-                "id": c.id,
-                "name": c.name,
-                "products": Product.query.filter_by(category_id=c.id, is_active=True).all(),
-            }
-        )
-    return render_template(
-        "customer/restaurant_detail.html",
-        restaurant=restaurant,
-        branch=branch,
-        avg_rating=f"{avg_rating:.1f}" if avg_rating is not None else "-",
-        categories=cat_list,
-    )
+    snapshot = get_menu_snapshot(restaurant_id)
+    if snapshot is None:
+        abort(404)
+    return render_template("customer/restaurant_detail.html", **snapshot)
 
 
 @customer_bp.route("/customer/cart", endpoint="customer_cart")
@@ -282,18 +195,8 @@ def cart():
     gate = customer_required()
     if gate:
         return gate
-    cart_data = _get_cart()
-    items = []
-    for pid, qty in cart_data.items():
-        product = Product.query.get(int(pid))
-        if not product:
-            continue
-        subtotal = float(product.price) * qty
-        items.append({"id": product.id, "name": product.name, "quantity": qty, "unit_price": product.price, "subtotal": subtotal})
-
-    subtotal, discount, total, coupon_obj = _calculate_cart(cart_data, session.get("coupon"), current_user.id)
-    totals = {"subtotal": subtotal, "discount": discount, "total": total}
-    return render_template("customer/cart.html", cart_items=items, totals=totals, coupon=coupon_obj)
+    priced = price_cart(_get_cart(), session.get("coupon"), current_user.id)
+    return render_template("customer/cart.html", cart_items=priced.lines, totals=priced.totals, coupon=priced.coupon)
 
 
 def _redirect_back(default_endpoint: str = "customer_cart"):
@@ -322,9 +225,8 @@ def cart_add(product_id=None):
     if not product or not product.is_active:
         flash("Product not found or inactive.", "danger")
         return _redirect_back()
-    cart_data = _get_cart()
-    cart_data[str(pid)] = cart_data.get(str(pid), 0) + 1
-    session.modified = True
+    get_cart_store().add(current_cart_id(create=True), pid, 1)
+    db.session.commit()
     flash("Ürün sepete eklendi.", "success")
     return _redirect_back()
 
@@ -340,9 +242,10 @@ def cart_remove(product_id=None):
         pid = int(product_id or request.form.get("product_id", 0))
     except (TypeError, ValueError):
         pid = 0
-    cart_data = _get_cart()
-    cart_data.pop(str(pid), None)
-    session.modified = True
+    cart_id = current_cart_id()
+    if cart_id and pid:
+        get_cart_store().remove(cart_id, pid)
+        db.session.commit()
     flash("Ürün sepetten çıkarıldı.", "info")
     return _redirect_back()
 
@@ -369,12 +272,10 @@ def cart_decrease(product_id=None):
         pid = int(product_id or request.form.get("product_id", 0))
     except (TypeError, ValueError):
         pid = 0
-    cart_data = _get_cart()
-    if str(pid) in cart_data:
-        cart_data[str(pid)] = max(0, cart_data[str(pid)] - 1)
-        if cart_data[str(pid)] == 0:
-            cart_data.pop(str(pid))
-    session.modified = True
+    cart_id = current_cart_id()
+    if cart_id and pid:
+        get_cart_store().add(cart_id, pid, -1)
+        db.session.commit()
     flash("Adet güncellendi.", "info")
     return redirect(url_for("customer_cart"))
 
@@ -389,9 +290,8 @@ def apply_coupon():
     if not code:
         flash("Kupon kodu girin.", "warning")
         return redirect(url_for("customer_cart"))
-    cart_data = _get_cart()
-    subtotal, _, _, _ = _calculate_cart(cart_data, None, current_user.id)
-    coupon = Coupon.query.filter_by(code=code, is_active=True).first()
+    subtotal = price_cart(_get_cart(), None, current_user.id).subtotal
+    coupon = coupon_index.get_by_code(code)
     if not coupon:
         flash("Kupon bulunamadı veya aktif değil.", "danger")
         session.pop("coupon", None)
@@ -414,6 +314,11 @@ def apply_coupon():
             flash("Kupon kullanım hakkınız dolmuş.", "warning")
             session.pop("coupon", None)
             return redirect(url_for("customer_cart"))
+    if coupon_exhausted(coupon):
+        coupon_index.mark_exhausted(coupon.id)
+        flash("Kupon kullanım limiti doldu.", "warning")
+        session.pop("coupon", None)
+        return redirect(url_for("customer_cart"))
 
     session["coupon"] = {"id": coupon.id, "code": coupon.code}
     flash("Kupon uygulandı.", "success")
@@ -434,24 +339,15 @@ def order_summary():
     gate = customer_required()
     if gate:
         return gate
-    cart_data = _get_cart()
-    items = []
-    total = 0
-    for pid, qty in cart_data.items():
-        product = Product.query.get(int(pid))
-        if not product:
-            continue
-        subtotal = float(product.price) * qty
-        total += subtotal
-        items.append({"id": product.id, "name": product.name, "quantity": qty, "total_price": subtotal})
-    totals = {"subtotal": total, "discount": 0, "total": total}
+    priced = price_cart(_get_cart(), session.get("coupon"), current_user.id)
     context = {
         "selected_address": "Adres bilgisi",
-        "restaurant": items[0] if items else None,
-        "order_items": items,
-        "totals": totals,
+        "restaurant": priced.lines[0] if priced.lines else None,
+        "order_items": priced.lines,
+        "totals": priced.totals,
         "order": {"status": OrderStatus.PENDING},
         "progress_percent": 20,
+        "idempotency_key": uuid.uuid4().hex,
     }
     return render_template("customer/order_summary.html", **context)
 
@@ -471,60 +367,16 @@ def order_complete():
     gate = customer_required()
     if gate:
         return gate
-    cart_data = _get_cart()
-    if not cart_data:
-        flash("Sepet boş.", "warning")
-        return redirect(url_for("customer_cart"))
-    # Basit sipariş oluşturma (örnek)
-    first_product = Product.query.get(int(next(iter(cart_data.keys()))))
-    if not first_product:
-        flash("Cart has invalid items.", "danger")
-        return redirect(url_for("customer_cart"))
-    restaurant_id = first_product.restaurant_id
-    branch = _get_branch_for_restaurant(restaurant_id)
-    if not branch:
-        flash("Bu restoran için aktif bir şube tanımlı değil.", "danger")
+    key = normalize_idempotency_key(request.form.get("idempotency_key") or request.headers.get("Idempotency-Key"))
+    try:
+        _order, created = place_order(current_user.id, _get_cart(), session.get("coupon"), key)
+    except CheckoutError as exc:
+        flash(str(exc), exc.category)
         return redirect(url_for("customer_cart"))
-
-    # Ensure we have a user address (schema requires not-null address_id)
-    address = _ensure_user_address(current_user.id, branch.neighborhood_id)
-
-    order = Order(user_id=current_user.id, branch_id=branch.id, address_id=address.id, total_amount=0, final_amount=0)
-    db.session.add(order)
-    db.session.flush()
-    subtotal = 0
-    for pid, qty in cart_data.items():
-        product = Product.query.get(int(pid))
-        if not product:
-            continue
-        item_total = float(product.price) * qty
-        subtotal += item_total
-        db.session.add(OrderItem(order_id=order.id, product_id=product.id, quantity=qty, unit_price=product.price))
-    # Apply coupon if any
-    coupon_info = session.get("coupon")
-    subtotal_calc, discount, total, coupon_obj = _calculate_cart(cart_data, coupon_info, current_user.id)
-    order.total_amount = subtotal_calc
-    order.final_amount = total
-    if coupon_obj:
-        order.coupon_id = coupon_obj.id
-        usage = UserCoupon.query.filter_by(user_id=current_user.id, coupon_id=coupon_obj.id).first()
-        if not usage:
-            usage = UserCoupon(user_id=current_user.id, coupon_id=coupon_obj.id, usage_count=0)
-            db.session.add(usage)
-        usage.usage_count += 1
-    # initial status history
-    db.session.add(
-        OrderStatusHistory(
-            order_id=order.id,
-            old_status=OrderStatus.PENDING,
-            new_status=OrderStatus.PENDING,
-            changed_by_user_id=current_user.id,
-        )
-    )
+    get_cart_store().clear(current_cart_id())
     db.session.commit()
-    session["cart"] = {}
     session.pop("coupon", None)
-    flash("Sipariş oluşturuldu.", "success")
+    flash("Sipariş oluşturuldu." if created else "Sipariş zaten oluşturuldu.", "success")
     return redirect(url_for("customer_orders"))
 
 
@@ -535,15 +387,13 @@ def orders():
     if gate:
         return gate
     status_filter = request.args.get("status")
-    query = Order.query.filter_by(user_id=current_user.id)
+    query = Order.query.options(*order_list_options("customer")).filter_by(user_id=current_user.id)
     if status_filter and is_valid_status(status_filter):
         query = query.filter(Order.status == status_filter)
     else:
         status_filter = ""
-    page = request.args.get("page", 1, type=int)
-    per_page = 10
-    orders_list, page, pages, total = paginate(query.order_by(Order.id.desc()), page, per_page)
-    return render_template("customer/orders.html", orders=orders_list, status_filter=status_filter, page=page, pages=pages)
+    pager = paginate_keyset(query, Order.id, request.args.get("cursor"), per_page=10)
+    return render_template("customer/orders.html", orders=pager.items, status_filter=status_filter, pager=pager)
 
 
 @customer_bp.route("/customer/orders/<int:order_id>")
@@ -552,7 +402,7 @@ def order_detail(order_id):
     gate = customer_required()
     if gate:
         return gate
-    order = Order.query.get_or_404(order_id)
+    order = Order.query.options(*order_detail_options()).filter(Order.id == order_id).first_or_404()
     if order.user_id != current_user.id:
         flash("Bu sipariş size ait değil.", "danger")
         return redirect(url_for("customer_orders"))
@@ -695,8 +545,15 @@ def addresses():
                 db.session.add(neighborhood)
                 db.session.flush()
             neighborhood_id = neighborhood.id
+        point, point_invalid = None, False
+        try:
+            point = parse_point(request.form.get("latitude"), request.form.get("longitude"))
+        except ValueError:
+            point_invalid = True
         if not address_line or not neighborhood_id:
             flash("Adres ve mahalle zorunlu.", "danger")
+        elif point_invalid:
+            flash("Konum için geçerli bir enlem ve boylam girin.", "danger")
         else:
             # unset previous default if new default chosen
             make_default = bool(request.form.get("is_default"))
@@ -708,6 +565,8 @@ def addresses():
                 title=title,
                 address_line=address_line,
                 is_default=make_default,
+                latitude=point[0] if point else None,
+                longitude=point[1] if point else None,
             )
             db.session.add(addr)
             db.session.commit()
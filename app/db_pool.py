@@ -0,0 +1,97 @@
+# app/db_pool.py - connection pool sizing from the environment and checkout wait tracking
+import logging
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger("app.db_pool")
+
+pool_stats = {"checkouts": 0, "waits": 0, "wait_seconds_total": 0.0, "max_wait_seconds": 0.0, "timeouts": 0}
+_stats_lock = threading.Lock()
+
+DEFAULT_POOL_SIZE = 5
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that measures how long each checkout waited for a free connection.
+
+    Waits longer than slow_checkout seconds, and checkouts that time out,
+    are logged with the pool state at that moment.
+    """
+
+    slow_checkout = 0.1
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            with _stats_lock:
+                pool_stats["timeouts"] += 1
+            logger.error("db pool exhausted after %.0f ms; %s", (time.perf_counter() - started) * 1000, self.status())
+            raise
+        waited = time.perf_counter() - started
+        with _stats_lock:
+            pool_stats["checkouts"] += 1
+            if waited >= self.slow_checkout:
+                pool_stats["waits"] += 1
+                pool_stats["wait_seconds_total"] += waited
+                pool_stats["max_wait_seconds"] = max(pool_stats["max_wait_seconds"], waited)
+        if waited >= self.slow_checkout:
+            logger.warning("db pool checkout waited %.0f ms; %s", waited * 1000, self.status())
+        return conn
+
+
+def _is_memory_sqlite(uri: str) -> bool:
+    url = make_url(uri)
+    return url.drivername.startswith("sqlite") and url.database in (None, "", ":memory:")
+
+
+def sized_pool(config) -> dict:
+    """pool_size/max_overflow for one worker process.
+
+    Each worker keeps one connection per request thread. Without WEB_THREADS
+    the thread count is unbounded (Werkzeug's threaded server), so the pool
+    keeps SQLAlchemy's default size. Overflow takes the rest of this worker's
+    share of DB_MAX_CONNECTIONS, so all workers together stay under the
+    server limit.
+    """
+    workers = max(1, config.get("WEB_CONCURRENCY") or 1)
+    threads = config.get("WEB_THREADS")
+    pool_size = config.get("DB_POOL_SIZE") or (max(1, threads) if threads else DEFAULT_POOL_SIZE)
+    max_overflow = config.get("DB_MAX_OVERFLOW")
+    if max_overflow is None:
+        max_overflow = max(0, config.get("DB_MAX_CONNECTIONS", 150) // workers - pool_size)
+    return {"pool_size": pool_size, "max_overflow": max_overflow}
+
+
+def engine_options(config) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS built from DB_POOL_* settings; explicit options win."""
+    options = {
+        "pool_pre_ping": config.get("DB_POOL_PRE_PING", True),
+        "pool_recycle": config.get("DB_POOL_RECYCLE", 280),
+    }
+    if not _is_memory_sqlite(config["SQLALCHEMY_DATABASE_URI"]):
+        options.update(sized_pool(config))
+        options["pool_timeout"] = config.get("DB_POOL_TIMEOUT", 10)
+        options["poolclass"] = TimedQueuePool
+    options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    return options
+
+
+def pool_status(engine) -> dict:
+    pool = engine.pool
+    status = {"class": type(pool).__name__, "status": pool.status()}
+    for attr in ("size", "checkedin", "checkedout", "overflow"):
+        reader = getattr(pool, attr, None)
+        if reader is not None:
+            status[attr] = reader()
+    status["timeout"] = getattr(pool, "_timeout", None)
+    status["recycle"] = getattr(pool, "_recycle", None)
+    status["pre_ping"] = getattr(pool, "_pre_ping", None)
+    with _stats_lock:
+        status["stats"] = dict(pool_stats)
+    return status
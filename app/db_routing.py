@@ -0,0 +1,130 @@
+# app/db_routing.py - send read-only views to replica binds, pin recent writers to the primary
+import random
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import Select, event
+from sqlalchemy.orm import Session
+
+from app.session_changes import has_changes, on_commit, record_change
+
+PRIMARY_UNTIL_KEY = "_primary_until"
+DEFAULT_STICKY_SECONDS = 5
+
+routing_stats = {"replica_requests": 0, "pinned_requests": 0, "write_pins": 0}
+
+
+def replica_read(view):
+    """Mark a view as safe to serve from a replica on GET/HEAD."""
+    view.replica_read = True
+    return view
+
+
+def primary_read(func):
+    """Run func against the primary even inside a replica-read request.
+
+    Loaders of process-wide caches use this so a lagging replica's rows are
+    never cached and then served to requests that read from the primary.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not has_request_context() or g.get("db_replica") is None:
+            return func(*args, **kwargs)
+        replica, g.db_replica = g.db_replica, None
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if not g.get("db_wrote"):
+                g.db_replica = replica
+
+    return wrapper
+
+
+class RoutingSession(FlaskSession):
+    """Session that sends plain SELECTs to the request's replica, if one was chosen.
+
+    DML, flushes and every read after a write in the same transaction use the
+    normal binds, as does anything outside a routed request.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and isinstance(clause, Select) and not has_changes(self, "db_wrote") and has_request_context():
+            replica = g.get("db_replica")
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_engines(config) -> list:
+    """One engine per SQLALCHEMY_REPLICA_URIS entry, sized like the primary.
+
+    They are kept out of SQLALCHEMY_BINDS so no models or metadata are
+    registered for them; only RoutingSession.get_bind ever returns them.
+    """
+    from sqlalchemy import create_engine
+
+    from app.db_pool import engine_options
+
+    return [
+        create_engine(uri, **engine_options(dict(config, SQLALCHEMY_DATABASE_URI=uri)))
+        for uri in config.get("SQLALCHEMY_REPLICA_URIS") or ()
+    ]
+
+
+def pin_to_primary(seconds=None) -> None:
+    """Keep this browser session on the primary for the next few seconds."""
+    if seconds is None:
+        seconds = current_app.config.get("REPLICA_STICKY_SECONDS", DEFAULT_STICKY_SECONDS)
+    session[PRIMARY_UNTIL_KEY] = time.time() + seconds
+
+
+@event.listens_for(Session, "before_flush")
+def _mark_flush_write(session_, flush_context, instances):
+    # Set before the flush runs so loads it triggers go to the primary as well.
+    record_change(session_, "db_wrote")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dml_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        record_change(orm_execute_state.session, "db_wrote")
+
+
+@on_commit("db_wrote")
+def _after_write_commit(_changes):
+    if not has_request_context():
+        return
+    # Later reads in this request must see the write too.
+    g.db_wrote = True
+    g.db_replica = None
+
+
+def init_db_routing(app) -> None:
+    """Create the replica engines (app.extensions["db_replicas"]) and the per-request routing hooks."""
+    replicas = app.extensions["db_replicas"] = replica_engines(app.config)
+    if not replicas:
+        return
+
+    @app.before_request
+    def _choose_bind():
+        g.db_replica = None
+        if request.method not in ("GET", "HEAD"):
+            return
+        view = app.view_functions.get(request.endpoint)
+        if not getattr(view, "replica_read", False):
+            return
+        if session.get(PRIMARY_UNTIL_KEY, 0) > time.time():
+            routing_stats["pinned_requests"] += 1
+            return
+        g.db_replica = random.choice(replicas)
+        routing_stats["replica_requests"] += 1
+
+    @app.after_request
+    def _stick_after_write(response):
+        if g.get("db_wrote"):
+            routing_stats["write_pins"] += 1
+            pin_to_primary()
+        return response
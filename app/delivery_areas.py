@@ -0,0 +1,106 @@
+# app/delivery_areas.py - neighborhood -> branch coverage index expanded from DeliveryArea, kept in sync on flush
+from sqlalchemy import delete, event, insert, inspect, select, union
+from sqlalchemy.orm import Session, aliased
+
+from app.models import BranchCoverage, DeliveryArea, Neighborhood, RestaurantBranch
+
+
+def _coverage_rows(conn, branch_ids=None):
+    """(neighborhood_id, restaurant_id, branch_id) for active branches.
+
+    A branch covers its listed neighborhoods and every neighborhood of its
+    listed districts; a branch with no areas covers its own district.
+    """
+    branches = select(RestaurantBranch.id, RestaurantBranch.restaurant_id).where(RestaurantBranch.is_active == True)  # noqa: E712
+    if branch_ids is not None:
+        branches = branches.where(RestaurantBranch.id.in_(branch_ids))
+    branches = branches.subquery()
+    has_areas = select(DeliveryArea.id).where(DeliveryArea.branch_id == branches.c.id).exists()
+    home = aliased(Neighborhood)
+
+    by_neighborhood = select(DeliveryArea.neighborhood_id, branches.c.restaurant_id, branches.c.id).join(
+        branches, DeliveryArea.branch_id == branches.c.id
+    ).where(DeliveryArea.neighborhood_id.is_not(None))
+    by_district = (
+        select(Neighborhood.id, branches.c.restaurant_id, branches.c.id)
+        .select_from(DeliveryArea)
+        .join(branches, DeliveryArea.branch_id == branches.c.id)
+        .join(Neighborhood, Neighborhood.district_id == DeliveryArea.district_id)
+    )
+    by_home_district = (
+        select(Neighborhood.id, branches.c.restaurant_id, branches.c.id)
+        .select_from(branches)
+        .join(RestaurantBranch, RestaurantBranch.id == branches.c.id)
+        .join(home, home.id == RestaurantBranch.neighborhood_id)
+        .join(Neighborhood, Neighborhood.district_id == home.district_id)
+        .where(~has_areas)
+    )
+    rows = conn.execute(union(by_neighborhood, by_district, by_home_district))
+    return [{"neighborhood_id": n, "restaurant_id": r, "branch_id": b} for n, r, b in rows]
+
+
+def rebuild_coverage(conn, branch_ids=None) -> int:
+    """Replace coverage rows (all, or only branch_ids) from branches and their delivery areas."""
+    if branch_ids is not None and not branch_ids:
+        return 0
+    ids = sorted(branch_ids) if branch_ids is not None else None
+    stmt = delete(BranchCoverage)
+    if ids is not None:
+        stmt = stmt.where(BranchCoverage.branch_id.in_(ids))
+    conn.execute(stmt)
+    rows = _coverage_rows(conn, ids)
+    if rows:
+        conn.execute(insert(BranchCoverage), rows)
+    return len(rows)
+
+
+def serving_restaurants(neighborhood_id: int):
+    """Select of restaurant ids with an active branch delivering to the neighborhood."""
+    return select(BranchCoverage.restaurant_id).where(BranchCoverage.neighborhood_id == neighborhood_id)
+
+
+def _changed(obj, *attrs):
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def _branches_in_districts(conn, district_ids):
+    """Branches whose coverage depends on the neighborhoods of these districts."""
+    listed = select(DeliveryArea.branch_id).where(DeliveryArea.district_id.in_(district_ids))
+    located = (
+        select(RestaurantBranch.id)
+        .join(Neighborhood, Neighborhood.id == RestaurantBranch.neighborhood_id)
+        .where(Neighborhood.district_id.in_(district_ids))
+    )
+    return set(conn.execute(union(listed, located)).scalars())
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_coverage(session, _flush_context):
+    branches = set()
+    districts = set()
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, DeliveryArea):
+            branches.add(obj.branch_id)
+        elif isinstance(obj, RestaurantBranch):
+            branches.add(obj.id)
+        elif isinstance(obj, Neighborhood):
+            districts.add(obj.district_id)
+    for obj in session.dirty:
+        if isinstance(obj, DeliveryArea) and _changed(obj, "branch_id", "neighborhood_id", "district_id"):
+            branches.add(obj.branch_id)
+            branches.update(inspect(obj).attrs.branch_id.history.deleted)
+        elif isinstance(obj, RestaurantBranch) and _changed(obj, "is_active", "neighborhood_id", "restaurant_id"):
+            branches.add(obj.id)
+        elif isinstance(obj, Neighborhood) and _changed(obj, "district_id"):
+            districts.add(obj.district_id)
+            districts.update(inspect(obj).attrs.district_id.history.deleted)
+    districts.discard(None)
+    if not (branches or districts):
+        return
+
+    conn = session.connection()
+    if districts:
+        branches.update(_branches_in_districts(conn, sorted(districts)))
+    branches.discard(None)
+    rebuild_coverage(conn, branches)
@@ -0,0 +1,129 @@
+# app/identity.py - cached login principals so load_user can skip the User lookup
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.db_routing import primary_read
+from app.extensions import db
+from app.models import Restaurant, User
+from app.session_changes import on_commit, record_change
+
+DEFAULT_TTL = 30
+DEFAULT_SIZE = 4096
+
+
+class Principal(UserMixin):
+    """What the request needs to know about the logged-in user.
+
+    Views only read current_user.id/.role/.name; load the User row explicitly
+    when anything else is needed.
+    """
+
+    __slots__ = ("id", "role", "name", "restaurant_ids")
+
+    def __init__(self, id, role, name, restaurant_ids=()):
+        self.id = id
+        self.role = role
+        self.name = name
+        self.restaurant_ids = tuple(restaurant_ids)
+
+    def __repr__(self):
+        return f"<Principal {self.id} {self.role}>"
+
+
+class IdentityCache:
+    """LRU of principals by user id; entries expire after USER_CACHE_TTL seconds.
+
+    Commits touching a User or a Restaurant evict the affected users in this
+    process; the TTL bounds staleness for changes made by other workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _config(self, key, default):
+        if has_app_context():
+            return current_app.config.get(key, default)
+        return default
+
+    def get(self, user_id: int):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                self.stats["hits"] += 1
+                return entry[0]
+            self.stats["misses"] += 1
+
+        principal = _load_principal(user_id)
+        size = self._config("USER_CACHE_SIZE", DEFAULT_SIZE)
+        if principal is None or size <= 0:
+            return principal
+        with self._lock:
+            self._entries[user_id] = (principal, now + self._config("USER_CACHE_TTL", DEFAULT_TTL))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, *user_ids) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@primary_read
+def _load_principal(user_id: int):
+    """One query: the user's columns plus the ids of the restaurants they own."""
+    rows = db.session.execute(
+        select(User.id, User.role, User.name, Restaurant.id)
+        .outerjoin(Restaurant, Restaurant.owner_id == User.id)
+        .where(User.id == user_id)
+        .order_by(Restaurant.id)
+    ).all()
+    if not rows:
+        return None
+    uid, role, name, _ = rows[0]
+    return Principal(uid, role, name, [row[3] for row in rows if row[3] is not None])
+
+
+identity_cache = IdentityCache()
+
+
+def load_principal(user_id: int):
+    return identity_cache.get(user_id)
+
+
+def _affected_users(obj):
+    if isinstance(obj, User):
+        return {obj.id}
+    if isinstance(obj, Restaurant):
+        # Ownership transfers change two principals.
+        return {obj.owner_id, *inspect(obj).attrs.owner_id.history.deleted}
+    return set()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_identity_changes(session, _flush_context):
+    touched = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        touched.update(_affected_users(obj))
+    if touched:
+        record_change(session, "identity_changes", touched)
+
+
+@on_commit("identity_changes")
+def _invalidate_after_commit(touched):
+    identity_cache.invalidate(*touched)
@@ -0,0 +1,40 @@
+# app/loading.py - explicit loader strategies for order views, with an optional lazy-load guard
+from flask import current_app, has_app_context
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+from app.models import Order, OrderItem, RestaurantBranch
+
+_BRANCH_RESTAURANT = joinedload(Order.branch).joinedload(RestaurantBranch.restaurant)
+
+# What each order list template reads per row.
+ORDER_LIST_LOADERS = {
+    "customer": (_BRANCH_RESTAURANT,),
+    "restaurant": (joinedload(Order.user),),
+    "admin": (joinedload(Order.user), _BRANCH_RESTAURANT),
+}
+
+ORDER_DETAIL_LOADERS = (
+    joinedload(Order.user),
+    joinedload(Order.address),
+    _BRANCH_RESTAURANT,
+    selectinload(Order.items).joinedload(OrderItem.product),
+)
+
+
+def strict_loading() -> bool:
+    return has_app_context() and bool(current_app.config.get("STRICT_LOADING"))
+
+
+def with_loaders(*loaders):
+    """Loader options for a view; with STRICT_LOADING any other lazy load on the row raises."""
+    if strict_loading():
+        return (*loaders, raiseload("*"))
+    return loaders
+
+
+def order_list_options(view: str):
+    return with_loaders(*ORDER_LIST_LOADERS[view])
+
+
+def order_detail_options():
+    return with_loaders(*ORDER_DETAIL_LOADERS)
@@ -1,22 +1,178 @@
-# app/logging_config.py - application logging setup
+# app/logging_config.py - application logging setup (queued JSON lines off the request thread)
+import atexit
+import copy
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from flask import g, has_request_context, request
+
+DEFAULT_QUEUE_SIZE = 10000
+REQUEST_ID_HEADER = "X-Request-ID"
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+REQUEST_FIELDS = ("request_id", "endpoint", "method", "path", "status", "latency_ms", "sql_queries", "sql_ms")
+
+log_stats = {"dropped": 0, "sampled_out": 0}
+_stats_lock = threading.Lock()
+_traceback_formatter = logging.Formatter()
+
+
+def _count(stat: str) -> None:
+    with _stats_lock:
+        log_stats[stat] += 1
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records logged inside a request with its id and endpoint."""
+
+    def filter(self, record):
+        if has_request_context():
+            if not hasattr(record, "request_id"):
+                record.request_id = g.get("request_id")
+            if not hasattr(record, "endpoint"):
+                record.endpoint = request.endpoint
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of INFO-and-below records; warnings and errors always pass.
+
+    Sampling is keyed on the request id, so a kept request keeps all its lines.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if self.rate >= 1 or record.levelno > logging.INFO:
+            return True
+        request_id = getattr(record, "request_id", None)
+        score = (zlib.crc32(request_id.encode()) % 10000) / 10000 if request_id else random.random()
+        if score < self.rate:
+            return True
+        _count("sampled_out")
+        return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: a full queue drops the record and counts it."""
+
+    def prepare(self, record):
+        # The base class formats the whole record into msg and drops exc_info;
+        # keep the traceback as exc_text so the listener's JsonFormatter gets it.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _count("dropped")
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in REQUEST_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def _request_id():
+    incoming = request.headers.get(REQUEST_ID_HEADER, "")
+    return incoming if _REQUEST_ID.match(incoming) else uuid.uuid4().hex
+
+
+def register_request_logging(app):
+    """Give every request an id and write one access line with latency and SQL stats."""
+
+    @app.before_request
+    def _start_request_log():
+        g.request_id = _request_id()
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _log_request(response):
+        started = g.get("request_started")
+        if started is None:
+            return response
+        response.headers[REQUEST_ID_HEADER] = g.request_id
+        if not app.config.get("LOG_ACCESS", True):
+            return response
+        profile = g.get("sql_profile")
+        app.logger.info(
+            "%s %s %s",
+            request.method,
+            request.path,
+            response.status_code,
+            extra={
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+                "sql_queries": profile.count if profile else None,
+                "sql_ms": round(profile.db_time * 1000, 1) if profile else None,
+            },
+        )
+        return response
+
+
+def build_queue_logging(log_path: str, queue_size: int = DEFAULT_QUEUE_SIZE, sample_rate: float = 1.0):
+    """Return (queue_handler, listener); the listener thread owns the rotating file."""
+    log_queue = queue.Queue(maxsize=queue_size)
+    file_handler = RotatingFileHandler(log_path, maxBytes=1_000_000, backupCount=3)
+    file_handler.setLevel(logging.INFO)
+    file_handler.setFormatter(JsonFormatter())
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.setLevel(logging.INFO)
+    queue_handler.addFilter(RequestContextFilter())
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    return queue_handler, listener
 
 
 def configure_logging(app):
+    register_request_logging(app)
     if app.testing or app.debug:
         return
-    log_dir = os.path.abspath(os.path.join(app.root_path, "..", "logs"))
+    log_dir = app.config.get("LOG_DIR") or os.path.abspath(os.path.join(app.root_path, "..", "logs"))
     os.makedirs(log_dir, exist_ok=True)
     log_path = os.path.join(log_dir, "hemenye.log")
 
-    if any(isinstance(handler, RotatingFileHandler) for handler in app.logger.handlers):
+    if any(isinstance(handler, QueueHandler) for handler in app.logger.handlers):
         return
 
-    file_handler = RotatingFileHandler(log_path, maxBytes=1_000_000, backupCount=3)
-    file_handler.setLevel(logging.INFO)
-    formatter = logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s")
-    file_handler.setFormatter(formatter)
+    queue_handler, listener = build_queue_logging(
+        log_path,
+        queue_size=app.config.get("LOG_QUEUE_SIZE", DEFAULT_QUEUE_SIZE),
+        sample_rate=app.config.get("LOG_INFO_SAMPLE_RATE", 1.0),
+    )
+    listener.start()
+    atexit.register(listener.stop)
     app.logger.setLevel(logging.INFO)
-    app.logger.addHandler(file_handler)
+    app.logger.addHandler(queue_handler)
@@ -0,0 +1,192 @@
+# app/menu_cache.py - size-bounded cache of compiled restaurant menus, keyed by a version stored in the database
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.db_routing import primary_read
+from app.extensions import db
+from app.models import (
+    Product,
+    ProductCategory,
+    ProductOption,
+    ProductOptionGroup,
+    ProductProductOptionGroup,
+    Restaurant,
+    RestaurantBranch,
+    RestaurantStats,
+    Review,
+)
+from app.session_changes import on_commit, record_change
+
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_CACHE_TTL = 60
+
+_lock = threading.Lock()
+_snapshots = OrderedDict()
+cache_stats = {"hits": 0, "misses": 0}
+
+
+def menu_version(restaurant_id: int) -> int:
+    """The restaurant's RestaurantStats.menu_version (one primary-key lookup); 0 without a stats row.
+
+    In a replica-read request this runs on the replica. A lagging version can
+    only pick an older cache key; snapshots are always compiled from the
+    primary, so none is older than its key.
+    """
+    version = db.session.execute(
+        select(RestaurantStats.menu_version).where(RestaurantStats.restaurant_id == restaurant_id)
+    ).scalar()
+    return version or 0
+
+
+def bump_menu_version(connection, restaurant_ids) -> None:
+    """Move each restaurant's menu to a new version inside the writing transaction.
+
+    Every worker reads the version per request, so none serves the old snapshot
+    once the write commits.
+    """
+    ids = sorted(rid for rid in restaurant_ids if rid is not None)
+    if ids:
+        connection.execute(
+            update(RestaurantStats)
+            .where(RestaurantStats.restaurant_id.in_(ids))
+            .values(menu_version=RestaurantStats.menu_version + 1)
+        )
+
+
+def _evict(*restaurant_ids) -> None:
+    """Drop this worker's snapshots of the restaurants; their keys are outdated anyway."""
+    with _lock:
+        for key in [k for k in _snapshots if k[0] in restaurant_ids]:
+            del _snapshots[key]
+
+
+def clear_menu_cache() -> None:
+    with _lock:
+        _snapshots.clear()
+
+
+@primary_read
+def compile_menu(restaurant_id: int):
+    """Load a restaurant page snapshot in a fixed number of queries; None if missing."""
+    row = (
+        db.session.query(Restaurant, RestaurantStats.avg_rating)
+        .outerjoin(RestaurantStats, RestaurantStats.restaurant_id == Restaurant.id)
+        .filter(Restaurant.id == restaurant_id)
+        .first()
+    )
+    if not row:
+        return None
+    restaurant, avg_rating = row
+    branch = RestaurantBranch.query.filter_by(restaurant_id=restaurant_id, is_active=True).first()
+    categories = ProductCategory.query.filter_by(restaurant_id=restaurant_id).order_by(ProductCategory.id).all()
+    products = Product.query.filter_by(restaurant_id=restaurant_id, is_active=True).order_by(Product.id).all()
+
+    groups = {
+        g.id: {"id": g.id, "name": g.name, "is_required": bool(g.is_required), "min_select": g.min_select, "max_select": g.max_select, "options": []}
+        for g in ProductOptionGroup.query.filter_by(restaurant_id=restaurant_id).order_by(ProductOptionGroup.id).all()
+    }
+    if groups:
+        options = (
+            ProductOption.query.filter(ProductOption.option_group_id.in_(list(groups)), ProductOption.is_active == True)
+            .order_by(ProductOption.id)
+            .all()
+        )
+        for opt in options:
+            groups[opt.option_group_id]["options"].append({"id": opt.id, "name": opt.name, "extra_price": opt.extra_price})
+    product_groups = {}
+    if groups:
+        links = ProductProductOptionGroup.query.filter(ProductProductOptionGroup.option_group_id.in_(list(groups))).all()
+        for link in links:
+            product_groups.setdefault(link.product_id, []).append(groups[link.option_group_id])
+
+    products_by_category = {}
+    for p in products:
+        products_by_category.setdefault(p.category_id, []).append(
+            {
+                "id": p.id,
+                "name": p.name,
+                "description": p.description,
+                "price": p.price,
+                "option_groups": product_groups.get(p.id, []),
+            }
+        )
+    return {
+        "restaurant": {"id": restaurant.id, "name": restaurant.name, "phone": restaurant.phone, "is_active": bool(restaurant.is_active)},
+        "branch": {"id": branch.id, "address_line": branch.address_line, "phone": branch.phone} if branch else None,
+        "avg_rating": f"{avg_rating:.1f}" if avg_rating is not None else "-",
+        "categories": [
+            {"id": c.id, "name": c.name, "products": products_by_category.get(c.id, [])} for c in categories
+        ],
+    }
+
+
+def get_menu_snapshot(restaurant_id: int):
+    """Return the cached snapshot for the current menu version, compiling it on a miss.
+
+    The version is read from the database on every call, so writes made through
+    any worker are seen at once; the TTL only bounds how long unused snapshots
+    hold memory.
+    """
+    max_size = current_app.config.get("MENU_CACHE_SIZE", DEFAULT_CACHE_SIZE)
+    ttl = current_app.config.get("MENU_CACHE_TTL", DEFAULT_CACHE_TTL)
+    key = (restaurant_id, menu_version(restaurant_id))
+    now = time.monotonic()
+    with _lock:
+        entry = _snapshots.get(key)
+        if entry and entry[1] > now:
+            _snapshots.move_to_end(key)
+            cache_stats["hits"] += 1
+            return entry[0]
+        cache_stats["misses"] += 1
+
+    snapshot = compile_menu(restaurant_id)
+    if snapshot is None or max_size <= 0:
+        return snapshot
+    with _lock:
+        _snapshots[key] = (snapshot, now + ttl)
+        _snapshots.move_to_end(key)
+        while len(_snapshots) > max_size:
+            _snapshots.popitem(last=False)
+    return snapshot
+
+
+_MENU_MODELS = (Product, ProductCategory, ProductOptionGroup, RestaurantBranch, Review)
+
+
+def _owning_restaurants(session, obj):
+    if isinstance(obj, Restaurant):
+        return {obj.id}
+    if isinstance(obj, RestaurantStats):
+        return {obj.restaurant_id}
+    if isinstance(obj, _MENU_MODELS):
+        # Admins can move a product to another restaurant; invalidate both sides.
+        return {obj.restaurant_id, *inspect(obj).attrs.restaurant_id.history.deleted}
+    if isinstance(obj, ProductOption):
+        group = session.get(ProductOptionGroup, obj.option_group_id)
+        return {group.restaurant_id} if group else set()
+    if isinstance(obj, ProductProductOptionGroup):
+        product = session.get(Product, obj.product_id)
+        return {product.restaurant_id} if product else set()
+    return set()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_menu_changes(session, _flush_context):
+    touched = set()
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            touched.update(_owning_restaurants(session, obj))
+    touched.discard(None)
+    if touched:
+        bump_menu_version(session.connection(), touched)
+        record_change(session, "menu_changes", touched)
+
+
+@on_commit("menu_changes")
+def _evict_after_commit(touched):
+    _evict(*touched)
@@ -0,0 +1,279 @@
+# app/metrics.py - Prometheus text metrics with optional file-backed multi-worker aggregation
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, abort, current_app, g, request
+
+from app.db_pool import pool_stats
+from app.extensions import db
+from app.logging_config import log_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+HELP = {
+    "hemenye_http_requests_total": ("counter", "HTTP responses by endpoint, method and status."),
+    "hemenye_http_request_duration_seconds": ("histogram", "Request latency by endpoint."),
+    "hemenye_sql_request_seconds": ("histogram", "Time spent in SQL per request, by endpoint."),
+    "hemenye_sql_queries_total": ("counter", "SQL statements executed by endpoint."),
+    "hemenye_cache_requests_total": ("counter", "In-process cache lookups by cache and result."),
+    "hemenye_log_records_discarded_total": ("counter", "Log records dropped on a full queue or sampled out."),
+    "hemenye_db_pool_checked_out": ("gauge", "Connections currently checked out of the pool."),
+    "hemenye_db_pool_overflow": ("gauge", "Connections open beyond pool_size."),
+    "hemenye_db_pool_size": ("gauge", "Configured pool size."),
+    "hemenye_db_pool_slow_checkouts_total": ("counter", "Checkouts that waited for a free connection."),
+    "hemenye_db_pool_timeouts_total": ("counter", "Checkouts that gave up after pool_timeout."),
+}
+
+
+def _labels_key(labels: dict) -> str:
+    return json.dumps(sorted(labels.items()))
+
+
+class MetricsRegistry:
+    """Counters and histograms kept as plain dicts so a worker can dump them to JSON."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name: str, labels: dict, value: float = 1.0) -> None:
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: dict, value: float) -> None:
+        key = (name, _labels_key(labels))
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = {"buckets": [0] * (len(LATENCY_BUCKETS) + 1), "sum": 0.0, "count": 0}
+            hist["buckets"][bisect_left(LATENCY_BUCKETS, value)] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": [[name, labels, value] for (name, labels), value in self.counters.items()],
+                "histograms": [
+                    [name, labels, {"buckets": list(h["buckets"]), "sum": h["sum"], "count": h["count"]}]
+                    for (name, labels), h in self.histograms.items()
+                ],
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+registry = MetricsRegistry()
+_last_flush = [0.0]
+_process_started = {}
+
+
+def _cache_counters() -> dict:
+    """Cumulative hit/miss counts of every in-process cache, keyed (cache, result)."""
+    from app import branch_locator, coupon_index, identity, menu_cache, owner_context, pagination
+
+    sources = {
+        "menu": menu_cache.cache_stats,
+        "coupon_index": coupon_index.coupon_index.stats,
+        "identity": identity.identity_cache.stats,
+        "owner_branches": owner_context.cache_stats,
+        "page_count": pagination.count_cache_stats,
+        "branch_locator": branch_locator.branch_locator.stats,
+    }
+    return {(cache, result): value for cache, stats in sources.items() for result, value in stats.items()}
+
+
+def _pool_gauges() -> dict:
+    pool = db.engine.pool
+    gauges = {}
+    for name, attr in (("hemenye_db_pool_checked_out", "checkedout"), ("hemenye_db_pool_overflow", "overflow"), ("hemenye_db_pool_size", "size")):
+        reader = getattr(pool, attr, None)
+        if reader is not None:
+            gauges[name] = max(0, reader())
+    return gauges
+
+
+def process_snapshot() -> dict:
+    """Everything this worker contributes to a scrape."""
+    data = registry.snapshot()
+    data["counters"] += [
+        ["hemenye_cache_requests_total", _labels_key({"cache": cache, "result": result}), value]
+        for (cache, result), value in _cache_counters().items()
+    ]
+    data["counters"] += [
+        ["hemenye_log_records_discarded_total", _labels_key({"reason": reason}), value]
+        for reason, value in log_stats.items()
+    ]
+    data["counters"] += [
+        ["hemenye_db_pool_slow_checkouts_total", _labels_key({}), pool_stats["waits"]],
+        ["hemenye_db_pool_timeouts_total", _labels_key({}), pool_stats["timeouts"]],
+    ]
+    data["gauges"] = [[name, _labels_key({}), value] for name, value in _pool_gauges().items()]
+    data["pid"] = os.getpid()
+    data["started"] = _started_at(data["pid"])
+    return data
+
+
+def _started_at(pid: int) -> int:
+    """Millisecond timestamp of this process's first snapshot; set again after a fork."""
+    if pid not in _process_started:
+        _process_started.clear()
+        _process_started[pid] = int(time.time() * 1000)
+    return _process_started[pid]
+
+
+def _snapshot_path(directory: str, pid: int, started: int) -> str:
+    # The start time keeps a reused pid from overwriting an exited worker's file.
+    return os.path.join(directory, f"metrics-{pid}-{started}.json")
+
+
+def flush_snapshot(directory: str) -> None:
+    """Atomically replace this worker's snapshot file."""
+    data = process_snapshot()
+    path = _snapshot_path(directory, data["pid"], data["started"])
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+    _last_flush[0] = time.monotonic()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect(directory=None) -> list:
+    """Snapshots to merge: this process only, or every worker file in directory.
+
+    Counters and histograms of exited workers are kept so totals never go
+    backwards; their pool gauges are dropped. A file is from an exited worker
+    when its pid is gone or a later process has taken the pid over.
+    """
+    if not directory:
+        return [process_snapshot()]
+    flush_snapshot(directory)
+    snapshots = []
+    for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        snapshots.append(data)
+    latest = {}
+    for data in snapshots:
+        pid = data.get("pid", 0)
+        latest[pid] = max(latest.get(pid, 0), data.get("started", 0))
+    for data in snapshots:
+        pid = data.get("pid", 0)
+        if data.get("started", 0) < latest[pid] or not _pid_alive(pid):
+            data["gauges"] = []
+    return snapshots
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _format_labels(labels_key: str, extra=()) -> str:
+    pairs = json.loads(labels_key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def render(snapshots) -> str:
+    """Merge snapshots by summing and render the Prometheus text exposition format."""
+    scalars = {}
+    histograms = {}
+    for data in snapshots:
+        for name, labels, value in data.get("counters", []) + data.get("gauges", []):
+            scalars[(name, labels)] = scalars.get((name, labels), 0) + value
+        for name, labels, hist in data.get("histograms", []):
+            merged = histograms.setdefault((name, labels), {"buckets": [0] * (len(LATENCY_BUCKETS) + 1), "sum": 0.0, "count": 0})
+            merged["buckets"] = [a + b for a, b in zip(merged["buckets"], hist["buckets"])]
+            merged["sum"] += hist["sum"]
+            merged["count"] += hist["count"]
+
+    lines = []
+    for metric, (kind, text) in HELP.items():
+        rows = sorted(k for k in (histograms if kind == "histogram" else scalars) if k[0] == metric)
+        if not rows:
+            continue
+        lines.append(f"# HELP {metric} {text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, labels in rows:
+            if kind != "histogram":
+                lines.append(f"{name}{_format_labels(labels)} {_number(scalars[(name, labels)])}")
+                continue
+            hist = histograms[(name, labels)]
+            running = 0
+            for bound, count in zip(list(LATENCY_BUCKETS) + ["+Inf"], hist["buckets"]):
+                running += count
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {running}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {hist['sum']:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def init_metrics(app) -> None:
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    directory = app.config.get("METRICS_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record(response):
+        started = g.get("metrics_started")
+        if started is None:
+            return response
+        endpoint = request.endpoint or "unmatched"
+        registry.inc(
+            "hemenye_http_requests_total",
+            {"endpoint": endpoint, "method": request.method, "status": str(response.status_code)},
+        )
+        registry.observe("hemenye_http_request_duration_seconds", {"endpoint": endpoint}, time.perf_counter() - started)
+        profile = g.get("sql_profile")
+        if profile is not None:
+            registry.observe("hemenye_sql_request_seconds", {"endpoint": endpoint}, profile.db_time)
+            registry.inc("hemenye_sql_queries_total", {"endpoint": endpoint}, profile.count)
+        interval = app.config.get("METRICS_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+        if directory and time.monotonic() - _last_flush[0] >= interval:
+            flush_snapshot(directory)
+        return response
+
+    def metrics_view():
+        token = current_app.config.get("METRICS_TOKEN")
+        if not token:
+            abort(404)
+        if request.headers.get("Authorization") != f"Bearer {token}":
+            abort(403)
+        return Response(render(collect(directory)), mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule("/metrics", endpoint="metrics", view_func=metrics_view)
@@ -75,6 +75,41 @@ class Restaurant(db.Model):
     favorites = db.relationship("FavoriteRestaurant", back_populates="restaurant", foreign_keys="FavoriteRestaurant.restaurant_id")
 
 
+class RestaurantStats(db.Model):
+    """Listing read model, maintained by app.restaurant_stats on every flush."""
+
+    __tablename__ = "RestaurantStats"
+    __table_args__ = (
+        db.Index("idx_restaurant_stats_rating", "is_active", "avg_rating"),
+        db.Index("idx_restaurant_stats_min_order", "is_active", "min_order_amount"),
+    )
+
+    restaurant_id = db.Column(db.Integer, ForeignKey("Restaurant.restaurant_id"), primary_key=True)
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    avg_rating = db.Column(db.Float)
+    min_order_amount = db.Column(db.Numeric(10, 2))
+    # Bumped by app.menu_cache in the transaction of every menu write; part of the menu cache key.
+    menu_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    restaurant = db.relationship("Restaurant", backref=db.backref("stats", uselist=False))
+
+
+class RestaurantSearch(db.Model):
+    """One search document per restaurant, maintained by app.search_index on every flush."""
+
+    __tablename__ = "RestaurantSearch"
+    __table_args__ = (
+        db.Index("ft_restaurant_search_name", "name", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+        db.Index("ft_restaurant_search_doc", "name", "body", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+
+    restaurant_id = db.Column(db.Integer, ForeignKey("Restaurant.restaurant_id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    name = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False, default="")
+
+
 class City(db.Model):
     __tablename__ = "City"
 
@@ -98,6 +133,9 @@ class Neighborhood(db.Model):
     id = db.Column("neighborhood_id", db.Integer, primary_key=True)
     district_id = db.Column(db.Integer, ForeignKey("District.district_id"), nullable=False)
     name = db.Column(db.String(255), nullable=False)
+    # Optional centre point; branches are routed by it (see app.branch_locator).
+    latitude = db.Column(db.Numeric(9, 6))
+    longitude = db.Column(db.Numeric(9, 6))
 
     district = db.relationship("District")
 
@@ -111,6 +149,8 @@ class UserAddress(db.Model):
     title = db.Column(db.String(100), nullable=False)
     address_line = db.Column(db.String(500), nullable=False)
     is_default = db.Column(db.Boolean, default=False)
+    latitude = db.Column(db.Numeric(9, 6))
+    longitude = db.Column(db.Numeric(9, 6))
 
     user = db.relationship("User", back_populates="addresses")
     neighborhood = db.relationship("Neighborhood")
@@ -147,6 +187,37 @@ class RestaurantBranch(db.Model):
     restaurant = db.relationship("Restaurant", back_populates="branches")
     neighborhood = db.relationship("Neighborhood")
     orders = db.relationship("Order", back_populates="branch", foreign_keys="Order.branch_id")
+    delivery_areas = db.relationship("DeliveryArea", back_populates="branch", cascade="all, delete-orphan")
+
+
+class DeliveryArea(db.Model):
+    """A neighborhood, or a whole district, that a branch delivers to."""
+
+    __tablename__ = "DeliveryArea"
+    __table_args__ = (
+        db.CheckConstraint("(neighborhood_id IS NULL) <> (district_id IS NULL)", name="ck_delivery_area_target"),
+    )
+
+    id = db.Column("area_id", db.Integer, primary_key=True)
+    branch_id = db.Column(db.Integer, ForeignKey("RestaurantBranch.branch_id", ondelete="CASCADE"), nullable=False, index=True)
+    neighborhood_id = db.Column(db.Integer, ForeignKey("Neighborhood.neighborhood_id"), index=True)
+    district_id = db.Column(db.Integer, ForeignKey("District.district_id"), index=True)
+
+    branch = db.relationship("RestaurantBranch", back_populates="delivery_areas")
+
+
+class BranchCoverage(db.Model):
+    """Neighborhood -> active branch index expanded from DeliveryArea, maintained by app.delivery_areas.
+
+    The key leads with neighborhood_id so "restaurants serving this neighborhood"
+    is a single index range scan.
+    """
+
+    __tablename__ = "BranchCoverage"
+
+    neighborhood_id = db.Column(db.Integer, ForeignKey("Neighborhood.neighborhood_id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    restaurant_id = db.Column(db.Integer, ForeignKey("Restaurant.restaurant_id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    branch_id = db.Column(db.Integer, ForeignKey("RestaurantBranch.branch_id", ondelete="CASCADE"), primary_key=True, autoincrement=False, index=True)
 
 
 class ProductCategory(db.Model):
@@ -228,6 +299,7 @@ class Coupon(db.Model):
     valid_from = db.Column(db.DateTime)
     valid_to = db.Column(db.DateTime)
     max_usage_per_user = db.Column(db.Integer)
+    max_total_usage = db.Column(db.Integer)
     is_active = db.Column(db.Boolean, default=True)
 
     orders = db.relationship("Order", back_populates="coupon")
@@ -236,6 +308,7 @@ class Coupon(db.Model):
 
 class Order(db.Model):
     __tablename__ = "Order"
+    __table_args__ = (db.UniqueConstraint("user_id", "idempotency_key", name="uq_order_user_idempotency"),)
 
     id = db.Column("order_id", db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, ForeignKey("User.user_id"), nullable=False)
@@ -245,6 +318,7 @@ class Order(db.Model):
     status = db.Column(Enum(OrderStatus.PENDING, OrderStatus.ACCEPTED, OrderStatus.PREPARING, OrderStatus.ON_THE_WAY, OrderStatus.DELIVERED, OrderStatus.CANCELED, name="order_status"), default=OrderStatus.PENDING)
     total_amount = db.Column(db.Numeric(10, 2), nullable=False, default=0)
     final_amount = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    idempotency_key = db.Column(db.String(64))
     user = db.relationship("User", back_populates="orders", foreign_keys=[user_id])
     branch = db.relationship("RestaurantBranch", back_populates="orders", foreign_keys=[branch_id])
     items = db.relationship("OrderItem", back_populates="order", foreign_keys="OrderItem.order_id")
@@ -255,6 +329,20 @@ class Order(db.Model):
     address = db.relationship("UserAddress", foreign_keys=[address_id])
 
 
+class OrderSearch(db.Model):
+    """Order console search row: terms holds customer, phone and restaurant; maintained by app.search_index."""
+
+    __tablename__ = "OrderSearch"
+    __table_args__ = (db.Index("ft_order_search_terms", "terms", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),)
+
+    order_id = db.Column(db.Integer, ForeignKey("Order.order_id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    status = db.Column(db.String(20), nullable=False)
+    customer_name = db.Column(db.String(255), nullable=False)
+    customer_phone = db.Column(db.String(20))
+    restaurant_name = db.Column(db.String(255), nullable=False)
+    terms = db.Column(db.String(1024), nullable=False)
+
+
 class OrderItem(db.Model):
     __tablename__ = "OrderItem"
 
@@ -339,6 +427,45 @@ class UserCoupon(db.Model):
     coupon = db.relationship("Coupon", back_populates="user_coupons")
 
 
+class CouponUsageShard(db.Model):
+    """One slice of a coupon's global usage cap; see app.coupons.redeem_coupon."""
+
+    __tablename__ = "CouponUsageShard"
+
+    coupon_id = db.Column(db.Integer, ForeignKey("Coupon.coupon_id"), primary_key=True)
+    shard_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    capacity = db.Column(db.Integer, nullable=False)
+    usage_count = db.Column(db.Integer, default=0, nullable=False)
+
+
+class Cart(db.Model):
+    """Server-side cart header; the session only carries cart_id (see app.cart_store)."""
+
+    __tablename__ = "Cart"
+
+    id = db.Column("cart_id", db.String(32), primary_key=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class CartItem(db.Model):
+    __tablename__ = "CartItem"
+
+    cart_id = db.Column(db.String(32), ForeignKey("Cart.cart_id", ondelete="CASCADE"), primary_key=True)
+    product_id = db.Column(db.Integer, ForeignKey("Product.product_id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    quantity = db.Column(db.Integer, nullable=False, default=1)
+
+
+class SchemaState(db.Model):
+    """Fingerprint of the model metadata recorded by `flask schema upgrade` (see app.schema_state)."""
+
+    __tablename__ = "SchemaState"
+
+    name = db.Column(db.String(32), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    revision = db.Column(db.String(32))
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
 class FavoriteRestaurant(db.Model):
     __tablename__ = "FavoriteRestaurant"
 
@@ -389,4 +516,7 @@ class ProductPriceHistory(db.Model):
 
 @login_manager.user_loader
 def load_user(user_id: str):
-    return User.query.get(int(user_id))
+    """Return a cached Principal (id, role, name, restaurant_ids) instead of the User row."""
+    from app.identity import load_principal
+
+    return load_principal(int(user_id))
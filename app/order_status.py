@@ -1,5 +1,11 @@
 # app/order_status.py - order status lifecycle helpers
-from app.models import OrderStatus
+from datetime import datetime
+
+from sqlalchemy import insert, select, update
+
+from app.extensions import db
+from app.models import Order, OrderStatus, OrderStatusHistory
+from app.search_index import set_indexed_status
 
 STATUS_ORDER = [
     OrderStatus.PENDING,
@@ -36,3 +42,123 @@ def status_choices(current_status: str):
         if status in ALLOWED_TRANSITIONS.get(current_status, set()):
             choices.append(status)
     return choices
+
+
+class TransitionResult:
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    INVALID_STATUS = "invalid_status"
+    NOT_ALLOWED = "not_allowed"
+    CONFLICT = "conflict"
+    NOT_FOUND = "not_found"
+
+
+TRANSITION_MESSAGES = {
+    TransitionResult.UPDATED: ("Order status updated.", "success"),
+    TransitionResult.INVALID_STATUS: ("Invalid status.", "danger"),
+    TransitionResult.NOT_ALLOWED: ("Invalid status transition.", "danger"),
+    TransitionResult.CONFLICT: ("Order status was changed by someone else; please review and retry.", "warning"),
+}
+
+
+def transition_order(order_id: int, old_status: str, new_status: str, changed_by_user_id: int) -> str:
+    """Move an order from old_status to new_status with a compare-and-set UPDATE.
+
+    The UPDATE only matches while the row still holds old_status, so concurrent
+    writers cannot both apply a transition. The history row is written in the
+    same transaction, together with the status on the order's search row; the
+    caller commits on UPDATED.
+    """
+    if not is_valid_status(new_status):
+        return TransitionResult.INVALID_STATUS
+    if new_status == old_status:
+        return TransitionResult.UNCHANGED
+    if not can_transition(old_status, new_status):
+        return TransitionResult.NOT_ALLOWED
+    result = db.session.execute(
+        update(Order)
+        .where(Order.id == order_id, Order.status == old_status)
+        .values(status=new_status)
+    )
+    if result.rowcount != 1:
+        return TransitionResult.CONFLICT
+    db.session.execute(
+        insert(OrderStatusHistory).values(
+            order_id=order_id,
+            old_status=old_status,
+            new_status=new_status,
+            changed_at=datetime.utcnow(),
+            changed_by_user_id=changed_by_user_id,
+        )
+    )
+    set_indexed_status(db.session.connection(), [order_id], new_status)
+    return TransitionResult.UPDATED
+
+
+class _BatchConflict(Exception):
+    """A guarded bulk UPDATE lost a race; unwinds the batch savepoint."""
+
+
+def transition_orders(order_ids, new_status: str, changed_by_user_id: int, branch_ids=None) -> dict:
+    """Apply one target status to many orders in a single transaction.
+
+    Current statuses are read (and row-locked on MySQL) in one query, every
+    allowed move is applied with a compare-and-set UPDATE per source status,
+    and all history rows go in with one executemany INSERT. If a guarded
+    UPDATE matches fewer rows than expected the batch's savepoint is rolled
+    back, leaving the caller's other work alone, and every move is reported
+    as conflicting. branch_ids, when given, limits the batch to orders
+    placed at those branches. Returns {order_id: TransitionResult}; the caller
+    commits when anything was UPDATED.
+    """
+    ids = list(dict.fromkeys(int(oid) for oid in order_ids))
+    if not is_valid_status(new_status):
+        return {oid: TransitionResult.INVALID_STATUS for oid in ids}
+    results = {oid: TransitionResult.NOT_FOUND for oid in ids}
+    if not ids:
+        return results
+
+    query = select(Order.id, Order.status).where(Order.id.in_(ids))
+    if branch_ids is not None:
+        query = query.where(Order.branch_id.in_(sorted(branch_ids)))
+    by_old_status = {}
+    for oid, old_status in db.session.execute(query.with_for_update()):
+        if new_status == old_status:
+            results[oid] = TransitionResult.UNCHANGED
+        elif not can_transition(old_status, new_status):
+            results[oid] = TransitionResult.NOT_ALLOWED
+        else:
+            by_old_status.setdefault(old_status, []).append(oid)
+
+    history = []
+    now = datetime.utcnow()
+    try:
+        with db.session.begin_nested():
+            for old_status, group in by_old_status.items():
+                updated = db.session.execute(
+                    update(Order)
+                    .where(Order.id.in_(group), Order.status == old_status)
+                    .values(status=new_status)
+                    .execution_options(synchronize_session=False)
+                )
+                if updated.rowcount != len(group):
+                    raise _BatchConflict
+                history.extend(
+                    {
+                        "order_id": oid,
+                        "old_status": old_status,
+                        "new_status": new_status,
+                        "changed_at": now,
+                        "changed_by_user_id": changed_by_user_id,
+                    }
+                    for oid in group
+                )
+            if history:
+                db.session.execute(insert(OrderStatusHistory), history)
+                set_indexed_status(db.session.connection(), [row["order_id"] for row in history], new_status)
+    except _BatchConflict:
+        for oids in by_old_status.values():
+            results.update({oid: TransitionResult.CONFLICT for oid in oids})
+        return results
+    results.update({row["order_id"]: TransitionResult.UPDATED for row in history})
+    return results
@@ -0,0 +1,123 @@
+# app/owner_context.py - per-owner restaurant and branch scope shared by the owner blueprint
+import threading
+import time
+
+from flask import current_app, g
+from flask_login import current_user
+from sqlalchemy import event, false, inspect, select
+from sqlalchemy.orm import Session
+
+from app.db_routing import primary_read
+from app.extensions import db
+from app.identity import load_principal
+from app.models import Order, Restaurant, RestaurantBranch
+from app.session_changes import on_commit, record_change
+
+DEFAULT_TTL = 60
+
+
+class OwnerContext:
+    """The owner's restaurant id and its branch ids.
+
+    branch_ids covers every branch, so orders placed at a branch that was
+    later deactivated stay visible; active_branch_ids is the live subset.
+    """
+
+    __slots__ = ("restaurant_id", "branch_ids", "active_branch_ids")
+
+    def __init__(self, restaurant_id, branch_ids=(), active_branch_ids=()):
+        self.restaurant_id = restaurant_id
+        self.branch_ids = frozenset(branch_ids)
+        self.active_branch_ids = frozenset(active_branch_ids)
+
+    def __bool__(self):
+        return self.restaurant_id is not None
+
+    def order_filter(self):
+        """WHERE clause limiting Order rows to this restaurant, without joining RestaurantBranch."""
+        if not self.branch_ids:
+            return false()
+        return Order.branch_id.in_(sorted(self.branch_ids))
+
+    def restaurant(self):
+        """The Restaurant row, for views that render it."""
+        return db.session.get(Restaurant, self.restaurant_id) if self.restaurant_id else None
+
+
+_lock = threading.Lock()
+_branches = {}
+cache_stats = {"hits": 0, "misses": 0}
+
+
+@primary_read
+def _load_branches(restaurant_id: int):
+    rows = db.session.execute(
+        select(RestaurantBranch.id, RestaurantBranch.is_active).where(RestaurantBranch.restaurant_id == restaurant_id)
+    ).all()
+    return [bid for bid, _ in rows], [bid for bid, active in rows if active]
+
+
+def branch_scope(restaurant_id: int):
+    """(branch_ids, active_branch_ids) for a restaurant, cached for OWNER_CONTEXT_TTL seconds."""
+    now = time.monotonic()
+    with _lock:
+        entry = _branches.get(restaurant_id)
+        if entry and entry[2] > now:
+            cache_stats["hits"] += 1
+            return entry[0], entry[1]
+        cache_stats["misses"] += 1
+    branch_ids, active_ids = _load_branches(restaurant_id)
+    with _lock:
+        _branches[restaurant_id] = (branch_ids, active_ids, now + current_app.config.get("OWNER_CONTEXT_TTL", DEFAULT_TTL))
+    return branch_ids, active_ids
+
+
+def invalidate_branch_scope(*restaurant_ids) -> None:
+    with _lock:
+        for rid in restaurant_ids:
+            _branches.pop(rid, None)
+
+
+def clear_owner_contexts() -> None:
+    with _lock:
+        _branches.clear()
+
+
+def current_owner_context() -> OwnerContext:
+    """Resolve the logged-in owner's context once per request.
+
+    The restaurant id comes from the cached login principal, so a warm
+    request issues no query at all.
+    """
+    ctx = g.get("owner_context")
+    if ctx is None:
+        principal = load_principal(current_user.id)
+        restaurant_ids = principal.restaurant_ids if principal else ()
+        if restaurant_ids:
+            ctx = OwnerContext(restaurant_ids[0], *branch_scope(restaurant_ids[0]))
+        else:
+            ctx = OwnerContext(None)
+        g.owner_context = ctx
+    return ctx
+
+
+def _affected_restaurants(obj):
+    if isinstance(obj, RestaurantBranch):
+        return {obj.restaurant_id, *inspect(obj).attrs.restaurant_id.history.deleted}
+    if isinstance(obj, Restaurant):
+        return {obj.id}
+    return set()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_branch_changes(session, _flush_context):
+    touched = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        touched.update(_affected_restaurants(obj))
+    if touched:
+        record_change(session, "branch_scope_changes", touched)
+
+
+@on_commit("branch_scope_changes")
+def _invalidate_after_commit(touched):
+    invalidate_branch_scope(*touched)
@@ -1,4 +1,18 @@
-# app/pagination.py - simple query pagination helper
+# app/pagination.py - query pagination helpers (offset and keyset)
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+
+TOTAL_CACHE_TTL = 60
+TOTAL_CACHE_SIZE = 256
+
+_total_cache = OrderedDict()
+_total_lock = threading.Lock()
+count_cache_stats = {"hits": 0, "misses": 0}
+
+
 def paginate(query, page: int, per_page: int):
     if page < 1:
         page = 1
@@ -8,3 +22,101 @@ def paginate(query, page: int, per_page: int):
         page = pages
     items = query.limit(per_page).offset((page - 1) * per_page).all()
     return items, page, pages, total
+
+
+class KeysetPage:
+    """One page of a seek-paginated query plus opaque cursors for its neighbours."""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None, total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def encode_cursor(key, direction: str = "next") -> str:
+    raw = json.dumps({"k": key, "d": direction}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (key, direction); malformed or missing cursors start from the first page."""
+    if not cursor:
+        return None, "next"
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = data.get("d", "next")
+        key = data["k"]
+        if direction not in {"next", "prev"} or isinstance(key, bool) or not isinstance(key, (int, str, float)):
+            return None, "next"
+        return key, direction
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None, "next"
+
+
+def clear_count_cache() -> None:
+    with _total_lock:
+        _total_cache.clear()
+
+
+def cached_count(query, ttl: int = TOTAL_CACHE_TTL) -> int:
+    """COUNT(*) for query, memoised per statement and parameters for ttl seconds."""
+    compiled = query.statement.compile()
+    cache_key = (str(compiled), repr(sorted(compiled.params.items())))
+    now = time.monotonic()
+    with _total_lock:
+        hit = _total_cache.get(cache_key)
+        if hit and hit[1] > now:
+            _total_cache.move_to_end(cache_key)
+            count_cache_stats["hits"] += 1
+            return hit[0]
+        count_cache_stats["misses"] += 1
+    total = query.order_by(None).count()
+    with _total_lock:
+        _total_cache[cache_key] = (total, now + ttl)
+        _total_cache.move_to_end(cache_key)
+        while len(_total_cache) > TOTAL_CACHE_SIZE:
+            _total_cache.popitem(last=False)
+    return total
+
+
+def paginate_keyset(query, sort_column, cursor=None, per_page: int = 10, descending: bool = True, with_total: bool = False):
+    """Seek-paginate query on a unique sort column without COUNT or OFFSET.
+
+    Fetches per_page + 1 rows to know whether another page exists; the query
+    must not carry its own ORDER BY.
+    """
+    key, direction = decode_cursor(cursor)
+    forward = direction == "next"
+    newest_first = descending == forward
+    seek = query
+    if key is not None:
+        seek = seek.filter(sort_column < key if newest_first else sort_column > key)
+    order = sort_column.desc() if newest_first else sort_column.asc()
+    rows = seek.order_by(order).limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        first_key = getattr(rows[0], sort_column.key)
+        last_key = getattr(rows[-1], sort_column.key)
+        if forward:
+            next_cursor = encode_cursor(last_key, "next") if has_more else None
+            prev_cursor = encode_cursor(first_key, "prev") if key is not None else None
+        else:
+            next_cursor = encode_cursor(last_key, "next")
+            prev_cursor = encode_cursor(first_key, "prev") if has_more else None
+    total = cached_count(query) if with_total else None
+    return KeysetPage(rows, next_cursor, prev_cursor, total)
@@ -0,0 +1,120 @@
+# app/perf.py - cold-start report: import costs, create_app phases and first-request template compile
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules whose cumulative import cost is always reported, in boot order.
+TRACKED_IMPORTS = (
+    "flask",
+    "sqlalchemy",
+    "flask_sqlalchemy",
+    "flask_login",
+    "flask_migrate",
+    "app",
+    "app.models",
+    "app.main.routes",
+    "app.auth.routes",
+    "app.customer.routes",
+    "app.restaurant.routes",
+    "app.admin.routes",
+)
+TOP_IMPORTS = 15
+WARM_REQUESTS = 5
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def parse_importtime(stderr: str) -> dict:
+    """{module: (self_ms, cumulative_ms)} from `python -X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, _indent, name = match.groups()
+            modules[name] = (round(int(self_us) / 1000, 1), round(int(cumulative_us) / 1000, 1))
+    return modules
+
+
+def measure_boot(first_request: bool = True) -> dict:
+    """Run in a fresh interpreter: time create_app, template compilation and the first request."""
+    from app import create_app
+
+    started = time.perf_counter()
+    app = create_app()
+    timer = app.extensions["boot_timer"]
+    report = {
+        "create_app_ms": _ms(timer.total()),
+        "phases_ms": {name: _ms(seconds) for name, seconds in timer.phases.items()},
+    }
+
+    env = app.jinja_env
+    compile_ms = {}
+    for name in sorted(env.list_templates(extensions=["html"])):
+        t0 = time.perf_counter()
+        env.get_template(name)
+        compile_ms[name] = _ms(time.perf_counter() - t0)
+    report["templates"] = {"count": len(compile_ms), "compile_ms": round(sum(compile_ms.values()), 1), "per_template_ms": compile_ms}
+
+    if first_request:
+        env.cache.clear()
+        client = app.test_client()
+        t0 = time.perf_counter()
+        response = client.get("/")
+        cold = time.perf_counter() - t0
+        warm = []
+        for _ in range(WARM_REQUESTS):
+            t0 = time.perf_counter()
+            client.get("/")
+            warm.append(time.perf_counter() - t0)
+        warm = statistics.median(warm)
+        report["first_request"] = {"path": "/", "status": response.status_code, "cold_ms": _ms(cold), "warm_ms": _ms(warm)}
+    report["ready_ms"] = _ms(time.perf_counter() - started)
+    return report
+
+
+def _probe(*args, importtime=False):
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-m", "app.perf", *args]
+    proc = subprocess.run(command, cwd=project_root, capture_output=True, text=True, check=False)
+    if proc.returncode != 0:
+        raise RuntimeError(f"startup probe failed ({proc.returncode}): {proc.stderr[-2000:]}")
+    return proc
+
+
+def startup_report(first_request: bool = True) -> dict:
+    """Boot the app in fresh interpreters and merge the timings into one report.
+
+    Phases and requests are timed in a plain child; import costs come from a
+    second child under `-X importtime`, whose overhead would skew the first.
+    """
+    t0 = time.perf_counter()
+    proc = _probe(*([] if first_request else ["--no-request"]))
+    wall = time.perf_counter() - t0
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    report["process_wall_ms"] = _ms(wall)
+
+    modules = parse_importtime(_probe("--imports-only", importtime=True).stderr)
+    report["imports"] = {
+        "tracked_ms": {name: modules[name][1] for name in TRACKED_IMPORTS if name in modules},
+        "top_self_ms": dict(sorted(((n, t[0]) for n, t in modules.items()), key=lambda item: -item[1])[:TOP_IMPORTS]),
+        "module_count": len(modules),
+    }
+    report["python"] = sys.version.split()[0]
+    return report
+
+
+if __name__ == "__main__":
+    if "--imports-only" in sys.argv:
+        from app import create_app
+
+        create_app()
+    else:
+        print(json.dumps(measure_boot(first_request="--no-request" not in sys.argv), sort_keys=True))
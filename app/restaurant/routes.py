@@ -1,25 +1,35 @@
 # app/restaurant/routes.py - restaurant owner views
 from flask import render_template, redirect, url_for, request, flash, abort
 from flask_login import login_required, current_user
+from sqlalchemy import false
 
 from app.extensions import db
 from app.models import (
-    Restaurant,
     Product,
     ProductCategory,
     Order,
     Review,
     UserRole,
-    User,
     OrderItem,
     ReviewReply,
-    RestaurantBranch,
     OrderStatusHistory,
     ProductPriceHistory,
 )
 from app.restaurant import restaurant_bp
-from app.order_status import can_transition, status_choices, is_valid_status
-from app.pagination import paginate
+from app.order_status import (
+    STATUS_ORDER,
+    TRANSITION_MESSAGES,
+    TransitionResult,
+    is_valid_status,
+    status_choices,
+    transition_order,
+    transition_orders,
+)
+from app.bulk_status import handle_bulk_status
+from app.loading import order_detail_options, order_list_options
+from app.owner_context import current_owner_context
+from app.pagination import paginate_keyset
+from app.search_index import order_search_filter
 
 
 def owner_required():
@@ -31,7 +41,18 @@ def owner_required():
 
 
 def _current_restaurant():
-    return Restaurant.query.filter_by(owner_id=current_user.id).first()
+    return current_owner_context().restaurant()
+
+
+def _apply_status_form(order):
+    """Apply the posted status as a compare-and-set transition and flash the outcome."""
+    expected = request.form.get("current_status") or order.status
+    result = transition_order(order.id, expected, request.form.get("status", expected), current_user.id)
+    if result == TransitionResult.UPDATED:
+        db.session.commit()
+    if result in TRANSITION_MESSAGES:
+        flash(*TRANSITION_MESSAGES[result])
+    return result
 
 
 @restaurant_bp.route("/restaurant/dashboard", endpoint="restaurant_dashboard")
@@ -51,8 +72,8 @@ def menu():
     gate = owner_required()
     if gate:
         return gate
-    restaurant = _current_restaurant()
-    products = Product.query.filter_by(restaurant_id=restaurant.id).all() if restaurant else []
+    owner = current_owner_context()
+    products = Product.query.filter_by(restaurant_id=owner.restaurant_id).all() if owner else []
     return render_template("restaurant/menu.html", products=products)
 
 
@@ -62,10 +83,10 @@ def product_new():
     gate = owner_required()
     if gate:
         return gate
-    restaurant = _current_restaurant()
-    categories = ProductCategory.query.filter_by(restaurant_id=restaurant.id).all() if restaurant else []
+    owner = current_owner_context()
+    categories = ProductCategory.query.filter_by(restaurant_id=owner.restaurant_id).all() if owner else []
     if request.method == "POST":
-        if not restaurant:
+        if not owner:
             flash("Restaurant not found for owner.", "danger")
             return redirect(url_for("restaurant_dashboard"))
         name = (request.form.get("name") or "").strip()
@@ -86,7 +107,7 @@ def product_new():
                 selected_option_groups=[],
                 form_action=url_for("restaurant.product_new"),
             )
-        valid_category = ProductCategory.query.filter_by(id=category_id, restaurant_id=restaurant.id).first()
+        valid_category = ProductCategory.query.filter_by(id=category_id, restaurant_id=owner.restaurant_id).first()
         if not valid_category:
             flash("Invalid category.", "danger")
             return render_template(
@@ -98,7 +119,7 @@ def product_new():
                 form_action=url_for("restaurant.product_new"),
             )
         p = Product(
-            restaurant_id=restaurant.id,
+            restaurant_id=owner.restaurant_id,
             category_id=category_id,
             name=name,
             description=description,
@@ -126,11 +147,11 @@ def product_edit(product_id):
     if gate:
         return gate
     product = Product.query.get_or_404(product_id)
-    restaurant = _current_restaurant()
-    if not restaurant or product.restaurant_id != restaurant.id:
+    owner = current_owner_context()
+    if not owner or product.restaurant_id != owner.restaurant_id:
         flash("Unauthorized access.", "danger")
         return redirect(url_for("restaurant_menu"))
-    categories = ProductCategory.query.filter_by(restaurant_id=restaurant.id).all()
+    categories = ProductCategory.query.filter_by(restaurant_id=owner.restaurant_id).all()
     if request.method == "POST":
         name = (request.form.get("name") or "").strip()
         description = (request.form.get("description") or "").strip()
@@ -150,7 +171,7 @@ def product_edit(product_id):
                 selected_option_groups=[],
                 form_action=url_for("restaurant.product_edit", product_id=product.id),
             )
-        valid_category = ProductCategory.query.filter_by(id=category_id, restaurant_id=restaurant.id).first()
+        valid_category = ProductCategory.query.filter_by(id=category_id, restaurant_id=owner.restaurant_id).first()
         if not valid_category:
             flash("Invalid category.", "danger")
             return render_template(
@@ -197,8 +218,8 @@ def product_delete(product_id):
     if gate:
         return gate
     product = Product.query.get_or_404(product_id)
-    restaurant = _current_restaurant()
-    if not restaurant or product.restaurant_id != restaurant.id:
+    owner = current_owner_context()
+    if not owner or product.restaurant_id != owner.restaurant_id:
         flash("Unauthorized access.", "danger")
         return redirect(url_for("restaurant_menu"))
     db.session.delete(product)
@@ -213,31 +234,21 @@ def orders():
     gate = owner_required()
     if gate:
         return gate
-    restaurant = _current_restaurant()
+    owner = current_owner_context()
     status_filter = request.args.get("status")
     search_query = (request.args.get("q") or "").strip()
-    if restaurant:
-        query = (
-            Order.query.join(RestaurantBranch, Order.branch_id == RestaurantBranch.id)
-            .filter(RestaurantBranch.restaurant_id == restaurant.id)
-        )
-    else:
-        query = Order.query.filter(False)
+    query = Order.query.options(*order_list_options("restaurant")).filter(owner.order_filter())
     if status_filter and is_valid_status(status_filter):
         query = query.filter(Order.status == status_filter)
     else:
         status_filter = ""
     if search_query:
-        if search_query.isdigit():
-            query = query.filter(Order.id == int(search_query))
-        else:
-            query = query.join(User, Order.user_id == User.id).filter(User.name.ilike(f"%{search_query}%"))
-    page = request.args.get("page", 1, type=int)
-    per_page = 10
-    orders_list, page, pages, total = paginate(query.order_by(Order.id.desc()), page, per_page)
-    for order in orders_list:
+        condition = order_search_filter(search_query, db.engine.dialect.name)
+        query = query.filter(condition if condition is not None else false())
+    pager = paginate_keyset(query, Order.id, request.args.get("cursor"), per_page=10)
+    for order in pager.items:
         order.status_options = status_choices(order.status)
-    return render_template("restaurant/orders.html", orders=orders_list, status_filter=status_filter, search_query=search_query, page=page, pages=pages)
+    return render_template("restaurant/orders.html", orders=pager.items, status_filter=status_filter, search_query=search_query, pager=pager, bulk_statuses=STATUS_ORDER)
 
 
 @restaurant_bp.route("/restaurant/orders/<int:order_id>", methods=["GET", "POST"])
@@ -246,28 +257,11 @@ def order_detail(order_id):
     gate = owner_required()
     if gate:
         return gate
-    restaurant = _current_restaurant()
-    order = (
-        Order.query.join(RestaurantBranch, Order.branch_id == RestaurantBranch.id)
-        .filter(Order.id == order_id, RestaurantBranch.restaurant_id == (restaurant.id if restaurant else None))
-        .first_or_404()
-    )
+    detail = Order.query.options(*order_detail_options()).filter(Order.id == order_id, current_owner_context().order_filter())
+    order = detail.first_or_404()
     if request.method == "POST":
-        new_status = request.form.get("status", order.status)
-        old_status = order.status
-        if not is_valid_status(new_status):
-            flash("Invalid status.", "danger")
-        elif not can_transition(old_status, new_status):
-            flash("Invalid status transition.", "danger")
-        elif new_status != old_status:
-            order.status = new_status
-            db.session.add(
-                OrderStatusHistory(
-                    order_id=order.id, old_status=old_status, new_status=new_status, changed_by_user_id=current_user.id
-                )
-            )
-            db.session.commit()
-            flash("Order status updated.", "success")
+        _apply_status_form(order)
+        order = detail.populate_existing().one()
     status_history = (
         OrderStatusHistory.query.filter_by(order_id=order.id).order_by(OrderStatusHistory.changed_at.desc()).all()
     )
@@ -280,31 +274,35 @@ def order_status_update(order_id):
     gate = owner_required()
     if gate:
         return gate
-    order = Order.query.get_or_404(order_id)
-    new_status = request.form.get("status", order.status)
-    old_status = order.status
-    if not is_valid_status(new_status):
-        flash("Invalid status.", "danger")
-    elif not can_transition(old_status, new_status):
-        flash("Invalid status transition.", "danger")
-    elif new_status != old_status:
-        order.status = new_status
-        db.session.add(
-            OrderStatusHistory(order_id=order.id, old_status=old_status, new_status=new_status, changed_by_user_id=current_user.id)
-        )
-        db.session.commit()
-        flash("Order status updated.", "success")
+    order = Order.query.filter(Order.id == order_id, current_owner_context().order_filter()).first_or_404()
+    _apply_status_form(order)
     return redirect(url_for("restaurant_orders"))
 
 
+@restaurant_bp.route("/restaurant/orders/bulk-status", methods=["POST"])
+@login_required
+def order_status_bulk():
+    gate = owner_required()
+    if gate:
+        return gate
+    owner = current_owner_context()
+
+    def apply(order_ids, new_status):
+        if not owner:
+            return {oid: TransitionResult.NOT_FOUND for oid in order_ids}
+        return transition_orders(order_ids, new_status, current_user.id, branch_ids=owner.branch_ids)
+
+    return handle_bulk_status(apply, "restaurant_orders")
+
+
 @restaurant_bp.route("/restaurant/reviews", methods=["GET", "POST"], endpoint="restaurant_reviews")
 @login_required
 def reviews():
     gate = owner_required()
     if gate:
         return gate
-    restaurant = _current_restaurant()
-    reviews_list = Review.query.filter_by(restaurant_id=restaurant.id).order_by(Review.created_at.desc()).all() if restaurant else []
+    owner = current_owner_context()
+    reviews_list = Review.query.filter_by(restaurant_id=owner.restaurant_id).order_by(Review.created_at.desc()).all() if owner else []
     return render_template("restaurant/reviews.html", reviews=reviews_list)
 
 
@@ -0,0 +1,122 @@
+# app/restaurant_stats.py - incrementally maintained RestaurantStats read model
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Restaurant, RestaurantBranch, RestaurantStats, Review
+
+
+def _aggregate(conn, restaurant_ids=None):
+    """Recompute stats rows from the base tables, optionally for a subset of restaurants."""
+    restaurants = select(Restaurant.id, Restaurant.is_active)
+    reviews = select(Review.restaurant_id, func.count(), func.sum(Review.rating)).group_by(Review.restaurant_id)
+    branches = (
+        select(RestaurantBranch.restaurant_id, func.min(RestaurantBranch.min_order_amount))
+        .where(RestaurantBranch.is_active == True)  # noqa: E712
+        .group_by(RestaurantBranch.restaurant_id)
+    )
+    if restaurant_ids is not None:
+        restaurants = restaurants.where(Restaurant.id.in_(restaurant_ids))
+        reviews = reviews.where(Review.restaurant_id.in_(restaurant_ids))
+        branches = branches.where(RestaurantBranch.restaurant_id.in_(restaurant_ids))
+
+    review_map = {rid: (count, total or 0) for rid, count, total in conn.execute(reviews)}
+    min_order_map = dict(conn.execute(branches).all())
+    rows = []
+    for rid, is_active in conn.execute(restaurants):
+        count, total = review_map.get(rid, (0, 0))
+        rows.append(
+            {
+                "restaurant_id": rid,
+                "is_active": bool(is_active) if is_active is not None else True,
+                "review_count": count,
+                "rating_sum": total,
+                "avg_rating": float(total) / count if count else None,
+                "min_order_amount": min_order_map.get(rid),
+            }
+        )
+    return rows
+
+
+def rebuild_stats(conn, restaurant_ids=None) -> int:
+    """Replace stats rows (all, or only restaurant_ids) with freshly aggregated values."""
+    if restaurant_ids is not None and not restaurant_ids:
+        return 0
+    rows = _aggregate(conn, restaurant_ids)
+    versions = select(RestaurantStats.restaurant_id, RestaurantStats.menu_version)
+    stmt = delete(RestaurantStats)
+    if restaurant_ids is not None:
+        versions = versions.where(RestaurantStats.restaurant_id.in_(restaurant_ids))
+        stmt = stmt.where(RestaurantStats.restaurant_id.in_(restaurant_ids))
+    # Keep menu versions so cached menus are not matched again by a restarted counter.
+    menu_versions = dict(conn.execute(versions).all())
+    for row in rows:
+        row["menu_version"] = menu_versions.get(row["restaurant_id"], 0)
+    conn.execute(stmt)
+    if rows:
+        conn.execute(insert(RestaurantStats), rows)
+    return len(rows)
+
+
+def _record_review(conn, restaurant_id, rating):
+    stats = RestaurantStats.__table__.c
+    # avg_rating is listed first so MySQL's left-to-right SET evaluation sees the old sums too.
+    conn.execute(
+        update(RestaurantStats)
+        .where(stats.restaurant_id == restaurant_id)
+        .ordered_values(
+            (stats.avg_rating, (stats.rating_sum + rating) * 1.0 / (stats.review_count + 1)),
+            (stats.rating_sum, stats.rating_sum + rating),
+            (stats.review_count, stats.review_count + 1),
+        )
+    )
+
+
+def _changed(obj, attr):
+    return inspect(obj).attrs[attr].history.has_changes()
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_stats(session, _flush_context):
+    added_reviews = {}
+    rebuild = set()
+    for obj in session.new:
+        if isinstance(obj, Review) and obj.restaurant_id:
+            added_reviews.setdefault(obj.restaurant_id, []).append(obj.rating)
+        elif isinstance(obj, RestaurantBranch):
+            rebuild.add(obj.restaurant_id)
+        elif isinstance(obj, Restaurant):
+            rebuild.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Restaurant) and _changed(obj, "is_active"):
+            rebuild.add(obj.id)
+        elif isinstance(obj, RestaurantBranch) and any(
+            _changed(obj, attr) for attr in ("is_active", "min_order_amount", "restaurant_id")
+        ):
+            rebuild.add(obj.restaurant_id)
+            rebuild.update(inspect(obj).attrs.restaurant_id.history.deleted)
+        elif isinstance(obj, Review) and any(_changed(obj, attr) for attr in ("rating", "restaurant_id")):
+            rebuild.add(obj.restaurant_id)
+            rebuild.update(inspect(obj).attrs.restaurant_id.history.deleted)
+    for obj in session.deleted:
+        if isinstance(obj, (Review, RestaurantBranch)):
+            rebuild.add(obj.restaurant_id)
+    rebuild.discard(None)
+    if not added_reviews and not rebuild:
+        return
+
+    conn = session.connection()
+    pending = set(added_reviews) - rebuild
+    if pending:
+        existing = set(
+            conn.execute(
+                select(RestaurantStats.restaurant_id).where(RestaurantStats.restaurant_id.in_(sorted(pending)))
+            ).scalars()
+        )
+        # Restaurants without a stats row yet get a full recompute, which already counts the new reviews.
+        rebuild.update(pending - existing)
+    for restaurant_id, ratings in added_reviews.items():
+        if restaurant_id in rebuild:
+            continue
+        for rating in ratings:
+            _record_review(conn, restaurant_id, rating)
+    rebuild_stats(conn, sorted(rebuild))
@@ -3,16 +3,15 @@ from flask import Blueprint, jsonify, request, session
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from app import db
+from app.cart_store import current_cart, current_cart_id, get_cart_store
 from app.models import Product, User
 
 customer_bp = Blueprint("customer", __name__)
 
 
-def _ensure_cart() -> dict:
-    """Initialize cart in session if missing."""
-    if "cart" not in session:
-        session["cart"] = {}
-    return session["cart"]
+def _cart_payload() -> dict:
+    """Current server-side cart with string keys, as the JSON API has always returned it."""
+    return {str(pid): qty for pid, qty in current_cart().items()}
 
 
 @customer_bp.route("/customer/register", methods=["POST"])
@@ -70,10 +69,9 @@ def add_to_cart():
     if not product or not product.is_active:
         return jsonify({"error": "product not found or inactive"}), 404
 
-    cart = _ensure_cart()
-    cart[str(product_id)] = cart.get(str(product_id), 0) + quantity
-    session.modified = True
-    return jsonify({"message": "added", "cart": cart})
+    get_cart_store().add(current_cart_id(create=True), product.id, quantity)
+    db.session.commit()
+    return jsonify({"message": "added", "cart": _cart_payload()})
 
 
 @customer_bp.route("/cart/remove", methods=["POST"])
@@ -84,13 +82,16 @@ def remove_from_cart():
     if not product_id:
         return jsonify({"error": "product_id is required"}), 400
 
-    cart = _ensure_cart()
-    cart.pop(str(product_id), None)
-    session.modified = True
-    return jsonify({"message": "removed", "cart": cart})
+    cart_id = current_cart_id()
+    if cart_id:
+        try:
+            get_cart_store().remove(cart_id, int(product_id))
+        except (TypeError, ValueError):
+            return jsonify({"error": "product_id must be an integer"}), 400
+        db.session.commit()
+    return jsonify({"message": "removed", "cart": _cart_payload()})
 
 
 @customer_bp.route("/cart", methods=["GET"])
 def get_cart():
-    cart = _ensure_cart()
-    return jsonify({"cart": cart})
+    return jsonify({"cart": _cart_payload()})
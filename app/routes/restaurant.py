@@ -3,6 +3,7 @@ from flask import Blueprint, jsonify, request, session
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from app import db
+from app.db_routing import replica_read
 from app.models import (
     Product,
     ProductOption,
@@ -61,6 +62,7 @@ def login_owner():
 
 
 @restaurant_bp.route("/restaurants", methods=["GET"])
+@replica_read
 def list_restaurants():
     restaurants = Restaurant.query.filter_by(is_active=1).all()
     response = []
@@ -81,6 +83,7 @@ def list_restaurants():
 
 
 @restaurant_bp.route("/restaurants/<int:restaurant_id>/menu", methods=["GET"])
+@replica_read
 def get_menu(restaurant_id: int):
     restaurant = Restaurant.query.get(restaurant_id)
     if not restaurant or not restaurant.is_active:
@@ -0,0 +1,114 @@
+# app/schema_state.py - fast-boot schema check: compare a stored metadata fingerprint instead of introspecting
+import hashlib
+import logging
+from datetime import datetime
+
+from flask import abort
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger("app.schema_state")
+
+SCHEMA_STATE_NAME = "app"
+# Created by hand in migrations rather than autogenerated: SQLite FTS5 tables
+# (with their shadow tables) and MySQL FULLTEXT indexes, which are named ft_*.
+UNMANAGED_TABLE_PREFIXES = ("RestaurantSearchFts", "OrderSearchFts")
+UNMANAGED_INDEX_PREFIX = "ft_"
+# Migration matching the schema.sql of databases built before migrations existed,
+# and the tables later migrations create (a baseline database has none of them).
+BASELINE_REVISION = "2153899cfca3"
+POST_BASELINE_TABLES = frozenset(
+    {"Cart", "CartItem", "SchemaState", "CouponUsageShard", "RestaurantStats", "RestaurantSearch", "OrderSearch", "DeliveryArea", "BranchCoverage"}
+)
+
+
+def schema_fingerprint(metadata) -> str:
+    """Hash of tables, columns, keys and indexes; changes whenever the models change shape."""
+    digest = hashlib.sha256()
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        digest.update(f"T {table.name}\n".encode())
+        for column in sorted(table.columns, key=lambda c: c.name):
+            targets = ",".join(sorted(fk.target_fullname for fk in column.foreign_keys))
+            digest.update(f"C {column.name} {column.type} {column.nullable} {column.primary_key} {targets}\n".encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(f"I {index.name} {','.join(c.name for c in index.columns)} {index.unique}\n".encode())
+    return digest.hexdigest()
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Alembic autogenerate filter that skips the dialect-specific search objects."""
+    if type_ == "table" and name.startswith(UNMANAGED_TABLE_PREFIXES):
+        return False
+    if type_ == "index" and (name or "").startswith(UNMANAGED_INDEX_PREFIX):
+        return False
+    return True
+
+
+def schema_differences(connection, metadata) -> list:
+    """Alembic autogenerate diff between the live database and metadata; empty when they match."""
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+
+    context = MigrationContext.configure(connection, opts={"include_object": include_object})
+    return compare_metadata(context, metadata)
+
+
+def stored_fingerprint(connection):
+    """The recorded fingerprint, or None when the database has never been stamped."""
+    from app.models import SchemaState
+
+    try:
+        return connection.execute(
+            select(SchemaState.fingerprint).where(SchemaState.name == SCHEMA_STATE_NAME)
+        ).scalar()
+    except SQLAlchemyError:
+        connection.rollback()
+        return None
+
+
+def stamp_schema(engine, metadata, revision=None) -> str:
+    """Record the current metadata fingerprint; run after migrations have been applied."""
+    from app.models import SchemaState
+
+    fingerprint = schema_fingerprint(metadata)
+    table = SchemaState.__table__
+    with engine.begin() as conn:
+        conn.execute(table.delete().where(table.c.name == SCHEMA_STATE_NAME))
+        conn.execute(
+            table.insert().values(name=SCHEMA_STATE_NAME, fingerprint=fingerprint, revision=revision, applied_at=datetime.utcnow())
+        )
+    return fingerprint
+
+
+def schema_matches(engine, expected: str) -> bool:
+    """False when the stored fingerprint differs or the database cannot be reached."""
+    try:
+        with engine.connect() as conn:
+            return stored_fingerprint(conn) == expected
+    except SQLAlchemyError as exc:
+        logger.error("schema check could not reach the database: %s", exc)
+        return False
+
+
+def init_schema_check(app, engine, metadata) -> bool:
+    """Verify the stored fingerprint once at boot.
+
+    On a mismatch the worker still starts (so `flask schema upgrade` can run),
+    but requests get 503 until the fingerprint matches.
+    """
+    expected = schema_fingerprint(metadata)
+    if schema_matches(engine, expected):
+        return True
+    logger.error("schema fingerprint mismatch; run `flask schema upgrade` (expected %s)", expected[:12])
+    state = {"ok": False}
+
+    @app.before_request
+    def _require_current_schema():
+        if state["ok"]:
+            return None
+        if not schema_matches(engine, expected):
+            abort(503)
+        state["ok"] = True
+        return None
+
+    return False
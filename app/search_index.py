@@ -0,0 +1,299 @@
+# app/search_index.py - full-text search (MySQL FULLTEXT, SQLite FTS5) over restaurants/dishes and orders, kept in sync on write
+import re
+from abc import ABC, abstractmethod
+
+from sqlalchemy import DDL, Float, bindparam, column, delete, event, func, insert, inspect, literal_column, or_, select, table, type_coerce, update
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+
+from app.models import (
+    CuisineType,
+    Order,
+    OrderSearch,
+    Product,
+    Restaurant,
+    RestaurantBranch,
+    RestaurantCuisine,
+    RestaurantSearch,
+    User,
+)
+
+MAX_TOKENS = 8
+MAX_BODY_CHARS = 60000
+MAX_TERMS_CHARS = 1024
+NAME_WEIGHT = 10.0
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_NON_DIGIT = re.compile(r"\D")
+
+
+class FtsIndex:
+    """A searchable table: its key, the text columns (weighted for ranking) and the SQLite FTS5 mirror."""
+
+    def __init__(self, model, key: str, columns, fts_table: str, weights=None):
+        self.model = model
+        self.key = key
+        self.columns = tuple(columns)
+        self.fts_table = fts_table
+        self.weights = tuple(weights or (1.0,) * len(self.columns))
+
+    def sqlite_ddl(self):
+        """External-content FTS5 table over the model's table, synced by triggers."""
+        source = self.model.__tablename__
+        cols = ", ".join(self.columns)
+        new = ", ".join(f"new.{c}" for c in self.columns)
+        old = ", ".join(f"old.{c}" for c in self.columns)
+        insert_new = f"INSERT INTO {self.fts_table}(rowid, {cols}) VALUES (new.{self.key}, {new});"
+        delete_old = f"INSERT INTO {self.fts_table}({self.fts_table}, rowid, {cols}) VALUES ('delete', old.{self.key}, {old});"
+        return (
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5({cols}, content='{source}', "
+            f"content_rowid='{self.key}', tokenize='unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER IF NOT EXISTS {source}_ai AFTER INSERT ON {source} BEGIN {insert_new} END",
+            f"CREATE TRIGGER IF NOT EXISTS {source}_ad AFTER DELETE ON {source} BEGIN {delete_old} END",
+            f"CREATE TRIGGER IF NOT EXISTS {source}_au AFTER UPDATE OF {cols} ON {source} BEGIN {delete_old} {insert_new} END",
+        )
+
+
+RESTAURANT_INDEX = FtsIndex(RestaurantSearch, "restaurant_id", ("name", "body"), "RestaurantSearchFts", (NAME_WEIGHT, 1.0))
+ORDER_INDEX = FtsIndex(OrderSearch, "order_id", ("terms",), "OrderSearchFts")
+
+for _index in (RESTAURANT_INDEX, ORDER_INDEX):
+    for _statement in _index.sqlite_ddl():
+        event.listen(_index.model.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    event.listen(_index.model.__table__, "before_drop", DDL(f"DROP TABLE IF EXISTS {_index.fts_table}").execute_if(dialect="sqlite"))
+
+
+def tokenize(query: str) -> list:
+    return _TOKEN.findall((query or "").lower())[:MAX_TOKENS]
+
+
+class SearchBackend(ABC):
+    """Turns query tokens into a select of (key, score) on an index; every token must match as a prefix."""
+
+    @abstractmethod
+    def matches(self, index: FtsIndex, tokens):
+        """Select of (index.key, score) rows matching every token."""
+
+
+class SqliteFtsBackend(SearchBackend):
+    def matches(self, index, tokens):
+        # bm25 is lower-is-better.
+        expression = " ".join(f'"{token}"*' for token in tokens)
+        fts = table(index.fts_table, column("rowid"))
+        return select(
+            fts.c.rowid.label(index.key),
+            (-func.bm25(literal_column(index.fts_table), *index.weights)).label("score"),
+        ).where(literal_column(index.fts_table).op("MATCH")(bindparam("fts_query", expression)))
+
+
+class MysqlFulltextBackend(SearchBackend):
+    def matches(self, index, tokens):
+        against = bindparam("fts_query", " ".join(f"+{token}*" for token in tokens))
+        columns = [getattr(index.model, c) for c in index.columns]
+        document = match(*columns, against=against).in_boolean_mode()
+        score = type_coerce(document, Float)
+        if len(columns) > 1:
+            first = match(columns[0], against=against).in_boolean_mode()
+            score = type_coerce(first, Float) * index.weights[0] + score
+        return select(getattr(index.model, index.key), score.label("score")).where(document)
+
+
+class LikeBackend(SearchBackend):
+    """Fallback for other databases: unranked substring match."""
+
+    def matches(self, index, tokens):
+        columns = [getattr(index.model, c) for c in index.columns]
+        conditions = [or_(*(c.ilike(f"%{t}%") for c in columns)) for t in tokens]
+        return select(getattr(index.model, index.key), literal_column("0").label("score")).where(*conditions)
+
+
+BACKENDS = {"sqlite": SqliteFtsBackend, "mysql": MysqlFulltextBackend}
+
+
+def search_backend(dialect_name: str) -> SearchBackend:
+    return BACKENDS.get(dialect_name, LikeBackend)()
+
+
+def search_matches(query: str, dialect_name: str):
+    """Subquery of (restaurant_id, score) for the search text, or None when it has no tokens."""
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    return search_backend(dialect_name).matches(RESTAURANT_INDEX, tokens).subquery("search_matches")
+
+
+def order_search_filter(query: str, dialect_name: str):
+    """WHERE clause on Order for the console search box, or None when the query has no words.
+
+    A number matches that order id or phones starting with it; words must
+    prefix-match the customer name, phone or restaurant name.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    matched = search_backend(dialect_name).matches(ORDER_INDEX, tokens).subquery("order_matches")
+    condition = Order.id.in_(select(matched.c.order_id))
+    if len(tokens) == 1 and tokens[0].isdigit():
+        condition = or_(Order.id == int(tokens[0]), condition)
+    return condition
+
+
+def _restaurant_documents(conn, restaurant_ids=None):
+    restaurants = select(Restaurant.id, Restaurant.name)
+    cuisines = select(RestaurantCuisine.restaurant_id, CuisineType.name).join(CuisineType, RestaurantCuisine.cuisine_id == CuisineType.id)
+    products = select(Product.restaurant_id, Product.name, Product.description).where(Product.is_active == True)  # noqa: E712
+    if restaurant_ids is not None:
+        restaurants = restaurants.where(Restaurant.id.in_(restaurant_ids))
+        cuisines = cuisines.where(RestaurantCuisine.restaurant_id.in_(restaurant_ids))
+        products = products.where(Product.restaurant_id.in_(restaurant_ids))
+
+    parts = {}
+    for rid, name in conn.execute(cuisines):
+        parts.setdefault(rid, []).append(name)
+    for rid, name, description in conn.execute(products.order_by(Product.restaurant_id, Product.id)):
+        parts.setdefault(rid, []).extend(p for p in (name, description) if p)
+    return [
+        {"restaurant_id": rid, "name": name, "body": "\n".join(parts.get(rid, []))[:MAX_BODY_CHARS]}
+        for rid, name in conn.execute(restaurants)
+    ]
+
+
+def _phone_terms(phone):
+    digits = _NON_DIGIT.sub("", phone or "")
+    # Also index the national number so "532..." finds "+90 532 ...".
+    return [term for term in dict.fromkeys((digits, digits[-10:])) if term]
+
+
+def _order_documents(conn, order_ids=None):
+    query = (
+        select(Order.id, Order.status, User.name, User.phone, Restaurant.name)
+        .join(User, Order.user_id == User.id)
+        .join(RestaurantBranch, Order.branch_id == RestaurantBranch.id)
+        .join(Restaurant, RestaurantBranch.restaurant_id == Restaurant.id)
+    )
+    if order_ids is not None:
+        query = query.where(Order.id.in_(order_ids))
+    return [
+        {
+            "order_id": oid,
+            "status": status,
+            "customer_name": customer,
+            "customer_phone": phone,
+            "restaurant_name": restaurant,
+            "terms": " ".join([customer, *_phone_terms(phone), restaurant])[:MAX_TERMS_CHARS],
+        }
+        for oid, status, customer, phone, restaurant in conn.execute(query)
+    ]
+
+
+def _replace(conn, model, key, rows, ids):
+    stmt = delete(model)
+    if ids is not None:
+        stmt = stmt.where(getattr(model, key).in_(ids))
+    conn.execute(stmt)
+    if rows:
+        conn.execute(insert(model), rows)
+    return len(rows)
+
+
+def rebuild_search_index(conn, restaurant_ids=None) -> int:
+    """Replace search documents (all, or only restaurant_ids) from the catalog tables."""
+    if restaurant_ids is not None and not restaurant_ids:
+        return 0
+    return _replace(conn, RestaurantSearch, "restaurant_id", _restaurant_documents(conn, restaurant_ids), restaurant_ids)
+
+
+def reindex_orders(conn, order_ids=None) -> int:
+    """Replace order search rows (all, or only order_ids) from orders, customers and restaurants."""
+    if order_ids is not None and not order_ids:
+        return 0
+    ids = sorted(order_ids) if order_ids is not None else None
+    return _replace(conn, OrderSearch, "order_id", _order_documents(conn, ids), ids)
+
+
+def stale_order_ids(conn, limit=None) -> list:
+    """Orders with no search row, or whose customer or restaurant changed name or phone since indexing."""
+    query = (
+        select(Order.id)
+        .join(User, Order.user_id == User.id)
+        .join(RestaurantBranch, Order.branch_id == RestaurantBranch.id)
+        .join(Restaurant, RestaurantBranch.restaurant_id == Restaurant.id)
+        .outerjoin(OrderSearch, OrderSearch.order_id == Order.id)
+        .where(
+            or_(
+                OrderSearch.order_id.is_(None),
+                OrderSearch.customer_name != User.name,
+                OrderSearch.customer_phone.is_distinct_from(User.phone),
+                OrderSearch.restaurant_name != Restaurant.name,
+            )
+        )
+        .order_by(Order.id)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return list(conn.execute(query).scalars())
+
+
+def set_indexed_status(conn, order_ids, status: str) -> None:
+    """Status changes only touch the status column; the indexed terms stay as they are."""
+    if order_ids:
+        conn.execute(update(OrderSearch).where(OrderSearch.order_id.in_(sorted(order_ids))).values(status=status))
+
+
+@event.listens_for(RestaurantSearch.metadata, "after_create")
+def _fill_created_indexes(_metadata, connection, tables=(), **_kw):
+    """create_all that adds the search table to a database with data: index what is already there."""
+    if RestaurantSearch.__table__ in tables:
+        rebuild_search_index(connection)
+    if OrderSearch.__table__ in tables:
+        reindex_orders(connection)
+
+
+def _changed(obj, *attrs):
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_search_index(session, _flush_context):
+    rebuild = set()
+    renamed_cuisines = set()
+    orders = set()
+    statuses = {}
+    for obj in session.new:
+        if isinstance(obj, Restaurant):
+            rebuild.add(obj.id)
+        elif isinstance(obj, (Product, RestaurantCuisine)):
+            rebuild.add(obj.restaurant_id)
+        elif isinstance(obj, Order):
+            orders.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Restaurant) and _changed(obj, "name"):
+            # Orders of renamed restaurants and customers are left to `flask search refresh-orders`.
+            rebuild.add(obj.id)
+        elif isinstance(obj, Product) and _changed(obj, "name", "description", "is_active", "restaurant_id"):
+            rebuild.add(obj.restaurant_id)
+            rebuild.update(inspect(obj).attrs.restaurant_id.history.deleted)
+        elif isinstance(obj, CuisineType) and _changed(obj, "name"):
+            renamed_cuisines.add(obj.id)
+        elif isinstance(obj, Order) and _changed(obj, "status"):
+            statuses.setdefault(obj.status, set()).add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, (Product, RestaurantCuisine)):
+            rebuild.add(obj.restaurant_id)
+    if not (rebuild or renamed_cuisines or orders or statuses):
+        return
+
+    conn = session.connection()
+    if renamed_cuisines:
+        rebuild.update(
+            conn.execute(
+                select(RestaurantCuisine.restaurant_id).where(RestaurantCuisine.cuisine_id.in_(sorted(renamed_cuisines)))
+            ).scalars()
+        )
+    rebuild.discard(None)
+    orders.discard(None)
+    rebuild_search_index(conn, sorted(rebuild))
+    reindex_orders(conn, orders)
+    for status, order_ids in statuses.items():
+        set_indexed_status(conn, order_ids - orders, status)
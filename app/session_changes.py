@@ -0,0 +1,48 @@
+# app/session_changes.py - changes recorded during a transaction, acted on once the outer transaction ends
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_commit_handlers = {}
+
+
+def on_commit(key):
+    """Register handler(values) to run after a transaction that recorded key commits.
+
+    Savepoints don't count: releasing one keeps the changes pending for the
+    outer transaction, and rolling one back keeps what the outer transaction
+    recorded. Only the outermost commit runs the handler and only the
+    outermost rollback discards the changes.
+    """
+
+    def register(handler):
+        _commit_handlers[key] = handler
+        return handler
+
+    return register
+
+
+def record_change(session, key, values=()) -> None:
+    """Mark key as changed in this transaction, optionally with the ids it touched."""
+    session.info.setdefault(key, set()).update(values)
+
+
+def has_changes(session, key) -> bool:
+    return key in session.info
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session):
+    if session.in_nested_transaction():
+        return
+    for key, handler in _commit_handlers.items():
+        values = session.info.pop(key, None)
+        if values is not None:
+            handler(values)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_on_rollback(session, previous_transaction):
+    if previous_transaction.nested or session.in_transaction():
+        return
+    for key in _commit_handlers:
+        session.info.pop(key, None)
@@ -0,0 +1,149 @@
+# app/sql_profiler.py - per-request SQL counts, timing, fingerprints and N+1 hints
+import re
+import time
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_NPLUSONE_THRESHOLD = 5
+
+# Upper bounds on queries per request, including cold-cache requests. Keep them
+# a little above the measured counts; a jump usually means a new N+1.
+DEFAULT_QUERY_BUDGETS = {
+    "main.home": 3,
+    "customer.customer_dashboard": 6,
+    "customer.customer_restaurants": 6,
+    "customer.restaurant_detail": 10,
+    "customer.customer_cart": 6,
+    "customer.customer_order_summary": 6,
+    "customer.customer_orders": 3,
+    "customer.order_detail": 6,
+    "restaurant.restaurant_dashboard": 4,
+    "restaurant.restaurant_menu": 4,
+    "restaurant.restaurant_orders": 4,
+    "restaurant.order_detail": 10,
+    "admin.admin_orders": 3,
+    "admin.admin_order_detail": 5,
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when SQL_ENFORCE_BUDGETS is on and an endpoint runs over its budget."""
+
+
+def fingerprint(statement: str) -> str:
+    """Statement text with literals and IN-lists folded, so the same query shape compares equal."""
+    text = _WHITESPACE.sub(" ", statement).strip()
+    text = _LITERAL.sub("?", text)
+    return _PLACEHOLDER_LIST.sub("(?)", text)
+
+
+class RequestProfile:
+    __slots__ = ("count", "db_time", "fingerprints", "param_sets")
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.fingerprints = Counter()
+        self.param_sets = {}
+
+    def record(self, statement, parameters, elapsed):
+        self.count += 1
+        self.db_time += elapsed
+        key = fingerprint(statement)
+        self.fingerprints[key] += 1
+        self.param_sets.setdefault(key, set()).add(repr(parameters))
+
+    def repeated(self, threshold: int = 2):
+        return [(key, n) for key, n in self.fingerprints.most_common() if n >= threshold]
+
+    def nplusone_suspects(self, threshold: int = DEFAULT_NPLUSONE_THRESHOLD):
+        """SELECTs of one shape run threshold+ times with different parameters."""
+        return [
+            (key, n)
+            for key, n in self.repeated(threshold)
+            if key.startswith("SELECT") and len(self.param_sets[key]) >= threshold
+        ]
+
+
+def current_profile():
+    if not has_request_context():
+        return None
+    return g.get("sql_profile")
+
+
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("sql_profile_start", []).append(time.perf_counter())
+
+
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["sql_profile_start"].pop()
+    profile = current_profile()
+    if profile is not None:
+        profile.record(statement, parameters, time.perf_counter() - started)
+
+
+def _discard_timer(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    # so the stack stays balanced on the pooled connection.
+    conn = exception_context.connection
+    if conn is not None and exception_context.statement is not None and not exception_context.is_pre_ping:
+        stack = conn.info.get("sql_profile_start")
+        if stack:
+            stack.pop()
+
+
+_LISTENERS = (
+    ("before_cursor_execute", _start_timer),
+    ("after_cursor_execute", _stop_timer),
+    ("handle_error", _discard_timer),
+)
+
+
+def _install_listeners() -> None:
+    for name, listener in _LISTENERS:
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+
+
+def init_sql_profiler(app) -> None:
+    if not app.config.get("SQL_PROFILING", True):
+        return
+    _install_listeners()
+
+    @app.before_request
+    def _begin_profile():
+        g.sql_profile = RequestProfile()
+
+    @app.after_request
+    def _report_profile(response):
+        profile = g.get("sql_profile")
+        if profile is None:
+            return response
+        endpoint = request.endpoint or "-"
+        db_ms = profile.db_time * 1000
+        threshold = app.config.get("SQL_NPLUSONE_THRESHOLD", DEFAULT_NPLUSONE_THRESHOLD)
+        suspects = profile.nplusone_suspects(threshold)
+        if app.config.get("SQL_PROFILE_HEADERS"):
+            response.headers["X-SQL-Queries"] = str(profile.count)
+            response.headers["X-SQL-Time-ms"] = f"{db_ms:.1f}"
+            response.headers["Server-Timing"] = f"db;dur={db_ms:.1f}"
+            if suspects:
+                response.headers["X-SQL-NPlusOne"] = str(len(suspects))
+        for key, n in suspects:
+            current_app.logger.warning("possible N+1 endpoint=%s repeats=%d sql=%s", endpoint, n, key[:200])
+
+        budgets = app.config.get("SQL_QUERY_BUDGETS") or DEFAULT_QUERY_BUDGETS
+        budget = budgets.get(endpoint)
+        if budget is not None and profile.count > budget:
+            message = f"{endpoint} ran {profile.count} queries (budget {budget})"
+            if app.config.get("SQL_ENFORCE_BUDGETS"):
+                raise QueryBudgetExceeded(message)
+            current_app.logger.warning("query budget exceeded: %s", message)
+        return response
@@ -0,0 +1,84 @@
+"""restaurant search documents
+
+Revision ID: 49fc76af225e
+Revises: 5b0e2f4c8a91
+Create Date: 2026-10-17 05:02:11.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '49fc76af225e'
+down_revision = '5b0e2f4c8a91'
+branch_labels = None
+depends_on = None
+
+SQLITE_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS RestaurantSearchFts USING fts5("
+    "name, body, content='RestaurantSearch', content_rowid='restaurant_id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS RestaurantSearch_ai AFTER INSERT ON RestaurantSearch BEGIN "
+    "INSERT INTO RestaurantSearchFts(rowid, name, body) VALUES (new.restaurant_id, new.name, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS RestaurantSearch_ad AFTER DELETE ON RestaurantSearch BEGIN "
+    "INSERT INTO RestaurantSearchFts(RestaurantSearchFts, rowid, name, body) VALUES ('delete', old.restaurant_id, old.name, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS RestaurantSearch_au AFTER UPDATE ON RestaurantSearch BEGIN "
+    "INSERT INTO RestaurantSearchFts(RestaurantSearchFts, rowid, name, body) VALUES ('delete', old.restaurant_id, old.name, old.body); "
+    "INSERT INTO RestaurantSearchFts(rowid, name, body) VALUES (new.restaurant_id, new.name, new.body); END",
+)
+
+MAX_BODY_CHARS = 60000
+
+
+def _backfill_documents(conn):
+    """Index the restaurants that already exist, as app.search_index.rebuild_search_index does."""
+    restaurant = sa.table('Restaurant', sa.column('restaurant_id'), sa.column('name'))
+    cuisine = sa.table('CuisineType', sa.column('cuisine_id'), sa.column('name'))
+    link = sa.table('RestaurantCuisine', sa.column('restaurant_id'), sa.column('cuisine_id'))
+    product = sa.table(
+        'Product', sa.column('product_id'), sa.column('restaurant_id'), sa.column('name'), sa.column('description'), sa.column('is_active')
+    )
+    search = sa.table('RestaurantSearch', sa.column('restaurant_id'), sa.column('name'), sa.column('body'))
+
+    parts = {}
+    for rid, name in conn.execute(
+        sa.select(link.c.restaurant_id, cuisine.c.name).join(cuisine, link.c.cuisine_id == cuisine.c.cuisine_id)
+    ):
+        parts.setdefault(rid, []).append(name)
+    for rid, name, description in conn.execute(
+        sa.select(product.c.restaurant_id, product.c.name, product.c.description)
+        .where(product.c.is_active == sa.true())
+        .order_by(product.c.restaurant_id, product.c.product_id)
+    ):
+        parts.setdefault(rid, []).extend(p for p in (name, description) if p)
+    rows = [
+        {'restaurant_id': rid, 'name': name, 'body': '\n'.join(parts.get(rid, []))[:MAX_BODY_CHARS]}
+        for rid, name in conn.execute(sa.select(restaurant.c.restaurant_id, restaurant.c.name))
+    ]
+    if rows:
+        conn.execute(search.insert(), rows)
+
+
+def upgrade():
+    op.create_table('RestaurantSearch',
+    sa.Column('restaurant_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['Restaurant.restaurant_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('restaurant_id')
+    )
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.create_index('ft_restaurant_search_name', 'RestaurantSearch', ['name'], mysql_prefix='FULLTEXT')
+        op.create_index('ft_restaurant_search_doc', 'RestaurantSearch', ['name', 'body'], mysql_prefix='FULLTEXT')
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS:
+            op.execute(statement)
+    _backfill_documents(op.get_bind())
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS RestaurantSearchFts")
+    op.drop_table('RestaurantSearch')
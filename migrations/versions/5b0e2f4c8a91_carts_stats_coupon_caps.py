@@ -0,0 +1,104 @@
+"""server-side carts, restaurant stats, coupon caps and order idempotency
+
+Revision ID: 5b0e2f4c8a91
+Revises: 2153899cfca3
+Create Date: 2026-10-17 04:40:12.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b0e2f4c8a91'
+down_revision = '2153899cfca3'
+branch_labels = None
+depends_on = None
+
+BACKFILL_STATS = (
+    "INSERT INTO RestaurantStats (restaurant_id, is_active, review_count, rating_sum, avg_rating, min_order_amount) "
+    "SELECT r.restaurant_id, COALESCE(r.is_active, 1), COALESCE(rv.review_count, 0), COALESCE(rv.rating_sum, 0), "
+    "rv.rating_sum * 1.0 / rv.review_count, b.min_order_amount FROM Restaurant r "
+    "LEFT JOIN (SELECT restaurant_id, COUNT(*) AS review_count, SUM(rating) AS rating_sum FROM Review "
+    "GROUP BY restaurant_id) rv ON rv.restaurant_id = r.restaurant_id "
+    "LEFT JOIN (SELECT restaurant_id, MIN(min_order_amount) AS min_order_amount FROM RestaurantBranch "
+    "WHERE is_active = 1 GROUP BY restaurant_id) b ON b.restaurant_id = r.restaurant_id"
+)
+
+
+def upgrade():
+    op.create_table('Cart',
+    sa.Column('cart_id', sa.String(length=32), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('cart_id')
+    )
+    with op.batch_alter_table('Cart', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_Cart_updated_at'), ['updated_at'], unique=False)
+
+    op.create_table('CartItem',
+    sa.Column('cart_id', sa.String(length=32), nullable=False),
+    sa.Column('product_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['cart_id'], ['Cart.cart_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['product_id'], ['Product.product_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('cart_id', 'product_id')
+    )
+    op.create_table('SchemaState',
+    sa.Column('name', sa.String(length=32), nullable=False),
+    sa.Column('fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('revision', sa.String(length=32), nullable=True),
+    sa.Column('applied_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('CouponUsageShard',
+    sa.Column('coupon_id', sa.Integer(), nullable=False),
+    sa.Column('shard_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('capacity', sa.Integer(), nullable=False),
+    sa.Column('usage_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['coupon_id'], ['Coupon.coupon_id'], ),
+    sa.PrimaryKeyConstraint('coupon_id', 'shard_id')
+    )
+    op.create_table('RestaurantStats',
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('avg_rating', sa.Float(), nullable=True),
+    sa.Column('min_order_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['Restaurant.restaurant_id'], ),
+    sa.PrimaryKeyConstraint('restaurant_id')
+    )
+    with op.batch_alter_table('RestaurantStats', schema=None) as batch_op:
+        batch_op.create_index('idx_restaurant_stats_min_order', ['is_active', 'min_order_amount'], unique=False)
+        batch_op.create_index('idx_restaurant_stats_rating', ['is_active', 'avg_rating'], unique=False)
+
+    with op.batch_alter_table('Coupon', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('max_total_usage', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('Order', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint('uq_order_user_idempotency', ['user_id', 'idempotency_key'])
+
+    op.execute(BACKFILL_STATS)
+
+
+def downgrade():
+    with op.batch_alter_table('Order', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_order_user_idempotency', type_='unique')
+        batch_op.drop_column('idempotency_key')
+
+    with op.batch_alter_table('Coupon', schema=None) as batch_op:
+        batch_op.drop_column('max_total_usage')
+
+    with op.batch_alter_table('RestaurantStats', schema=None) as batch_op:
+        batch_op.drop_index('idx_restaurant_stats_rating')
+        batch_op.drop_index('idx_restaurant_stats_min_order')
+
+    op.drop_table('RestaurantStats')
+    op.drop_table('CouponUsageShard')
+    op.drop_table('SchemaState')
+    op.drop_table('CartItem')
+    with op.batch_alter_table('Cart', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_Cart_updated_at'))
+
+    op.drop_table('Cart')
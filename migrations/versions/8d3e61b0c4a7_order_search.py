@@ -0,0 +1,98 @@
+"""order search rows
+
+Revision ID: 8d3e61b0c4a7
+Revises: 49fc76af225e
+Create Date: 2026-10-17 07:41:36.118204
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d3e61b0c4a7'
+down_revision = '49fc76af225e'
+branch_labels = None
+depends_on = None
+
+SQLITE_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS OrderSearchFts USING fts5("
+    "terms, content='OrderSearch', content_rowid='order_id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS OrderSearch_ai AFTER INSERT ON OrderSearch BEGIN "
+    "INSERT INTO OrderSearchFts(rowid, terms) VALUES (new.order_id, new.terms); END",
+    "CREATE TRIGGER IF NOT EXISTS OrderSearch_ad AFTER DELETE ON OrderSearch BEGIN "
+    "INSERT INTO OrderSearchFts(OrderSearchFts, rowid, terms) VALUES ('delete', old.order_id, old.terms); END",
+    "CREATE TRIGGER IF NOT EXISTS OrderSearch_au AFTER UPDATE OF terms ON OrderSearch BEGIN "
+    "INSERT INTO OrderSearchFts(OrderSearchFts, rowid, terms) VALUES ('delete', old.order_id, old.terms); "
+    "INSERT INTO OrderSearchFts(rowid, terms) VALUES (new.order_id, new.terms); END",
+)
+
+MAX_TERMS_CHARS = 1024
+
+
+def _phone_terms(phone):
+    digits = re.sub(r'\D', '', phone or '')
+    return [term for term in dict.fromkeys((digits, digits[-10:])) if term]
+
+
+def _backfill_orders(conn):
+    """Index the orders that already exist, as app.search_index.reindex_orders does."""
+    order = sa.table('Order', sa.column('order_id'), sa.column('user_id'), sa.column('branch_id'), sa.column('status'))
+    user = sa.table('User', sa.column('user_id'), sa.column('name'), sa.column('phone'))
+    branch = sa.table('RestaurantBranch', sa.column('branch_id'), sa.column('restaurant_id'))
+    restaurant = sa.table('Restaurant', sa.column('restaurant_id'), sa.column('name'))
+    search = sa.table(
+        'OrderSearch', sa.column('order_id'), sa.column('status'), sa.column('customer_name'),
+        sa.column('customer_phone'), sa.column('restaurant_name'), sa.column('terms'),
+    )
+    query = (
+        sa.select(order.c.order_id, order.c.status, user.c.name, user.c.phone, restaurant.c.name)
+        .join(user, order.c.user_id == user.c.user_id)
+        .join(branch, order.c.branch_id == branch.c.branch_id)
+        .join(restaurant, branch.c.restaurant_id == restaurant.c.restaurant_id)
+        .order_by(order.c.order_id)
+    )
+    batch = []
+    for oid, status, customer, phone, restaurant_name in conn.execute(query):
+        batch.append({
+            'order_id': oid,
+            'status': status or 'pending',
+            'customer_name': customer,
+            'customer_phone': phone,
+            'restaurant_name': restaurant_name,
+            'terms': ' '.join([customer, *_phone_terms(phone), restaurant_name])[:MAX_TERMS_CHARS],
+        })
+        if len(batch) >= 1000:
+            conn.execute(search.insert(), batch)
+            batch = []
+    if batch:
+        conn.execute(search.insert(), batch)
+
+
+def upgrade():
+    op.create_table('OrderSearch',
+    sa.Column('order_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('customer_name', sa.String(length=255), nullable=False),
+    sa.Column('customer_phone', sa.String(length=20), nullable=True),
+    sa.Column('restaurant_name', sa.String(length=255), nullable=False),
+    sa.Column('terms', sa.String(length=1024), nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['Order.order_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('order_id')
+    )
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.create_index('ft_order_search_terms', 'OrderSearch', ['terms'], mysql_prefix='FULLTEXT')
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS:
+            op.execute(statement)
+    _backfill_orders(op.get_bind())
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS OrderSearchFts")
+    op.drop_table('OrderSearch')
@@ -0,0 +1,26 @@
+"""menu version on restaurant stats
+
+Revision ID: a4d7e2c9b315
+Revises: e7a2b94d1f08
+Create Date: 2026-10-17 11:20:46.305118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d7e2c9b315'
+down_revision = 'e7a2b94d1f08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('RestaurantStats', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('menu_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('RestaurantStats', schema=None) as batch_op:
+        batch_op.drop_column('menu_version')
@@ -0,0 +1,70 @@
+"""delivery areas and branch coverage
+
+Revision ID: c51f0a9e2d36
+Revises: 8d3e61b0c4a7
+Create Date: 2026-10-17 09:12:48.530127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c51f0a9e2d36'
+down_revision = '8d3e61b0c4a7'
+branch_labels = None
+depends_on = None
+
+# No delivery areas exist yet, so every active branch covers its own district.
+BACKFILL_COVERAGE = (
+    "INSERT INTO BranchCoverage (neighborhood_id, restaurant_id, branch_id) "
+    "SELECT n.neighborhood_id, b.restaurant_id, b.branch_id FROM RestaurantBranch b "
+    "JOIN Neighborhood home ON home.neighborhood_id = b.neighborhood_id "
+    "JOIN Neighborhood n ON n.district_id = home.district_id "
+    "WHERE b.is_active = 1"
+)
+
+
+def upgrade():
+    op.create_table('DeliveryArea',
+    sa.Column('area_id', sa.Integer(), nullable=False),
+    sa.Column('branch_id', sa.Integer(), nullable=False),
+    sa.Column('neighborhood_id', sa.Integer(), nullable=True),
+    sa.Column('district_id', sa.Integer(), nullable=True),
+    sa.CheckConstraint('(neighborhood_id IS NULL) <> (district_id IS NULL)', name='ck_delivery_area_target'),
+    sa.ForeignKeyConstraint(['branch_id'], ['RestaurantBranch.branch_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['district_id'], ['District.district_id'], ),
+    sa.ForeignKeyConstraint(['neighborhood_id'], ['Neighborhood.neighborhood_id'], ),
+    sa.PrimaryKeyConstraint('area_id')
+    )
+    with op.batch_alter_table('DeliveryArea', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_DeliveryArea_branch_id'), ['branch_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_DeliveryArea_district_id'), ['district_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_DeliveryArea_neighborhood_id'), ['neighborhood_id'], unique=False)
+
+    op.create_table('BranchCoverage',
+    sa.Column('neighborhood_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('branch_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.ForeignKeyConstraint(['branch_id'], ['RestaurantBranch.branch_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['neighborhood_id'], ['Neighborhood.neighborhood_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['Restaurant.restaurant_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('neighborhood_id', 'restaurant_id', 'branch_id')
+    )
+    with op.batch_alter_table('BranchCoverage', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_BranchCoverage_branch_id'), ['branch_id'], unique=False)
+
+    op.execute(BACKFILL_COVERAGE)
+
+
+def downgrade():
+    with op.batch_alter_table('BranchCoverage', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_BranchCoverage_branch_id'))
+
+    op.drop_table('BranchCoverage')
+    with op.batch_alter_table('DeliveryArea', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_DeliveryArea_neighborhood_id'))
+        batch_op.drop_index(batch_op.f('ix_DeliveryArea_district_id'))
+        batch_op.drop_index(batch_op.f('ix_DeliveryArea_branch_id'))
+
+    op.drop_table('DeliveryArea')
@@ -0,0 +1,36 @@
+"""optional coordinates on neighborhoods and addresses
+
+Revision ID: e7a2b94d1f08
+Revises: c51f0a9e2d36
+Create Date: 2026-10-17 10:03:27.771459
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a2b94d1f08'
+down_revision = 'c51f0a9e2d36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('Neighborhood', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('latitude', sa.Numeric(precision=9, scale=6), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Numeric(precision=9, scale=6), nullable=True))
+
+    with op.batch_alter_table('UserAddress', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('latitude', sa.Numeric(precision=9, scale=6), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Numeric(precision=9, scale=6), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('UserAddress', schema=None) as batch_op:
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
+
+    with op.batch_alter_table('Neighborhood', schema=None) as batch_op:
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
@@ -32,6 +32,8 @@ CREATE TABLE `Neighborhood` (
   `neighborhood_id` INT UNSIGNED NOT NULL AUTO_INCREMENT,
   `district_id` INT UNSIGNED NOT NULL,
   `name` VARCHAR(255) NOT NULL,
+  `latitude` DECIMAL(9,6) NULL,
+  `longitude` DECIMAL(9,6) NULL,
   PRIMARY KEY (`neighborhood_id`),
   UNIQUE KEY `uq_neighborhood_district_name` (`district_id`,`name`),
   KEY `idx_neighborhood_district` (`district_id`),
@@ -65,6 +67,32 @@ CREATE TABLE `RestaurantBranch` (
   CONSTRAINT `fk_branch_neighborhood` FOREIGN KEY (`neighborhood_id`) REFERENCES `Neighborhood`(`neighborhood_id`) ON DELETE RESTRICT ON UPDATE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+CREATE TABLE `DeliveryArea` (
+  `area_id` INT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `branch_id` INT UNSIGNED NOT NULL,
+  `neighborhood_id` INT UNSIGNED NULL,
+  `district_id` INT UNSIGNED NULL,
+  PRIMARY KEY (`area_id`),
+  KEY `ix_DeliveryArea_branch_id` (`branch_id`),
+  KEY `ix_DeliveryArea_neighborhood_id` (`neighborhood_id`),
+  KEY `ix_DeliveryArea_district_id` (`district_id`),
+  CONSTRAINT `ck_delivery_area_target` CHECK ((`neighborhood_id` IS NULL) <> (`district_id` IS NULL)),
+  CONSTRAINT `fk_deliveryarea_branch` FOREIGN KEY (`branch_id`) REFERENCES `RestaurantBranch`(`branch_id`) ON DELETE CASCADE ON UPDATE CASCADE,
+  CONSTRAINT `fk_deliveryarea_neighborhood` FOREIGN KEY (`neighborhood_id`) REFERENCES `Neighborhood`(`neighborhood_id`) ON DELETE RESTRICT ON UPDATE CASCADE,
+  CONSTRAINT `fk_deliveryarea_district` FOREIGN KEY (`district_id`) REFERENCES `District`(`district_id`) ON DELETE RESTRICT ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE `BranchCoverage` (
+  `neighborhood_id` INT UNSIGNED NOT NULL,
+  `restaurant_id` INT UNSIGNED NOT NULL,
+  `branch_id` INT UNSIGNED NOT NULL,
+  PRIMARY KEY (`neighborhood_id`, `restaurant_id`, `branch_id`),
+  KEY `ix_BranchCoverage_branch_id` (`branch_id`),
+  CONSTRAINT `fk_branchcoverage_neighborhood` FOREIGN KEY (`neighborhood_id`) REFERENCES `Neighborhood`(`neighborhood_id`) ON DELETE CASCADE ON UPDATE CASCADE,
+  CONSTRAINT `fk_branchcoverage_restaurant` FOREIGN KEY (`restaurant_id`) REFERENCES `Restaurant`(`restaurant_id`) ON DELETE CASCADE ON UPDATE CASCADE,
+  CONSTRAINT `fk_branchcoverage_branch` FOREIGN KEY (`branch_id`) REFERENCES `RestaurantBranch`(`branch_id`) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 CREATE TABLE `UserAddress` (
   `address_id` INT UNSIGNED NOT NULL AUTO_INCREMENT,
   `user_id` INT UNSIGNED NOT NULL,
@@ -72,6 +100,8 @@ CREATE TABLE `UserAddress` (
   `title` VARCHAR(100) NOT NULL,
   `address_line` VARCHAR(500) NOT NULL,
   `is_default` TINYINT(1) NOT NULL DEFAULT 0,
+  `latitude` DECIMAL(9,6) NULL,
+  `longitude` DECIMAL(9,6) NULL,
   PRIMARY KEY (`address_id`),
   KEY `idx_useraddress_user` (`user_id`),
   KEY `idx_useraddress_neighborhood` (`neighborhood_id`),
@@ -165,6 +195,7 @@ CREATE TABLE `Coupon` (
   `valid_from` DATETIME NOT NULL,
   `valid_to` DATETIME NOT NULL,
   `max_usage_per_user` INT UNSIGNED,
+  `max_total_usage` INT UNSIGNED,
   `is_active` TINYINT(1) NOT NULL DEFAULT 1,
   PRIMARY KEY (`coupon_id`),
   UNIQUE KEY `uq_coupon_code` (`code`)
@@ -180,6 +211,31 @@ CREATE TABLE `UserCoupon` (
   CONSTRAINT `fk_usercoupon_coupon` FOREIGN KEY (`coupon_id`) REFERENCES `Coupon`(`coupon_id`) ON DELETE CASCADE ON UPDATE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+CREATE TABLE `CouponUsageShard` (
+  `coupon_id` INT UNSIGNED NOT NULL,
+  `shard_id` SMALLINT UNSIGNED NOT NULL,
+  `capacity` INT UNSIGNED NOT NULL,
+  `usage_count` INT UNSIGNED NOT NULL DEFAULT 0,
+  PRIMARY KEY (`coupon_id`,`shard_id`),
+  CONSTRAINT `fk_couponshard_coupon` FOREIGN KEY (`coupon_id`) REFERENCES `Coupon`(`coupon_id`) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE `Cart` (
+  `cart_id` CHAR(32) NOT NULL,
+  `updated_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`cart_id`),
+  KEY `idx_cart_updated` (`updated_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE `CartItem` (
+  `cart_id` CHAR(32) NOT NULL,
+  `product_id` INT UNSIGNED NOT NULL,
+  `quantity` SMALLINT UNSIGNED NOT NULL DEFAULT 1,
+  PRIMARY KEY (`cart_id`,`product_id`),
+  CONSTRAINT `fk_cartitem_cart` FOREIGN KEY (`cart_id`) REFERENCES `Cart`(`cart_id`) ON DELETE CASCADE ON UPDATE CASCADE,
+  CONSTRAINT `fk_cartitem_product` FOREIGN KEY (`product_id`) REFERENCES `Product`(`product_id`) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 CREATE TABLE `FavoriteRestaurant` (
   `user_id` INT UNSIGNED NOT NULL,
   `restaurant_id` INT UNSIGNED NOT NULL,
@@ -207,7 +263,9 @@ CREATE TABLE `Order` (
   `status` ENUM('pending','accepted','preparing','on_the_way','delivered','canceled') NOT NULL DEFAULT 'pending',
   `total_amount` DECIMAL(10,2) NOT NULL,
   `final_amount` DECIMAL(10,2) NOT NULL,
+  `idempotency_key` VARCHAR(64) DEFAULT NULL,
   PRIMARY KEY (`order_id`),
+  UNIQUE KEY `uq_order_user_idempotency` (`user_id`,`idempotency_key`),
   KEY `idx_order_user` (`user_id`),
   KEY `idx_order_branch` (`branch_id`),
   KEY `idx_order_address` (`address_id`),
@@ -313,3 +371,47 @@ CREATE TABLE `ProductPriceHistory` (
   CONSTRAINT `fk_pricehistory_product` FOREIGN KEY (`product_id`) REFERENCES `Product`(`product_id`) ON DELETE RESTRICT ON UPDATE CASCADE,
   CONSTRAINT `fk_pricehistory_user` FOREIGN KEY (`changed_by_user_id`) REFERENCES `User`(`user_id`) ON DELETE RESTRICT ON UPDATE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE `RestaurantStats` (
+  `restaurant_id` INT UNSIGNED NOT NULL,
+  `is_active` TINYINT(1) NOT NULL DEFAULT 1,
+  `review_count` INT NOT NULL DEFAULT 0,
+  `rating_sum` INT NOT NULL DEFAULT 0,
+  `avg_rating` DOUBLE NULL,
+  `min_order_amount` DECIMAL(10,2) NULL,
+  `menu_version` INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`restaurant_id`),
+  KEY `idx_restaurant_stats_rating` (`is_active`,`avg_rating`),
+  KEY `idx_restaurant_stats_min_order` (`is_active`,`min_order_amount`),
+  CONSTRAINT `fk_restaurantstats_restaurant` FOREIGN KEY (`restaurant_id`) REFERENCES `Restaurant`(`restaurant_id`) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE `SchemaState` (
+  `name` VARCHAR(32) NOT NULL,
+  `fingerprint` VARCHAR(64) NOT NULL,
+  `revision` VARCHAR(32) NULL,
+  `applied_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE `RestaurantSearch` (
+  `restaurant_id` INT UNSIGNED NOT NULL,
+  `name` VARCHAR(255) NOT NULL,
+  `body` TEXT NOT NULL,
+  PRIMARY KEY (`restaurant_id`),
+  FULLTEXT KEY `ft_restaurant_search_name` (`name`),
+  FULLTEXT KEY `ft_restaurant_search_doc` (`name`,`body`),
+  CONSTRAINT `fk_restaurantsearch_restaurant` FOREIGN KEY (`restaurant_id`) REFERENCES `Restaurant`(`restaurant_id`) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE `OrderSearch` (
+  `order_id` INT UNSIGNED NOT NULL,
+  `status` VARCHAR(20) NOT NULL,
+  `customer_name` VARCHAR(255) NOT NULL,
+  `customer_phone` VARCHAR(20) NULL,
+  `restaurant_name` VARCHAR(255) NOT NULL,
+  `terms` VARCHAR(1024) NOT NULL,
+  PRIMARY KEY (`order_id`),
+  FULLTEXT KEY `ft_order_search_terms` (`terms`),
+  CONSTRAINT `fk_ordersearch_order` FOREIGN KEY (`order_id`) REFERENCES `Order`(`order_id`) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
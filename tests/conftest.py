@@ -1,10 +1,42 @@
 import os
 import tempfile
+import uuid
 
 import pytest
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
 
 from app import create_app
+from app.branch_locator import branch_locator
+from app.coupon_index import coupon_index
+from app.identity import identity_cache
+from app.menu_cache import clear_menu_cache
+from app.owner_context import clear_owner_contexts
+from app.pagination import clear_count_cache
+from app.schema_state import stamp_schema
 from app.extensions import db
+from app.models import (
+    City,
+    District,
+    Neighborhood,
+    Product,
+    ProductCategory,
+    Restaurant,
+    RestaurantBranch,
+    User,
+    UserAddress,
+    UserRole,
+)
+
+
+def _clear_process_caches():
+    """Module-level caches outlive the app; ids repeat across the per-test databases."""
+    clear_menu_cache()
+    coupon_index.invalidate()
+    branch_locator.invalidate()
+    identity_cache.clear()
+    clear_owner_contexts()
+    clear_count_cache()
 
 
 @pytest.fixture
@@ -15,18 +47,118 @@ def app():
         "TESTING": True,
         "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
         "SECRET_KEY": "test-secret",
+        "CART_STORE": "memory",
+        "STRICT_LOADING": True,
+        "SQL_ENFORCE_BUDGETS": True,
+        "SQL_PROFILE_HEADERS": True,
+        "FAST_BOOT": True,
     }
     app = create_app(config_override=config)
+    _clear_process_caches()
     with app.app_context():
         db.create_all()
+        stamp_schema(db.engine, db.metadata)
     yield app
     with app.app_context():
         db.session.remove()
         db.drop_all()
         db.engine.dispose()
+    _clear_process_caches()
     os.unlink(db_path)
 
 
 @pytest.fixture
 def client(app):
     return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    def _login(user_id):
+        with client.session_transaction() as sess:
+            sess["_user_id"] = str(user_id)
+            sess["_fresh"] = True
+
+    return _login
+
+
+@pytest.fixture
+def fill_cart(app, client):
+    """Replace the test client's server-side cart with {product_id: quantity}."""
+
+    def _fill(items):
+        with client.session_transaction() as sess:
+            cart_id = sess.setdefault("cart_id", uuid.uuid4().hex)
+        store = app.extensions["cart_store"]
+        with app.app_context():
+            store.clear(cart_id)
+            for product_id, quantity in items.items():
+                store.add(cart_id, product_id, quantity)
+            db.session.commit()
+        return cart_id
+
+    return _fill
+
+
+@pytest.fixture
+def query_counter(app):
+    """Collect every SQL statement executed against the test engine."""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture
+def seed_catalog(app):
+    """Create an owner, a customer and one restaurant with a branch and products."""
+
+    def _seed(product_count=3):
+        with app.app_context():
+            owner = User(name="Owner", email="owner@example.com", password_hash=generate_password_hash("secret"), role=UserRole.RESTAURANT_OWNER)
+            customer = User(name="Customer", email="customer@example.com", password_hash=generate_password_hash("secret"), role=UserRole.CUSTOMER)
+            admin = User(name="Admin", email="admin@example.com", password_hash=generate_password_hash("secret"), role=UserRole.ADMIN)
+            db.session.add_all([owner, customer, admin])
+            db.session.flush()
+            city = City(name="Istanbul")
+            db.session.add(city)
+            db.session.flush()
+            district = District(city_id=city.id, name="Merkez")
+            db.session.add(district)
+            db.session.flush()
+            neighborhood = Neighborhood(district_id=district.id, name="Moda")
+            db.session.add(neighborhood)
+            restaurant = Restaurant(owner_id=owner.id, name="Lokanta", is_active=True)
+            db.session.add(restaurant)
+            db.session.flush()
+            branch = RestaurantBranch(restaurant_id=restaurant.id, neighborhood_id=neighborhood.id, address_line="Cadde 1", min_order_amount=0)
+            category = ProductCategory(restaurant_id=restaurant.id, name="Ana Yemek")
+            db.session.add_all([branch, category])
+            db.session.flush()
+            address = UserAddress(user_id=customer.id, neighborhood_id=neighborhood.id, title="Ev", address_line="Sokak 2", is_default=True)
+            products = [
+                Product(restaurant_id=restaurant.id, category_id=category.id, name=f"Urun {i}", price=10 + i, is_active=True)
+                for i in range(product_count)
+            ]
+            db.session.add(address)
+            db.session.add_all(products)
+            db.session.commit()
+            return {
+                "owner_id": owner.id,
+                "customer_id": customer.id,
+                "admin_id": admin.id,
+                "restaurant_id": restaurant.id,
+                "branch_id": branch.id,
+                "category_id": category.id,
+                "neighborhood_id": neighborhood.id,
+                "address_id": address.id,
+                "product_ids": [p.id for p in products],
+            }
+
+    return _seed
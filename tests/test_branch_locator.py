@@ -0,0 +1,126 @@
+import random
+
+import pytest
+
+from app.branch_locator import KdTree, distance_km
+from app.checkout import get_branch_for_restaurant, parse_point
+from app.extensions import db
+from app.models import DeliveryArea, Neighborhood, Order, RestaurantBranch, UserAddress
+
+
+def test_kd_tree_matches_brute_force():
+    rng = random.Random(7)
+    points = [(41.0 + rng.random() * 0.3, 28.8 + rng.random() * 0.4, i) for i in range(2000)]
+    tree = KdTree(points)
+    for _ in range(200):
+        target = (41.0 + rng.random() * 0.3, 28.8 + rng.random() * 0.4)
+        expected = min(points, key=lambda p: distance_km(target, p[:2]))[2]
+        assert tree.nearest(*target) == expected
+    assert tree.nearest(41.1, 29.0, accept=lambda key: key % 2 == 1) % 2 == 1
+    assert KdTree([]).nearest(41.0, 29.0) is None
+
+
+def _neighborhood(catalog, name, lat, lon):
+    district_id = db.session.get(Neighborhood, catalog["neighborhood_id"]).district_id
+    neighborhood = Neighborhood(district_id=district_id, name=name, latitude=lat, longitude=lon)
+    db.session.add(neighborhood)
+    db.session.flush()
+    return neighborhood.id
+
+
+def test_orders_go_to_the_nearest_eligible_branch(app, client, login, fill_cart, seed_catalog):
+    catalog = seed_catalog()
+    with app.app_context():
+        near = _neighborhood(catalog, "Kadikoy", 40.990, 29.030)
+        far = _neighborhood(catalog, "Sariyer", 41.170, 29.050)
+        branches = [
+            RestaurantBranch(restaurant_id=catalog["restaurant_id"], neighborhood_id=n, address_line=n_name, min_order_amount=0)
+            for n, n_name in ((near, "Yakin"), (far, "Uzak"))
+        ]
+        db.session.add_all(branches)
+        address = db.session.get(UserAddress, catalog["address_id"])
+        address.latitude, address.longitude = 41.160, 29.040
+        db.session.commit()
+        near_id, far_id = (b.id for b in branches)
+
+    login(catalog["customer_id"])
+    fill_cart({catalog["product_ids"][0]: 1})
+    client.post("/customer/order/complete")
+    with app.app_context():
+        assert Order.query.one().branch_id == far_id
+
+        # The far branch stops delivering to the customer's neighborhood.
+        db.session.add(DeliveryArea(branch_id=far_id, neighborhood_id=far))
+        db.session.commit()
+        assert get_branch_for_restaurant(catalog["restaurant_id"], catalog["neighborhood_id"], (41.16, 29.04)).id == near_id
+
+        db.session.get(RestaurantBranch, near_id).is_active = False
+        db.session.commit()
+        assert get_branch_for_restaurant(catalog["restaurant_id"], catalog["neighborhood_id"], (41.16, 29.04)).id == catalog["branch_id"]
+
+
+def test_checkout_is_refused_when_no_branch_delivers_to_the_address(app, client, login, fill_cart, seed_catalog):
+    catalog = seed_catalog()
+    with app.app_context():
+        other = _neighborhood(catalog, "Moda", 40.98, 29.03)
+        db.session.add(DeliveryArea(branch_id=catalog["branch_id"], neighborhood_id=other))
+        db.session.commit()
+        assert get_branch_for_restaurant(catalog["restaurant_id"], catalog["neighborhood_id"]) is None
+        assert get_branch_for_restaurant(catalog["restaurant_id"], other).id == catalog["branch_id"]
+
+    login(catalog["customer_id"])
+    fill_cart({catalog["product_ids"][0]: 1})
+    response = client.post("/customer/order/complete", follow_redirects=True)
+    assert "adresinize teslimat yapmıyor" in response.get_data(as_text=True)
+    with app.app_context():
+        assert Order.query.count() == 0
+
+
+def test_checkout_routes_to_the_default_address_not_the_oldest(app, client, login, fill_cart, seed_catalog):
+    catalog = seed_catalog()
+    with app.app_context():
+        uncovered = _neighborhood(catalog, "Moda", 40.98, 29.03)
+        db.session.add(DeliveryArea(branch_id=catalog["branch_id"], neighborhood_id=catalog["neighborhood_id"]))
+        db.session.get(UserAddress, catalog["address_id"]).is_default = False
+        default = UserAddress(user_id=catalog["customer_id"], neighborhood_id=uncovered, title="Is", address_line="Sokak 5", is_default=True)
+        db.session.add(default)
+        db.session.commit()
+        default_id = default.id
+
+    login(catalog["customer_id"])
+    assert "Lokanta" not in client.get("/customer/restaurants").get_data(as_text=True)
+    fill_cart({catalog["product_ids"][0]: 1})
+    response = client.post("/customer/order/complete", follow_redirects=True)
+    assert "adresinize teslimat yapmıyor" in response.get_data(as_text=True)
+
+    with app.app_context():
+        db.session.get(UserAddress, default_id).is_default = False
+        db.session.get(UserAddress, catalog["address_id"]).is_default = True
+        db.session.commit()
+    assert "Lokanta" in client.get("/customer/restaurants").get_data(as_text=True)
+    client.post("/customer/order/complete")
+    with app.app_context():
+        order = Order.query.one()
+        assert (order.address_id, order.branch_id) == (catalog["address_id"], catalog["branch_id"])
+
+
+def test_addresses_and_neighborhoods_take_coordinates(app, client, login, seed_catalog):
+    catalog = seed_catalog()
+    login(catalog["customer_id"])
+    form = {"title": "Is", "address_line": "Sokak 3", "neighborhood_id": catalog["neighborhood_id"]}
+    client.post("/customer/addresses", data={**form, "latitude": "41.05", "longitude": "abc"})
+    client.post("/customer/addresses", data={**form, "latitude": " 41.051234 ", "longitude": "29.01"})
+    with app.app_context():
+        [address] = UserAddress.query.filter_by(title="Is").all()
+        assert (float(address.latitude), float(address.longitude)) == (41.051234, 29.01)
+
+    runner = app.test_cli_runner()
+    assert runner.invoke(args=["delivery", "centre", str(catalog["neighborhood_id"]), "41.0", "29.0"]).exit_code == 0
+    assert runner.invoke(args=["delivery", "centre", str(catalog["neighborhood_id"]), "91", "29.0"]).exit_code != 0
+    with app.app_context():
+        assert float(db.session.get(Neighborhood, catalog["neighborhood_id"]).latitude) == 41.0
+
+    assert parse_point("", " ") is None
+    for latitude, longitude in (("41", ""), ("nan", "29"), ("41", "181")):
+        with pytest.raises(ValueError):
+            parse_point(latitude, longitude)
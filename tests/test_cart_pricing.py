@@ -0,0 +1,51 @@
+from app.models import Order, OrderItem
+
+
+def _cart_queries(client, fill_cart, query_counter, product_ids):
+    fill_cart({pid: 2 for pid in product_ids})
+    query_counter.clear()
+    response = client.get("/customer/cart")
+    assert response.status_code == 200
+    return len(query_counter)
+
+
+def test_cart_query_count_is_independent_of_cart_size(client, login, fill_cart, query_counter, seed_catalog):
+    catalog = seed_catalog(product_count=15)
+    customer_id, product_ids = catalog["customer_id"], catalog["product_ids"]
+    login(customer_id)
+    client.get("/customer/cart")  # warm the identity cache
+    small = _cart_queries(client, fill_cart, query_counter, product_ids[:1])
+    large = _cart_queries(client, fill_cart, query_counter, product_ids)
+    assert large == small
+
+
+def test_cart_and_checkout_share_priced_totals(app, client, login, fill_cart, seed_catalog):
+    catalog = seed_catalog(product_count=3)
+    customer_id, product_ids = catalog["customer_id"], catalog["product_ids"]
+    login(customer_id)
+    fill_cart({pid: 2 for pid in product_ids})
+    response = client.get("/customer/order/summary")
+    assert response.status_code == 200
+    assert b"66.0" in response.data  # (10 + 11 + 12) * 2
+
+    response = client.post("/customer/order/complete")
+    assert response.status_code == 302
+    with app.app_context():
+        order = Order.query.one()
+        assert float(order.total_amount) == 66.0
+        assert float(order.final_amount) == 66.0
+        assert OrderItem.query.filter_by(order_id=order.id).count() == 3
+
+
+def test_replayed_idempotency_key_returns_existing_order(app, client, login, fill_cart, seed_catalog):
+    catalog = seed_catalog(product_count=2)
+    login(catalog["customer_id"])
+    fill_cart({pid: 2 for pid in catalog["product_ids"]})
+    client.post("/customer/order/complete", data={"idempotency_key": "abc123"})
+
+    fill_cart({pid: 2 for pid in catalog["product_ids"]})
+    response = client.post("/customer/order/complete", data={"idempotency_key": "abc123"}, follow_redirects=True)
+    assert "Sipariş zaten oluşturuldu.".encode() in response.data
+    with app.app_context():
+        assert Order.query.count() == 1
+        assert OrderItem.query.count() == 2
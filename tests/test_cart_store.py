@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.cart_store import DatabaseCartStore, MemoryCartStore
+from app.extensions import db
+from app.models import Cart, CartItem
+
+
+@pytest.fixture(params=["database", "memory"])
+def store(request, app):
+    backend = DatabaseCartStore if request.param == "database" else MemoryCartStore
+    with app.app_context():
+        yield backend(idle_ttl=60)
+
+
+def test_quantities_change_in_place(store, seed_catalog):
+    pid = seed_catalog()["product_ids"][0]
+    assert store.add("c1", pid, 2) == 2
+    assert store.add("c1", pid, 1) == 3
+    assert store.add("c1", pid, -3) == 0
+    assert store.get("c1") == {}
+    store.add("c1", pid, 1)
+    store.remove("c1", pid)
+    assert store.get("c1") == {}
+
+
+def test_carts_are_isolated_and_cleared(store, seed_catalog):
+    first, second = seed_catalog()["product_ids"][:2]
+    store.add("a", first, 1)
+    store.add("b", second, 4)
+    assert store.get("a") == {first: 1}
+    store.clear("b")
+    assert store.get("b") == {}
+    assert store.get(None) == {}
+
+
+def test_idle_database_cart_expires_and_restarts_empty(app, seed_catalog):
+    first, second = seed_catalog()["product_ids"][:2]
+    with app.app_context():
+        store = DatabaseCartStore(idle_ttl=60)
+        store.add("old", first, 2)
+        store.add("fresh", first, 1)
+        db.session.get(Cart, "old").updated_at = datetime.utcnow() - timedelta(minutes=5)
+        db.session.commit()
+        assert store.get("old") == {}
+        store.add("old", second, 1)
+        assert store.get("old") == {second: 1}
+
+        db.session.get(Cart, "old").updated_at = datetime.utcnow() - timedelta(minutes=5)
+        db.session.commit()
+        assert store.purge_expired() == 1
+        assert CartItem.query.filter_by(cart_id="old").count() == 0
+        assert store.get("fresh") == {first: 1}
+
+
+def test_cart_routes_keep_only_the_cart_id_in_the_session(client, login, seed_catalog):
+    catalog = seed_catalog()
+    pid = catalog["product_ids"][0]
+    login(catalog["customer_id"])
+    client.post(f"/customer/cart/add/{pid}")
+    client.post(f"/customer/cart/increase/{pid}")
+    client.post(f"/customer/cart/decrease/{pid}")
+    client.post(f"/customer/cart/add/{catalog['product_ids'][1]}")
+    with client.session_transaction() as sess:
+        assert "cart" not in sess
+        cart_id = sess["cart_id"]
+    assert client.application.extensions["cart_store"].get(cart_id) == {pid: 1, catalog["product_ids"][1]: 1}
+    assert b"Urun 0" in client.get("/customer/cart").data
+
+
+def test_database_store_leaves_commit_to_the_caller(app, seed_catalog):
+    pid = seed_catalog()["product_ids"][0]
+    with app.app_context():
+        store = DatabaseCartStore(idle_ttl=60)
+        store.remove("missing", pid)
+        assert store.add("missing", pid, -1) == 0
+        assert db.session.get(Cart, "missing") is None
+
+        store.add("c1", pid, 1)
+        db.session.rollback()
+        assert store.get("c1") == {}
+        store.add("c1", pid, 1)
+        db.session.commit()
+        assert store.get("c1") == {pid: 1}
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+
+from app.coupon_index import coupon_index
+from app.coupons import RedemptionResult, redeem_coupon, shard_capacities
+from app.extensions import db
+from app.models import Coupon, CouponUsageShard, DiscountType, User, UserCoupon, UserRole
+
+
+def _coupon(**kwargs):
+    coupon = Coupon(
+        code=kwargs.pop("code", "INDIRIM10"),
+        discount_type=DiscountType.AMOUNT,
+        value=10,
+        valid_from=datetime.utcnow() - timedelta(days=1),
+        valid_to=datetime.utcnow() + timedelta(days=1),
+        **kwargs,
+    )
+    db.session.add(coupon)
+    db.session.commit()
+    return coupon
+
+
+def test_shard_capacities_add_up_to_cap():
+    assert shard_capacities(10, 4) == [3, 3, 2, 2]
+    assert shard_capacities(3, 8) == [1, 1, 1]
+    assert shard_capacities(0, 8) == []
+
+
+def test_per_user_limit_is_enforced_atomically(app, seed_catalog):
+    catalog = seed_catalog()
+    with app.app_context():
+        coupon = _coupon(max_usage_per_user=2)
+        outcomes = [redeem_coupon(catalog["customer_id"], coupon) for _ in range(3)]
+        db.session.commit()
+        assert outcomes == [RedemptionResult.REDEEMED, RedemptionResult.REDEEMED, RedemptionResult.USER_LIMIT]
+        assert db.session.get(UserCoupon, (catalog["customer_id"], coupon.id)).usage_count == 2
+
+
+def test_global_cap_spreads_over_shards_and_stops_at_cap(app, seed_catalog):
+    seed_catalog()
+    app.config["COUPON_USAGE_SHARDS"] = 4
+    with app.app_context():
+        coupon = _coupon(max_total_usage=6)
+        users = [User(name=f"U{i}", email=f"u{i}@example.com", password_hash="x", role=UserRole.CUSTOMER) for i in range(8)]
+        db.session.add_all(users)
+        db.session.commit()
+        outcomes = [redeem_coupon(user.id, coupon) for user in users]
+        db.session.commit()
+        assert outcomes.count(RedemptionResult.REDEEMED) == 6
+        assert outcomes[-2:] == [RedemptionResult.EXHAUSTED] * 2
+        shards = CouponUsageShard.query.filter_by(coupon_id=coupon.id).all()
+        assert len(shards) == 4
+        assert sum(s.usage_count for s in shards) == 6
+
+
+def test_cart_pricing_reads_exhaustion_from_the_index(app, client, login, fill_cart, seed_catalog, query_counter):
+    catalog = seed_catalog()
+    app.config["COUPON_USAGE_SHARDS"] = 1
+    with app.app_context():
+        coupon = _coupon(code="TEK", max_total_usage=1)
+        coupon_id = coupon.id
+        other = User(name="Diger", email="diger@example.com", password_hash="x", role=UserRole.CUSTOMER)
+        db.session.add(other)
+        db.session.flush()
+        assert redeem_coupon(other.id, coupon) == RedemptionResult.REDEEMED
+        db.session.commit()
+    login(catalog["customer_id"])
+    fill_cart({catalog["product_ids"][0]: 2})
+    with client.session_transaction() as sess:
+        sess["coupon"] = {"id": coupon_id, "code": "TEK"}
+
+    coupon_index.invalidate()
+    query_counter.clear()
+    assert "TEK" not in client.get("/customer/cart").get_data(as_text=True)
+    client.get("/customer/cart")
+    assert sum("CouponUsageShard" in s for s in query_counter) == 1
+    assert coupon_index.is_exhausted(coupon_id)
+
+
+def _coupon_queries(statements):
+    return [s for s in statements if any(f'"{t}"' in s or f" {t}" in s for t in ("Coupon", "UserCoupon", "CouponUsageShard"))]
+
+
+def test_warm_cart_prices_coupons_with_only_the_per_user_lookup(client, login, fill_cart, seed_catalog, query_counter):
+    catalog = seed_catalog()
+    with client.application.app_context():
+        coupon = _coupon(code="SEPET5", max_usage_per_user=1, max_total_usage=100)
+        coupon_id = coupon.id
+    login(catalog["customer_id"])
+    fill_cart({catalog["product_ids"][0]: 2})
+    with client.session_transaction() as sess:
+        sess["coupon"] = {"id": coupon_id, "code": "SEPET5"}
+    client.get("/customer/cart")
+
+    query_counter.clear()
+    assert "SEPET5" in client.get("/customer/cart").get_data(as_text=True)
+    # The index answers lookup, validity and the global cap; only the per-user count is read.
+    [usage_query] = _coupon_queries(query_counter)
+    assert "UserCoupon" in usage_query
+
+    query_counter.clear()
+    client.post("/customer/cart/apply_coupon", data={"coupon_code": "YOKBOYLE"})
+    client.post("/customer/cart/apply_coupon", data={"coupon_code": "YOKBOYLE2"})
+    assert _coupon_queries(query_counter) == []
+
+
+def test_coupon_edit_invalidates_index(app, seed_catalog):
+    seed_catalog()
+    with app.app_context():
+        coupon = _coupon(code="ESKI")
+        assert coupon_index.get_by_code("ESKI") is not None
+        coupon.code = "YENI"
+        db.session.commit()
+        assert coupon_index.get_by_code("ESKI") is None
+        assert coupon_index.get_by_code("YENI").id == coupon.id
+
+
+def test_partial_index_falls_back_and_caches_misses(app, seed_catalog, query_counter):
+    seed_catalog()
+    app.config["COUPON_INDEX_MAX_ENTRIES"] = 1
+    with app.app_context():
+        _coupon(code="BIR")
+        _coupon(code="IKI")
+        coupon_index.invalidate()
+        assert coupon_index.get_by_code("BIR").code == "BIR"
+        query_counter.clear()
+        assert coupon_index.get_by_code("BIR") is not None
+        assert coupon_index.get_by_code("YOK") is None
+        assert coupon_index.get_by_code("YOK") is None
+        assert len(_coupon_queries(query_counter)) == 1
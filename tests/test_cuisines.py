@@ -0,0 +1,33 @@
+from app.cuisines import DEFAULT_CUISINES
+from app.models import CuisineType, Restaurant, RestaurantCuisine, User
+
+
+def test_restaurant_list_does_not_write(app, client, seed_catalog):
+    seed_catalog()
+    assert client.get("/customer/restaurants").status_code == 200
+    with app.app_context():
+        assert CuisineType.query.count() == 0
+        assert RestaurantCuisine.query.count() == 0
+
+
+def test_backfill_command_is_idempotent(app, seed_catalog):
+    catalog = seed_catalog()
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["cuisine", "backfill"])
+    assert "Linked 1 restaurants" in result.output
+    assert "Linked 0 restaurants" in runner.invoke(args=["cuisine", "backfill"]).output
+    with app.app_context():
+        assert sorted(c.name for c in CuisineType.query) == sorted(DEFAULT_CUISINES)
+        assert [link.restaurant_id for link in RestaurantCuisine.query] == [catalog["restaurant_id"]]
+
+
+def test_registration_links_the_new_restaurant_to_a_cuisine(app, client):
+    response = client.post(
+        "/restaurant/register",
+        data={"name": "Sahip", "email": "sahip@example.com", "password": "secret1", "restaurant_name": "Yeni Yer"},
+    )
+    assert response.status_code == 302
+    with app.app_context():
+        owner = User.query.filter_by(email="sahip@example.com").one()
+        restaurant = Restaurant.query.filter_by(owner_id=owner.id).one()
+        assert RestaurantCuisine.query.filter_by(restaurant_id=restaurant.id).count() == 1
@@ -0,0 +1,84 @@
+import logging
+import threading
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.db_pool import TimedQueuePool, engine_options, pool_stats
+from app.extensions import db
+
+MYSQL_URI = "mysql+pymysql://u:p@db/hemenye"
+
+
+def test_pool_is_sized_from_workers_and_threads():
+    options = engine_options(
+        {"SQLALCHEMY_DATABASE_URI": MYSQL_URI, "WEB_CONCURRENCY": 4, "WEB_THREADS": 8, "DB_MAX_CONNECTIONS": 100}
+    )
+    assert options["pool_size"] == 8
+    assert options["max_overflow"] == 17  # 100 // 4 - 8
+    assert options["pool_pre_ping"] is True
+    assert options["pool_recycle"] == 280
+    assert options["poolclass"] is TimedQueuePool
+
+    tight = engine_options({"SQLALCHEMY_DATABASE_URI": MYSQL_URI, "WEB_CONCURRENCY": 10, "WEB_THREADS": 8, "DB_MAX_CONNECTIONS": 90})
+    assert tight["max_overflow"] == 1
+
+
+def test_pool_without_thread_count_keeps_default_size_and_overflow():
+    options = engine_options({"SQLALCHEMY_DATABASE_URI": MYSQL_URI, "WEB_THREADS": None})
+    assert options["pool_size"] == 5
+    assert options["max_overflow"] == 145
+
+
+def test_default_pool_serves_concurrent_requests(app):
+    requests = 4
+    barrier = threading.Barrier(requests, timeout=5)
+
+    def hold_connection():
+        db.session.execute(text("SELECT 1"))
+        barrier.wait()
+        return "ok"
+
+    app.add_url_rule("/_test/hold", "hold_connection", hold_connection)
+    statuses = []
+
+    def fetch():
+        statuses.append(app.test_client().get("/_test/hold").status_code)
+
+    threads = [threading.Thread(target=fetch) for _ in range(requests)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [200] * requests
+
+
+def test_explicit_engine_options_win_and_memory_sqlite_is_not_sized():
+    options = engine_options({"SQLALCHEMY_DATABASE_URI": "sqlite://", "SQLALCHEMY_ENGINE_OPTIONS": {"pool_recycle": 60}})
+    assert options == {"pool_pre_ping": True, "pool_recycle": 60}
+
+
+def test_exhausted_pool_logs_wait_and_counts_timeout(tmp_path, caplog):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.2)
+    before = pool_stats["timeouts"]
+    held = engine.connect()
+    with caplog.at_level(logging.ERROR, logger="app.db_pool"):
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    held.close()
+    engine.dispose()
+    assert pool_stats["timeouts"] == before + 1
+    assert "db pool exhausted after" in caplog.text
+
+
+def test_admin_pool_diagnostics(client, login, seed_catalog):
+    catalog = seed_catalog()
+    login(catalog["admin_id"])
+    data = client.get("/admin/diagnostics/pool").get_json()
+    assert data["class"] == "TimedQueuePool"
+    assert data["pre_ping"] is True
+    assert data["checkedout"] >= 1
+    assert "timeouts" in data["stats"]
+
+    login(catalog["customer_id"])
+    assert client.get("/admin/diagnostics/pool").status_code == 403
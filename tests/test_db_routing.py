@@ -0,0 +1,104 @@
+import time
+
+import pytest
+from sqlalchemy.orm import Session
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from app.db_routing import PRIMARY_UNTIL_KEY
+from app.extensions import db
+from app.identity import identity_cache
+from app.menu_cache import _snapshots, clear_menu_cache
+from app.models import Restaurant, User, UserRole
+
+
+def _seed(session, restaurant_name, admin_name="Admin"):
+    admin = User(id=1, name=admin_name, email="admin@example.com", password_hash=generate_password_hash("x"), role=UserRole.ADMIN)
+    session.add(admin)
+    session.flush()
+    session.add(Restaurant(id=1, owner_id=admin.id, name=restaurant_name, is_active=True))
+    session.commit()
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    app = create_app(
+        config_override={
+            "TESTING": True,
+            "SECRET_KEY": "test-secret",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'primary.db'}",
+            "SQLALCHEMY_REPLICA_URIS": [f"sqlite:///{tmp_path / 'replica.db'}"],
+            "CART_STORE": "memory",
+        }
+    )
+    identity_cache.clear()
+    with app.app_context():
+        db.create_all()
+        [replica] = app.extensions["db_replicas"]
+        db.metadata.create_all(replica)
+        _seed(db.session, "Primary Kebap")
+        with Session(replica) as session:
+            # A lagging replica: same rows, older names.
+            _seed(session, "Replica Kebap", admin_name="Old Admin")
+    yield app
+    identity_cache.clear()
+    with app.app_context():
+        db.session.remove()
+        for engine in [*db.engines.values(), *app.extensions["db_replicas"]]:
+            engine.dispose()
+
+
+def test_read_only_views_are_served_from_the_replica(replica_app):
+    client = replica_app.test_client()
+    with client.session_transaction() as sess:
+        sess["_user_id"] = "1"
+
+    body = client.get("/admin/restaurants").get_data(as_text=True)
+    assert "Replica Kebap" in body
+    assert "Primary Kebap" not in body
+
+
+def test_writer_is_pinned_to_the_primary_until_the_window_ends(replica_app):
+    client = replica_app.test_client()
+    with client.session_transaction() as sess:
+        sess["_user_id"] = "1"
+
+    assert client.post("/admin/restaurants/1/toggle").status_code == 302
+    with client.session_transaction() as sess:
+        assert sess[PRIMARY_UNTIL_KEY] > time.time()
+    assert "Primary Kebap" in client.get("/admin/restaurants").get_data(as_text=True)
+
+    with client.session_transaction() as sess:
+        sess[PRIMARY_UNTIL_KEY] = time.time() - 1
+    assert "Replica Kebap" in client.get("/admin/restaurants").get_data(as_text=True)
+
+
+def test_process_caches_are_filled_from_the_primary(replica_app):
+    client = replica_app.test_client()
+    with client.session_transaction() as sess:
+        sess["_user_id"] = "1"
+
+    assert "Replica Kebap" in client.get("/admin/restaurants").get_data(as_text=True)
+    with replica_app.app_context():
+        assert identity_cache.get(1).name == "Admin"
+
+
+def test_menu_version_is_read_from_the_replica(replica_app):
+    clear_menu_cache()
+    with replica_app.app_context():
+        db.session.execute(db.text("UPDATE RestaurantStats SET menu_version = 5"))
+        db.session.commit()
+        [replica] = replica_app.extensions["db_replicas"]
+        with replica.begin() as conn:
+            conn.execute(db.text("UPDATE RestaurantStats SET menu_version = 2"))
+
+    body = replica_app.test_client().get("/customer/restaurants/1").get_data(as_text=True)
+    assert "Primary Kebap" in body
+    assert list(_snapshots) == [(1, 2)]
+    clear_menu_cache()
+
+
+def test_no_replicas_configured_keeps_a_single_bind(app):
+    with app.app_context():
+        assert list(db.engines) == [None]
+    assert app.extensions["db_replicas"] == []
@@ -0,0 +1,97 @@
+from app.checkout import get_branch_for_restaurant
+from app.extensions import db
+from app.models import BranchCoverage, DeliveryArea, District, Neighborhood, Order, RestaurantBranch, UserAddress
+
+
+def _coverage(app):
+    with app.app_context():
+        return sorted((c.neighborhood_id, c.branch_id) for c in BranchCoverage.query)
+
+
+def _add_neighborhood(app, catalog, name, new_district=False):
+    with app.app_context():
+        district_id = db.session.get(Neighborhood, catalog["neighborhood_id"]).district_id
+        if new_district:
+            district = District(city_id=db.session.get(District, district_id).city_id, name=f"{name} Ilcesi")
+            db.session.add(district)
+            db.session.flush()
+            district_id = district.id
+        neighborhood = Neighborhood(district_id=district_id, name=name)
+        db.session.add(neighborhood)
+        db.session.commit()
+        return neighborhood.id
+
+
+def test_branch_without_areas_covers_its_district(app, seed_catalog):
+    catalog = seed_catalog()
+    same = _add_neighborhood(app, catalog, "Fenerbahce")
+    _add_neighborhood(app, catalog, "Besiktas", new_district=True)
+    assert _coverage(app) == [(catalog["neighborhood_id"], catalog["branch_id"]), (same, catalog["branch_id"])]
+
+
+def test_areas_and_branch_changes_refresh_the_index(app, seed_catalog):
+    catalog = seed_catalog()
+    other = _add_neighborhood(app, catalog, "Besiktas", new_district=True)
+    with app.app_context():
+        db.session.add(DeliveryArea(branch_id=catalog["branch_id"], neighborhood_id=other))
+        db.session.commit()
+    assert _coverage(app) == [(other, catalog["branch_id"])]
+
+    with app.app_context():
+        district_id = db.session.get(Neighborhood, other).district_id
+        db.session.add(DeliveryArea(branch_id=catalog["branch_id"], district_id=district_id))
+        db.session.commit()
+    with app.app_context():
+        neighborhood = Neighborhood(district_id=district_id, name="Ortakoy")
+        db.session.add(neighborhood)
+        db.session.commit()
+        added = neighborhood.id
+    assert (added, catalog["branch_id"]) in _coverage(app)
+
+    with app.app_context():
+        db.session.get(RestaurantBranch, catalog["branch_id"]).is_active = False
+        db.session.commit()
+    assert _coverage(app) == []
+    assert app.test_cli_runner().invoke(args=["delivery", "rebuild"]).output.startswith("Indexed 0 ")
+
+
+def test_listing_shows_only_restaurants_serving_the_default_address(app, client, login, seed_catalog):
+    catalog = seed_catalog()
+    login(catalog["customer_id"])
+    assert b"Lokanta" in client.get("/customer/restaurants").data
+
+    other = _add_neighborhood(app, catalog, "Besiktas", new_district=True)
+    with app.app_context():
+        db.session.get(UserAddress, catalog["address_id"]).neighborhood_id = other
+        db.session.commit()
+    body = client.get("/customer/restaurants").get_data(as_text=True)
+    assert "Lokanta" not in body
+    assert "Besiktas adresine teslimat" in body
+
+
+def test_listing_and_checkout_use_the_same_address(app, client, login, fill_cart, seed_catalog):
+    catalog = seed_catalog()
+    other = _add_neighborhood(app, catalog, "Besiktas", new_district=True)
+    with app.app_context():
+        address = db.session.get(UserAddress, catalog["address_id"])
+        address.neighborhood_id, address.is_default = other, False
+        db.session.commit()
+
+    login(catalog["customer_id"])
+    assert "Lokanta" not in client.get("/customer/restaurants").get_data(as_text=True)
+    fill_cart({catalog["product_ids"][0]: 1})
+    response = client.post("/customer/order/complete", follow_redirects=True)
+    assert "adresinize teslimat yapmıyor" in response.get_data(as_text=True)
+    with app.app_context():
+        assert Order.query.count() == 0
+
+
+def test_checkout_prefers_a_branch_delivering_to_the_address(app, seed_catalog):
+    catalog = seed_catalog()
+    other = _add_neighborhood(app, catalog, "Besiktas", new_district=True)
+    with app.app_context():
+        branch = RestaurantBranch(restaurant_id=catalog["restaurant_id"], neighborhood_id=other, address_line="Cadde 9", min_order_amount=0)
+        db.session.add(branch)
+        db.session.commit()
+        assert get_branch_for_restaurant(catalog["restaurant_id"], other).id == branch.id
+        assert get_branch_for_restaurant(catalog["restaurant_id"], catalog["neighborhood_id"]).id == catalog["branch_id"]
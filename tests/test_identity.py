@@ -0,0 +1,49 @@
+from app.extensions import db
+from app.identity import Principal, identity_cache
+from app.models import Restaurant, User, UserRole
+
+
+def _user_queries(statements):
+    return [s for s in statements if 'FROM "User"' in s]
+
+
+def test_repeat_requests_skip_user_lookup(client, login, seed_catalog, query_counter):
+    catalog = seed_catalog()
+    login(catalog["customer_id"])
+    client.get("/customer/dashboard")
+    query_counter.clear()
+    assert client.get("/customer/dashboard").status_code == 200
+    assert client.get("/customer/cart").status_code == 200
+    assert _user_queries(query_counter) == []
+
+
+def test_principal_carries_owned_restaurants(app, seed_catalog):
+    catalog = seed_catalog()
+    with app.app_context():
+        principal = identity_cache.get(catalog["owner_id"])
+        assert isinstance(principal, Principal)
+        assert principal.role == UserRole.RESTAURANT_OWNER
+        assert principal.restaurant_ids == (catalog["restaurant_id"],)
+        assert principal.get_id() == str(catalog["owner_id"])
+
+
+def test_user_and_restaurant_changes_invalidate(app, client, login, seed_catalog):
+    catalog = seed_catalog()
+    with app.app_context():
+        assert identity_cache.get(catalog["customer_id"]).role == UserRole.CUSTOMER
+        db.session.get(User, catalog["customer_id"]).role = UserRole.RESTAURANT_OWNER
+        db.session.commit()
+        assert identity_cache.get(catalog["customer_id"]).role == UserRole.RESTAURANT_OWNER
+
+        second = Restaurant(owner_id=catalog["customer_id"], name="Ikinci", is_active=True)
+        db.session.add(second)
+        db.session.commit()
+        assert identity_cache.get(catalog["customer_id"]).restaurant_ids == (second.id,)
+
+        second.owner_id = catalog["owner_id"]
+        db.session.commit()
+        assert identity_cache.get(catalog["customer_id"]).restaurant_ids == ()
+        assert identity_cache.get(catalog["owner_id"]).restaurant_ids == (catalog["restaurant_id"], second.id)
+
+    login(catalog["customer_id"])
+    assert client.get("/customer/dashboard").status_code == 403
@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from app.extensions import db
+from app.loading import order_list_options
+from app.models import Order, OrderItem, OrderStatus
+
+
+def _add_orders(app, catalog, count):
+    with app.app_context():
+        for _ in range(count):
+            order = Order(user_id=catalog["customer_id"], branch_id=catalog["branch_id"], address_id=catalog["address_id"], status=OrderStatus.PENDING)
+            db.session.add(order)
+            db.session.flush()
+            db.session.add(OrderItem(order_id=order.id, product_id=catalog["product_ids"][0], unit_price=10, quantity=1))
+        db.session.commit()
+        return Order.query.order_by(Order.id.desc()).first().id
+
+
+def _page_queries(client, query_counter, url):
+    client.get(url)  # warm identity and owner caches
+    query_counter.clear()
+    response = client.get(url)
+    assert response.status_code == 200
+    return len(query_counter)
+
+
+@pytest.mark.parametrize(
+    "user_key,url",
+    [("customer_id", "/customer/orders"), ("owner_id", "/restaurant/orders"), ("admin_id", "/admin/orders")],
+)
+def test_order_lists_run_a_fixed_number_of_queries(app, client, login, seed_catalog, query_counter, user_key, url):
+    catalog = seed_catalog()
+    login(catalog[user_key])
+    _add_orders(app, catalog, 1)
+    one = _page_queries(client, query_counter, url)
+    _add_orders(app, catalog, 5)
+    assert _page_queries(client, query_counter, url) == one
+
+
+@pytest.mark.parametrize(
+    "user_key,url",
+    [("customer_id", "/customer/orders/{}"), ("owner_id", "/restaurant/orders/{}"), ("admin_id", "/admin/orders/{}")],
+)
+def test_order_detail_pages_render_without_lazy_loads(app, client, login, seed_catalog, user_key, url):
+    catalog = seed_catalog()
+    order_id = _add_orders(app, catalog, 1)
+    login(catalog[user_key])
+    response = client.get(url.format(order_id))
+    assert response.status_code == 200
+    assert b"Urun 0" in response.data
+
+
+def test_owner_detail_post_reloads_with_the_same_policy(app, client, login, seed_catalog):
+    catalog = seed_catalog()
+    order_id = _add_orders(app, catalog, 1)
+    login(catalog["owner_id"])
+    response = client.post(
+        f"/restaurant/orders/{order_id}",
+        data={"status": OrderStatus.ACCEPTED, "current_status": OrderStatus.PENDING},
+    )
+    assert response.status_code == 200
+    assert b"Urun 0" in response.data
+
+
+def test_strict_mode_raises_on_unplanned_lazy_load(app, seed_catalog):
+    catalog = seed_catalog()
+    _add_orders(app, catalog, 1)
+    with app.app_context():
+        order = Order.query.options(*order_list_options("restaurant")).first()
+        assert order.user.name == "Customer"
+        with pytest.raises(InvalidRequestError):
+            order.items
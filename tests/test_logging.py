@@ -0,0 +1,72 @@
+import json
+import logging
+import queue
+
+from app.logging_config import DroppingQueueHandler, SamplingFilter, build_queue_logging, log_stats
+
+
+def test_request_id_is_generated_or_propagated(client):
+    generated = client.get("/").headers["X-Request-ID"]
+    assert len(generated) == 32
+    assert client.get("/", headers={"X-Request-ID": "edge-42"}).headers["X-Request-ID"] == "edge-42"
+    assert client.get("/", headers={"X-Request-ID": "bad id!"}).headers["X-Request-ID"] != "bad id!"
+
+
+def test_access_lines_are_written_as_json_by_the_listener(app, client, login, seed_catalog, tmp_path):
+    catalog = seed_catalog()
+    log_path = tmp_path / "app.log"
+    handler, listener = build_queue_logging(str(log_path))
+    app.logger.addHandler(handler)
+    app.logger.setLevel(logging.INFO)
+    listener.start()
+    try:
+        login(catalog["customer_id"])
+        client.get("/customer/orders", headers={"X-Request-ID": "req-1"})
+    finally:
+        listener.stop()
+        app.logger.removeHandler(handler)
+
+    lines = [json.loads(line) for line in log_path.read_text().splitlines()]
+    access = [line for line in lines if line.get("path") == "/customer/orders"][0]
+    assert access["request_id"] == "req-1"
+    assert access["endpoint"] == "customer.customer_orders"
+    assert access["status"] == 200
+    assert access["sql_queries"] >= 1
+    assert "latency_ms" in access and "sql_ms" in access
+
+
+def test_exceptions_reach_the_listener_as_a_separate_field(tmp_path):
+    log_path = tmp_path / "app.log"
+    handler, listener = build_queue_logging(str(log_path))
+    logger = logging.getLogger("test.logging.exc")
+    logger.addHandler(handler)
+    listener.start()
+    try:
+        try:
+            raise ValueError("bozuk")
+        except ValueError:
+            logger.exception("order %s failed", 7)
+    finally:
+        listener.stop()
+        logger.removeHandler(handler)
+
+    line = json.loads(log_path.read_text())
+    assert line["message"] == "order 7 failed"
+    assert line["exc"].startswith("Traceback") and "ValueError: bozuk" in line["exc"]
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    before = log_stats["dropped"]
+    for i in range(3):
+        handler.handle(logging.LogRecord("t", logging.INFO, __file__, 1, f"line {i}", None, None))
+    assert log_stats["dropped"] - before == 2
+
+
+def test_sampling_only_thins_info_records():
+    sampler = SamplingFilter(0.0)
+    info = logging.LogRecord("t", logging.INFO, __file__, 1, "noisy", None, None)
+    warning = logging.LogRecord("t", logging.WARNING, __file__, 1, "keep", None, None)
+    assert sampler.filter(info) is False
+    assert sampler.filter(warning) is True
+    assert SamplingFilter(1.0).filter(info) is True
@@ -0,0 +1,69 @@
+from sqlalchemy import update
+
+from app.extensions import db
+from app.menu_cache import menu_version
+from app.models import Product, ProductCategory, RestaurantStats
+
+
+def test_restaurant_detail_is_served_from_cache(app, client, seed_catalog, query_counter):
+    catalog = seed_catalog(product_count=5)
+    url = f"/customer/restaurants/{catalog['restaurant_id']}"
+
+    assert b"Urun 4" in client.get(url).data
+    query_counter.clear()
+    response = client.get(url)
+    assert response.status_code == 200
+    [version_lookup] = query_counter
+    assert "menu_version" in version_lookup
+
+
+def test_menu_queries_do_not_grow_with_categories(app, client, seed_catalog, query_counter):
+    catalog = seed_catalog(product_count=2)
+    url = f"/customer/restaurants/{catalog['restaurant_id']}"
+    client.get(url)
+    query_counter.clear()
+    with app.app_context():
+        db.session.add_all([ProductCategory(restaurant_id=catalog["restaurant_id"], name=f"Kategori {i}") for i in range(5)])
+        db.session.commit()
+    query_counter.clear()
+    response = client.get(url)
+    assert b"Kategori 4" in response.data
+    assert len(query_counter) <= 6
+
+
+def test_owner_product_edit_invalidates_snapshot(app, client, login, seed_catalog):
+    catalog = seed_catalog(product_count=1)
+    url = f"/customer/restaurants/{catalog['restaurant_id']}"
+    assert b"Urun 0" in client.get(url).data
+
+    login(catalog["owner_id"])
+    client.post(
+        f"/restaurant/products/{catalog['product_ids'][0]}/edit",
+        data={"name": "Yeni Isim", "category_id": catalog["category_id"], "price": "15", "is_active": "1"},
+    )
+    body = client.get(url).data
+    assert b"Yeni Isim" in body
+    assert b"Urun 0" not in body
+
+
+def test_writes_from_another_worker_are_seen_through_the_stored_version(app, client, seed_catalog):
+    catalog = seed_catalog(product_count=1)
+    url = f"/customer/restaurants/{catalog['restaurant_id']}"
+    assert b"Urun 0" in client.get(url).data
+
+    with app.app_context():
+        before = menu_version(catalog["restaurant_id"])
+        # Another process renames the product and bumps the version; this worker's hooks never run.
+        db.session.execute(update(Product).where(Product.id == catalog["product_ids"][0]).values(name="Baska Isim"))
+        db.session.execute(
+            update(RestaurantStats)
+            .where(RestaurantStats.restaurant_id == catalog["restaurant_id"])
+            .values(menu_version=RestaurantStats.menu_version + 1)
+        )
+        db.session.commit()
+    assert b"Baska Isim" in client.get(url).data
+
+    with app.app_context():
+        db.session.get(ProductCategory, catalog["category_id"]).name = "Yeni Kategori"
+        db.session.commit()
+        assert menu_version(catalog["restaurant_id"]) == before + 2
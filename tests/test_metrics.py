@@ -0,0 +1,73 @@
+import json
+
+from app.metrics import collect, registry, render
+
+
+AUTH = {"Authorization": "Bearer s3cret"}
+
+
+def test_metrics_endpoint_reports_requests_sql_pool_and_caches(app, client, login, seed_catalog):
+    registry.clear()
+    app.config["METRICS_TOKEN"] = "s3cret"
+    catalog = seed_catalog()
+    login(catalog["customer_id"])
+    client.get("/customer/orders")
+    client.get("/customer/orders")
+    client.get(f"/customer/restaurants/{catalog['restaurant_id']}")
+
+    body = client.get("/metrics", headers=AUTH).get_data(as_text=True)
+    assert 'hemenye_http_requests_total{endpoint="customer.customer_orders",method="GET",status="200"} 2' in body
+    assert 'hemenye_http_request_duration_seconds_bucket{endpoint="customer.customer_orders",le="+Inf"} 2' in body
+    assert 'hemenye_sql_request_seconds_count{endpoint="customer.customer_orders"} 2' in body
+    assert "# TYPE hemenye_db_pool_checked_out gauge" in body
+    assert 'hemenye_cache_requests_total{cache="menu",result="misses"}' in body
+    assert 'hemenye_cache_requests_total{cache="identity",result="hits"}' in body
+
+
+def test_file_backed_mode_sums_workers_and_drops_dead_gauges(app, client, tmp_path):
+    registry.clear()
+    app.config["METRICS_DIR"] = str(tmp_path)
+    other = {
+        "pid": 999999999,
+        "started": 1,
+        "counters": [["hemenye_http_requests_total", json.dumps([["endpoint", "main.home"], ["method", "GET"], ["status", "200"]]), 5]],
+        "histograms": [],
+        "gauges": [["hemenye_db_pool_checked_out", "[]", 7]],
+    }
+    (tmp_path / "metrics-999999999-1.json").write_text(json.dumps(other))
+    client.get("/")
+
+    with app.app_context():
+        body = render(collect(str(tmp_path)))
+    assert 'hemenye_http_requests_total{endpoint="main.home",method="GET",status="200"} 6' in body
+    assert "hemenye_db_pool_checked_out 7" not in body
+    assert any(p.name.startswith("metrics-") and p.name != "metrics-999999999-1.json" for p in tmp_path.iterdir())
+
+
+def test_reused_pid_keeps_the_exited_workers_counters(app, client, tmp_path):
+    registry.clear()
+    app.config["METRICS_DIR"] = str(tmp_path)
+    client.get("/")
+    with app.app_context():
+        mine = collect(str(tmp_path))[0]
+    exited = {
+        "pid": mine["pid"],
+        "started": mine["started"] - 1000,
+        "counters": [["hemenye_http_requests_total", json.dumps([["endpoint", "main.home"], ["method", "GET"], ["status", "200"]]), 5]],
+        "histograms": [],
+        "gauges": [["hemenye_db_pool_size", "[]", 40]],
+    }
+    (tmp_path / f"metrics-{mine['pid']}-{exited['started']}.json").write_text(json.dumps(exited))
+
+    with app.app_context():
+        body = render(collect(str(tmp_path)))
+    assert 'hemenye_http_requests_total{endpoint="main.home",method="GET",status="200"} 6' in body
+    assert "hemenye_db_pool_size 40" not in body
+    assert len(list(tmp_path.glob("metrics-*.json"))) == 2
+
+
+def test_metrics_endpoint_needs_a_configured_token(app, client):
+    assert client.get("/metrics").status_code == 404
+    app.config["METRICS_TOKEN"] = "s3cret"
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers=AUTH).status_code == 200
@@ -0,0 +1,87 @@
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Order, OrderSearch, OrderStatus, Restaurant, User
+from app.order_status import transition_order
+from app.search_index import order_search_filter, reindex_orders, stale_order_ids
+
+
+def _new_order(app, catalog, status=OrderStatus.PENDING):
+    with app.app_context():
+        order = Order(user_id=catalog["customer_id"], branch_id=catalog["branch_id"], address_id=catalog["address_id"], status=status)
+        db.session.add(order)
+        db.session.commit()
+        return order.id
+
+
+def _search(app, text):
+    with app.app_context():
+        condition = order_search_filter(text, db.engine.dialect.name)
+        return sorted(db.session.scalars(select(Order.id).where(condition))) if condition is not None else None
+
+
+def test_orders_are_found_by_customer_phone_restaurant_and_id(app, seed_catalog):
+    catalog = seed_catalog()
+    with app.app_context():
+        customer = db.session.get(User, catalog["customer_id"])
+        customer.name = "Ayşe Yılmaz"
+        customer.phone = "+90 532 111 22 33"
+        db.session.commit()
+    order_id = _new_order(app, catalog)
+
+    assert _search(app, "ayse") == [order_id]
+    assert _search(app, "yılm ayş") == [order_id]
+    assert _search(app, "5321112") == [order_id]
+    assert _search(app, "lokan") == [order_id]
+    assert _search(app, str(order_id)) == [order_id]
+    assert _search(app, "mehmet") == []
+    assert _search(app, "!!") is None
+
+
+def test_index_follows_status_and_customer_changes(app, seed_catalog):
+    catalog = seed_catalog()
+    order_id = _new_order(app, catalog)
+    with app.app_context():
+        transition_order(order_id, OrderStatus.PENDING, OrderStatus.ACCEPTED, catalog["owner_id"])
+        db.session.commit()
+        assert db.session.get(OrderSearch, order_id).status == OrderStatus.ACCEPTED
+
+        db.session.get(User, catalog["customer_id"]).name = "Kemal Demir"
+        db.session.get(Restaurant, catalog["restaurant_id"]).name = "Yeni Lokanta"
+        db.session.commit()
+        assert stale_order_ids(db.session.connection()) == [order_id]
+    assert _search(app, "kemal") == []
+
+    result = app.test_cli_runner().invoke(args=["search", "refresh-orders"])
+    assert "Reindexed 1 orders." in result.output
+    assert _search(app, "kemal") == [order_id]
+    assert _search(app, "yeni") == [order_id]
+    with app.app_context():
+        assert stale_order_ids(db.session.connection()) == []
+
+    with app.app_context():
+        db.session.query(OrderSearch).delete()
+        db.session.commit()
+        assert reindex_orders(db.session.connection()) == 1
+        db.session.commit()
+    assert _search(app, "demir") == [order_id]
+
+
+def test_renames_do_not_rewrite_orders_in_the_flush(app, seed_catalog, query_counter):
+    catalog = seed_catalog()
+    _new_order(app, catalog)
+    del query_counter[:]
+    with app.app_context():
+        db.session.get(User, catalog["customer_id"]).name = "Kemal Demir"
+        db.session.commit()
+    assert query_counter and not any("OrderSearch" in sql for sql in query_counter)
+
+
+def test_admin_and_owner_consoles_use_the_index(app, client, login, seed_catalog):
+    catalog = seed_catalog()
+    order_id = _new_order(app, catalog)
+    login(catalog["admin_id"])
+    assert f"/admin/orders/{order_id}" in client.get("/admin/orders?q=custom").get_data(as_text=True)
+    assert f"/admin/orders/{order_id}" not in client.get("/admin/orders?q=nobody").get_data(as_text=True)
+    login(catalog["owner_id"])
+    assert f'value="{order_id}"' in client.get("/restaurant/orders?q=customer").get_data(as_text=True)
@@ -0,0 +1,137 @@
+from sqlalchemy import update
+
+from app.extensions import db
+from app.models import Order, OrderStatus, OrderStatusHistory
+from app.order_status import TransitionResult, transition_order, transition_orders
+
+
+def _new_order(app, catalog, status=OrderStatus.PENDING):
+    with app.app_context():
+        order = Order(user_id=catalog["customer_id"], branch_id=catalog["branch_id"], address_id=catalog["address_id"], status=status)
+        db.session.add(order)
+        db.session.commit()
+        return order.id
+
+
+def test_second_writer_with_stale_status_gets_conflict(app, seed_catalog):
+    catalog = seed_catalog()
+    order_id = _new_order(app, catalog)
+    with app.app_context():
+        first = transition_order(order_id, OrderStatus.PENDING, OrderStatus.ACCEPTED, catalog["owner_id"])
+        db.session.commit()
+        second = transition_order(order_id, OrderStatus.PENDING, OrderStatus.CANCELED, catalog["admin_id"])
+        db.session.commit()
+
+        assert first == TransitionResult.UPDATED
+        assert second == TransitionResult.CONFLICT
+        assert db.session.get(Order, order_id).status == OrderStatus.ACCEPTED
+        history = OrderStatusHistory.query.filter_by(order_id=order_id).all()
+        assert [(h.old_status, h.new_status) for h in history] == [(OrderStatus.PENDING, OrderStatus.ACCEPTED)]
+
+
+def test_disallowed_transition_writes_nothing(app, seed_catalog):
+    catalog = seed_catalog()
+    order_id = _new_order(app, catalog, OrderStatus.DELIVERED)
+    with app.app_context():
+        assert transition_order(order_id, OrderStatus.DELIVERED, OrderStatus.PENDING, catalog["admin_id"]) == TransitionResult.NOT_ALLOWED
+        assert OrderStatusHistory.query.count() == 0
+
+
+def test_status_form_reports_conflict(app, client, login, seed_catalog):
+    catalog = seed_catalog()
+    order_id = _new_order(app, catalog, OrderStatus.ACCEPTED)
+    login(catalog["admin_id"])
+    response = client.post(
+        f"/admin/orders/{order_id}/status",
+        data={"status": OrderStatus.ACCEPTED, "current_status": OrderStatus.PENDING},
+        follow_redirects=True,
+    )
+    assert b"changed by someone else" in response.data
+
+
+def test_bulk_status_reports_per_order_results(app, client, login, seed_catalog):
+    catalog = seed_catalog()
+    accepted = [_new_order(app, catalog, OrderStatus.ACCEPTED) for _ in range(3)]
+    delivered = _new_order(app, catalog, OrderStatus.DELIVERED)
+    login(catalog["owner_id"])
+    response = client.post(
+        "/restaurant/orders/bulk-status",
+        json={"order_ids": accepted + [delivered, 9999], "status": OrderStatus.PREPARING},
+    )
+    results = {row["order_id"]: row["result"] for row in response.get_json()["results"]}
+    assert [results[oid] for oid in accepted] == [TransitionResult.UPDATED] * 3
+    assert results[delivered] == TransitionResult.NOT_ALLOWED
+    assert results[9999] == TransitionResult.NOT_FOUND
+    with app.app_context():
+        assert Order.query.filter_by(status=OrderStatus.PREPARING).count() == 3
+        assert OrderStatusHistory.query.filter_by(new_status=OrderStatus.PREPARING).count() == 3
+
+
+def test_bulk_status_form_posts_from_admin_list(app, client, login, seed_catalog):
+    catalog = seed_catalog()
+    order_ids = [_new_order(app, catalog) for _ in range(2)]
+    login(catalog["admin_id"])
+    response = client.post(
+        "/admin/orders/bulk-status",
+        data={"order_ids": [str(oid) for oid in order_ids], "status": OrderStatus.ACCEPTED},
+        follow_redirects=True,
+    )
+    assert b"2 orders updated, 0 skipped." in response.data
+
+
+def test_bulk_status_rejects_malformed_payloads(app, client, login, seed_catalog):
+    catalog = seed_catalog()
+    orders = [_new_order(app, catalog, OrderStatus.ACCEPTED) for _ in range(3)]
+    login(catalog["admin_id"])
+    assert client.post("/admin/orders/bulk-status", json=[orders[0]]).status_code == 400
+    digits = "".join(str(oid) for oid in orders)
+    response = client.post("/admin/orders/bulk-status", json={"order_ids": digits, "status": OrderStatus.PREPARING})
+    assert response.get_json()["results"] == []
+    with app.app_context():
+        assert {o.status for o in Order.query} == {OrderStatus.ACCEPTED}
+
+
+def test_bulk_status_refuses_too_many_orders(app, client, login, seed_catalog):
+    catalog = seed_catalog()
+    orders = [_new_order(app, catalog) for _ in range(3)]
+    app.config["BULK_STATUS_MAX_ORDERS"] = 2
+    login(catalog["admin_id"])
+    response = client.post("/admin/orders/bulk-status", json={"order_ids": orders, "status": OrderStatus.ACCEPTED})
+    assert response.status_code == 400
+    response = client.post(
+        "/admin/orders/bulk-status",
+        data={"order_ids": [str(oid) for oid in orders], "status": OrderStatus.ACCEPTED},
+        follow_redirects=True,
+    )
+    assert b"At most 2 orders" in response.data
+    with app.app_context():
+        assert {o.status for o in Order.query} == {OrderStatus.PENDING}
+
+
+def test_bulk_conflict_keeps_the_callers_pending_work(app, seed_catalog, monkeypatch):
+    catalog = seed_catalog()
+    order_id = _new_order(app, catalog, OrderStatus.ACCEPTED)
+    with app.app_context():
+        pending = Order(user_id=catalog["customer_id"], branch_id=catalog["branch_id"], address_id=catalog["address_id"])
+        db.session.add(pending)
+        db.session.flush()
+
+        execute = db.session.execute
+        calls = []
+
+        def racing_execute(statement, *args, **kwargs):
+            result = execute(statement, *args, **kwargs)
+            if not calls:
+                # Another writer moves the order right after the batch read it.
+                execute(update(Order).where(Order.id == order_id).values(status=OrderStatus.CANCELED))
+            calls.append(statement)
+            return result
+
+        monkeypatch.setattr(db.session, "execute", racing_execute)
+        results = transition_orders([order_id], OrderStatus.PREPARING, catalog["admin_id"])
+        monkeypatch.undo()
+
+        assert results == {order_id: TransitionResult.CONFLICT}
+        db.session.commit()
+        assert db.session.get(Order, pending.id) is not None
+        assert OrderStatusHistory.query.filter_by(order_id=order_id).count() == 0
@@ -0,0 +1,59 @@
+from flask_login import login_user
+
+from app.extensions import db
+from app.models import Order, OrderStatus, Restaurant, RestaurantBranch, User, UserRole
+from app.owner_context import current_owner_context
+
+
+def _order(catalog, branch_id):
+    order = Order(user_id=catalog["customer_id"], branch_id=branch_id, address_id=catalog["address_id"], status=OrderStatus.PENDING)
+    db.session.add(order)
+    db.session.commit()
+    return order.id
+
+
+def test_owner_orders_are_scoped_by_branch_ids_without_join(app, client, login, seed_catalog, query_counter):
+    catalog = seed_catalog()
+    with app.app_context():
+        rival_owner = User(name="Rakip", email="rakip@example.com", password_hash="x", role=UserRole.RESTAURANT_OWNER)
+        db.session.add(rival_owner)
+        db.session.flush()
+        rival = Restaurant(owner_id=rival_owner.id, name="Rakip", is_active=True)
+        db.session.add(rival)
+        db.session.flush()
+        rival_branch = RestaurantBranch(restaurant_id=rival.id, neighborhood_id=catalog["neighborhood_id"], address_line="Cadde 9")
+        db.session.add(rival_branch)
+        db.session.commit()
+        own_id = _order(catalog, catalog["branch_id"])
+        rival_id = _order(catalog, rival_branch.id)
+
+    login(catalog["owner_id"])
+    client.get("/restaurant/orders")
+    query_counter.clear()
+    response = client.get("/restaurant/orders")
+    assert response.status_code == 200
+    assert f"/restaurant/orders/{own_id}".encode() in response.data
+    assert f"/restaurant/orders/{rival_id}".encode() not in response.data
+    assert not [s for s in query_counter if 'FROM "Restaurant' in s or 'JOIN "RestaurantBranch"' in s]
+    assert client.get(f"/restaurant/orders/{rival_id}").status_code == 404
+
+
+def test_branch_changes_refresh_the_cached_scope(app, seed_catalog):
+    catalog = seed_catalog()
+    with app.test_request_context():
+        login_user(db.session.get(User, catalog["owner_id"]))
+        assert current_owner_context().active_branch_ids == {catalog["branch_id"]}
+
+    with app.app_context():
+        db.session.get(RestaurantBranch, catalog["branch_id"]).is_active = False
+        extra = RestaurantBranch(restaurant_id=catalog["restaurant_id"], neighborhood_id=catalog["neighborhood_id"], address_line="Cadde 3")
+        db.session.add(extra)
+        db.session.commit()
+        extra_id = extra.id
+
+    with app.test_request_context():
+        login_user(db.session.get(User, catalog["owner_id"]))
+        ctx = current_owner_context()
+        assert ctx.restaurant_id == catalog["restaurant_id"]
+        assert ctx.branch_ids == {catalog["branch_id"], extra_id}
+        assert ctx.active_branch_ids == {extra_id}
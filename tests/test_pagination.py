@@ -0,0 +1,75 @@
+from app.extensions import db
+from app.models import Order
+from app.pagination import decode_cursor, encode_cursor, paginate_keyset
+
+
+def _seed_orders(app, catalog, count):
+    with app.app_context():
+        db.session.add_all(
+            [
+                Order(user_id=catalog["customer_id"], branch_id=catalog["branch_id"], address_id=catalog["address_id"], total_amount=i, final_amount=i)
+                for i in range(count)
+            ]
+        )
+        db.session.commit()
+        return [o.id for o in Order.query.order_by(Order.id.desc()).all()]
+
+
+def test_keyset_pages_walk_forward_and_back(app, seed_catalog):
+    catalog = seed_catalog()
+    ids = _seed_orders(app, catalog, 7)
+    with app.app_context():
+        first = paginate_keyset(Order.query, Order.id, None, per_page=3)
+        assert [o.id for o in first.items] == ids[:3]
+        assert first.has_next and not first.has_prev
+
+        second = paginate_keyset(Order.query, Order.id, first.next_cursor, per_page=3)
+        assert [o.id for o in second.items] == ids[3:6]
+        assert second.has_next and second.has_prev
+
+        last = paginate_keyset(Order.query, Order.id, second.next_cursor, per_page=3)
+        assert [o.id for o in last.items] == ids[6:]
+        assert not last.has_next
+
+        back = paginate_keyset(Order.query, Order.id, second.prev_cursor, per_page=3)
+        assert [o.id for o in back.items] == ids[:3]
+        assert not back.has_prev
+
+
+def test_keyset_skips_count_unless_total_requested(app, seed_catalog, query_counter):
+    catalog = seed_catalog()
+    _seed_orders(app, catalog, 4)
+    with app.app_context():
+        query_counter.clear()
+        page = paginate_keyset(Order.query, Order.id, None, per_page=2)
+        assert page.total is None
+        assert not any("count(" in s.lower() for s in query_counter)
+
+        assert paginate_keyset(Order.query, Order.id, None, per_page=2, with_total=True).total == 4
+        query_counter.clear()
+        assert paginate_keyset(Order.query, Order.id, None, per_page=2, with_total=True).total == 4
+        assert not any("count(" in s.lower() for s in query_counter)
+
+
+def test_malformed_cursor_starts_from_first_page():
+    assert decode_cursor("not-a-cursor") == (None, "next")
+    for key in ([1, 2], {"a": 1}, None, True):
+        assert decode_cursor(encode_cursor(key)) == (None, "next")
+    assert decode_cursor(encode_cursor(7, "prev")) == (7, "prev")
+
+
+def test_order_list_views_render_cursor_links(app, client, login, seed_catalog):
+    catalog = seed_catalog()
+    _seed_orders(app, catalog, 13)
+    login(catalog["customer_id"])
+    response = client.get("/customer/orders")
+    assert response.status_code == 200
+    assert b"cursor=" in response.data
+
+    login(catalog["owner_id"])
+    assert client.get("/restaurant/orders").status_code == 200
+    login(catalog["admin_id"])
+    response = client.get("/admin/orders")
+    assert response.status_code == 200
+    assert b"cursor=" in response.data
+    assert b"(13)" in response.data
@@ -0,0 +1,31 @@
+import json
+
+from app.perf import parse_importtime
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       812 |       1204 |     sqlalchemy.sql
+import time:      2100 |      45210 |   flask_migrate
+import time:       950 |      60112 | app
+"""
+
+
+def test_parse_importtime_reads_self_and_cumulative_ms():
+    modules = parse_importtime(SAMPLE)
+    assert modules["flask_migrate"] == (2.1, 45.2)
+    assert modules["app"] == (0.9, 60.1)
+    assert "imported" not in modules
+
+
+def test_perf_startup_prints_a_json_report(app, tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'perf.db'}")
+    monkeypatch.setenv("LOG_DIR", str(tmp_path / "logs"))
+    monkeypatch.delenv("FAST_BOOT", raising=False)
+
+    result = app.test_cli_runner().invoke(args=["perf", "startup"])
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.output)
+    assert {"config", "init_db", "create_all", "blueprints", "aliases"} <= set(report["phases_ms"])
+    assert report["templates"]["count"] > 0
+    assert report["first_request"]["status"] == 200
+    assert "app.models" in report["imports"]["tracked_ms"]
+    assert "flask_migrate" in report["imports"]["tracked_ms"]
@@ -0,0 +1,52 @@
+from app.extensions import db
+from app.models import Order, Restaurant, RestaurantBranch, RestaurantStats
+
+
+def _stats(app, restaurant_id):
+    with app.app_context():
+        return db.session.get(RestaurantStats, restaurant_id)
+
+
+def test_review_updates_stats_incrementally(app, client, login, seed_catalog):
+    catalog = seed_catalog()
+    with app.app_context():
+        orders = [Order(user_id=catalog["customer_id"], branch_id=catalog["branch_id"], address_id=catalog["address_id"]) for _ in range(2)]
+        db.session.add_all(orders)
+        db.session.commit()
+        order_ids = [o.id for o in orders]
+    login(catalog["customer_id"])
+    client.post(f"/customer/orders/{order_ids[0]}/review", data={"rating": "5"})
+    client.post(f"/customer/orders/{order_ids[1]}/review", data={"rating": "2"})
+
+    stats = _stats(app, catalog["restaurant_id"])
+    assert stats.review_count == 2
+    assert stats.rating_sum == 7
+    assert stats.avg_rating == 3.5
+
+
+def test_branch_and_toggle_changes_refresh_stats(app, client, login, seed_catalog):
+    catalog = seed_catalog()
+    with app.app_context():
+        db.session.add(RestaurantBranch(restaurant_id=catalog["restaurant_id"], neighborhood_id=catalog["neighborhood_id"], address_line="Cadde 2", min_order_amount=40))
+        db.session.get(RestaurantBranch, catalog["branch_id"]).min_order_amount = 75
+        db.session.commit()
+    assert float(_stats(app, catalog["restaurant_id"]).min_order_amount) == 40
+
+    login(catalog["admin_id"])
+    client.post(f"/admin/restaurants/{catalog['restaurant_id']}/toggle")
+    assert _stats(app, catalog["restaurant_id"]).is_active is False
+    assert b"Lokanta" not in client.get("/customer/restaurants").data
+
+
+def test_rebuild_command_backfills_missing_rows(app, seed_catalog):
+    catalog = seed_catalog()
+    with app.app_context():
+        RestaurantStats.query.delete()
+        db.session.commit()
+    result = app.test_cli_runner().invoke(args=["stats", "rebuild"])
+    assert "Rebuilt stats for 1 restaurants." in result.output
+    stats = _stats(app, catalog["restaurant_id"])
+    assert stats.review_count == 0
+    assert stats.is_active is True
+    with app.app_context():
+        assert db.session.get(Restaurant, catalog["restaurant_id"]).stats is not None
@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+from sqlalchemy import Column, Integer, MetaData, String, Table
+
+from app import _schema_cli_invoked, create_app
+from app.extensions import db
+from app.schema_state import BASELINE_REVISION, schema_differences, schema_fingerprint
+
+
+def _metadata(extra_column=False):
+    metadata = MetaData()
+    columns = [Column("id", Integer, primary_key=True), Column("name", String(50), index=True)]
+    if extra_column:
+        columns.append(Column("phone", String(20)))
+    Table("Thing", metadata, *columns)
+    return metadata
+
+
+def test_fingerprint_is_stable_and_tracks_shape():
+    assert schema_fingerprint(_metadata()) == schema_fingerprint(_metadata())
+    assert schema_fingerprint(_metadata()) != schema_fingerprint(_metadata(extra_column=True))
+
+
+def test_fast_boot_serves_503_until_schema_upgrade_runs(tmp_path):
+    db_path = tmp_path / "fresh.db"
+    app = create_app(
+        config_override={"TESTING": True, "FAST_BOOT": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}", "CART_STORE": "memory"}
+    )
+    timer = app.extensions["boot_timer"]
+    assert "schema_check" in timer.phases
+    assert "create_all" not in timer.phases and "ensure_database" not in timer.phases
+
+    client = app.test_client()
+    assert client.get("/").status_code == 503
+
+    result = app.test_cli_runner().invoke(args=["schema", "upgrade"])
+    assert result.exit_code == 0, result.output
+    assert "fingerprint" in result.output
+    assert app.test_cli_runner().invoke(args=["schema", "check"]).exit_code == 0
+    assert client.get("/").status_code == 200
+
+    tables = {row[0] for row in sqlite3.connect(db_path).execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert {"User", "Order", "SchemaState", "RestaurantSearchFts", "alembic_version"} <= tables
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _fast_boot_app(path):
+    return create_app(
+        config_override={"TESTING": True, "FAST_BOOT": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}", "CART_STORE": "memory"}
+    )
+
+
+def test_migrations_match_the_models(tmp_path):
+    app = _fast_boot_app(tmp_path / "m.db")
+    assert app.test_cli_runner().invoke(args=["schema", "upgrade"]).exit_code == 0
+    with app.app_context():
+        with db.engine.connect() as conn:
+            diff = schema_differences(conn, db.metadata)
+        db.engine.dispose()
+    assert diff == []
+
+
+def test_schema_upgrade_migrates_a_pre_migration_database(tmp_path):
+    from flask_migrate import upgrade
+
+    db_path = tmp_path / "legacy.db"
+    app = _fast_boot_app(db_path)
+    with app.app_context():
+        upgrade(revision=BASELINE_REVISION)
+        db.engine.dispose()
+    legacy = sqlite3.connect(db_path)
+    legacy.execute("DROP TABLE alembic_version")
+    legacy.execute(
+        "INSERT INTO User (user_id, name, email, password_hash, role) VALUES (1, 'Owner', 'o@example.com', 'x', 'restaurant_owner')"
+    )
+    legacy.executescript(
+        "INSERT INTO Restaurant (restaurant_id, owner_id, name, is_active) VALUES (1, 1, 'Eski Lokanta', 1);"
+        "INSERT INTO City (city_id, name) VALUES (1, 'Istanbul');"
+        "INSERT INTO District (district_id, city_id, name) VALUES (1, 1, 'Merkez');"
+        "INSERT INTO Neighborhood (neighborhood_id, district_id, name) VALUES (1, 1, 'Moda');"
+        "INSERT INTO RestaurantBranch (branch_id, restaurant_id, neighborhood_id, address_line, is_active) VALUES (1, 1, 1, 'Cadde 1', 1);"
+        "INSERT INTO UserAddress (address_id, user_id, neighborhood_id, title, address_line) VALUES (1, 1, 1, 'Ev', 'Sokak 2');"
+        "INSERT INTO \"Order\" (order_id, user_id, branch_id, address_id, status, total_amount, final_amount) "
+        "VALUES (7, 1, 1, 1, 'delivered', 10, 10);"
+    )
+    legacy.commit()
+    legacy.close()
+
+    result = app.test_cli_runner().invoke(args=["schema", "upgrade"])
+    assert result.exit_code == 0, result.output
+    assert f"baseline {BASELINE_REVISION}" in result.output
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert schema_differences(conn, db.metadata) == []
+            assert conn.exec_driver_sql("SELECT review_count FROM RestaurantStats WHERE restaurant_id = 1").scalar() == 0
+            assert conn.exec_driver_sql("SELECT rowid FROM RestaurantSearchFts WHERE RestaurantSearchFts MATCH 'eski*'").scalar() == 1
+            assert conn.exec_driver_sql("SELECT rowid FROM OrderSearchFts WHERE OrderSearchFts MATCH 'lokanta*'").scalar() == 7
+            assert conn.exec_driver_sql("SELECT count(*) FROM BranchCoverage").scalar() == 1
+        db.engine.dispose()
+    assert app.test_cli_runner().invoke(args=["schema", "check"]).exit_code == 0
+
+
+def test_fast_boot_starts_when_the_database_is_unreachable(tmp_path):
+    app = create_app(
+        config_override={
+            "TESTING": True,
+            "FAST_BOOT": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'missing' / 'x.db'}",
+            "CART_STORE": "memory",
+        }
+    )
+    assert app.test_client().get("/").status_code == 503
+
+
+def test_schema_cli_is_detected_from_argv():
+    assert _schema_cli_invoked(["/usr/bin/flask", "--app", "app:create_app", "schema", "upgrade"])
+    assert _schema_cli_invoked(["/lib/python3/site-packages/flask/__main__.py", "schema", "upgrade"])
+    assert not _schema_cli_invoked(["/usr/bin/flask", "--app", "schema", "search", "rebuild"])
+    assert not _schema_cli_invoked(["run.py", "schema"])
+
+
+def test_schema_upgrade_cli_adopts_a_baseline_database_without_fast_boot(tmp_path):
+    from flask_migrate import upgrade
+
+    db_path = tmp_path / "legacy.db"
+    app = _fast_boot_app(db_path)
+    with app.app_context():
+        upgrade(revision=BASELINE_REVISION)
+        db.engine.dispose()
+    legacy = sqlite3.connect(db_path)
+    legacy.execute("DROP TABLE alembic_version")
+    legacy.commit()
+    legacy.close()
+
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}", "FAST_BOOT": "", "CART_STORE": "memory", "LOG_DIR": str(tmp_path)}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-m", "flask", "--app", "app:create_app", "schema", "upgrade"],
+        cwd=root, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert f"baseline {BASELINE_REVISION}" in result.stdout
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert schema_differences(conn, db.metadata) == []
+        db.engine.dispose()
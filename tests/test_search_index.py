@@ -0,0 +1,86 @@
+from app.extensions import db
+from app.models import CuisineType, Product, Restaurant, RestaurantCuisine, RestaurantSearch
+from app.search_index import rebuild_search_index, tokenize
+
+
+def _add_restaurant(app, catalog, name, dishes, cuisine="Turk"):
+    with app.app_context():
+        cuisine_type = CuisineType.query.filter_by(name=cuisine).first() or CuisineType(name=cuisine)
+        restaurant = Restaurant(owner_id=catalog["owner_id"], name=name, is_active=True)
+        db.session.add_all([cuisine_type, restaurant])
+        db.session.flush()
+        for rid in {restaurant.id, catalog["restaurant_id"]}:
+            if not RestaurantCuisine.query.filter_by(restaurant_id=rid).first():
+                db.session.add(RestaurantCuisine(restaurant_id=rid, cuisine_id=cuisine_type.id))
+        for dish, description in dishes:
+            db.session.add(
+                Product(restaurant_id=restaurant.id, category_id=catalog["category_id"], name=dish, description=description, price=50, is_active=True)
+            )
+        db.session.commit()
+        return restaurant.id
+
+
+def test_search_matches_dishes_and_descriptions_by_prefix(app, client, seed_catalog):
+    catalog = seed_catalog()
+    _add_restaurant(app, catalog, "Firin Usta", [("Lahmacun", "Ince hamur, acili"), ("Pide", None)], cuisine="Karadeniz")
+
+    body = client.get("/customer/restaurants?q=lahma").get_data(as_text=True)
+    assert "Firin Usta" in body
+    assert "Lokanta" not in body
+    assert "Firin Usta" in client.get("/customer/restaurants?q=ince+hamur").get_data(as_text=True)
+    assert "Firin Usta" not in client.get("/customer/restaurants?q=hamur+kebap").get_data(as_text=True)
+    assert "Firin Usta" in client.get("/customer/restaurants?q=karadeniz").get_data(as_text=True)
+
+
+def test_name_matches_rank_above_description_matches(app, client, seed_catalog):
+    catalog = seed_catalog()
+    _add_restaurant(app, catalog, "Ev Yemekleri", [("Kuru fasulye", "Yaninda lahmacun yok, pilav var")])
+    _add_restaurant(app, catalog, "Lahmacun Evi", [("Kiymali", None)])
+
+    body = client.get("/customer/restaurants?q=lahmacun").get_data(as_text=True)
+    assert body.index("Lahmacun Evi") < body.index("Ev Yemekleri")
+
+
+def test_queries_without_words_match_nothing(app, client, seed_catalog):
+    seed_catalog()
+    for query in ("!!!", "!!!&sort=relevance"):
+        response = client.get(f"/customer/restaurants?q={query}")
+        assert response.status_code == 200
+        assert "Lokanta" not in response.get_data(as_text=True)
+
+
+def test_create_all_indexes_existing_restaurants(app, client, seed_catalog):
+    catalog = seed_catalog()
+    _add_restaurant(app, catalog, "Firin Usta", [("Lahmacun", None)])
+    with app.app_context():
+        RestaurantSearch.__table__.drop(db.engine)
+        db.create_all()
+        assert db.session.query(RestaurantSearch).count() == 2
+    assert "Firin Usta" in client.get("/customer/restaurants?q=lahmacun").get_data(as_text=True)
+
+
+def test_product_writes_keep_the_document_in_sync(app, seed_catalog):
+    catalog = seed_catalog()
+    with app.app_context():
+        product = db.session.get(Product, catalog["product_ids"][0])
+        product.name = "Adana Kebap"
+        db.session.commit()
+        doc = db.session.get(RestaurantSearch, catalog["restaurant_id"])
+        assert "Adana Kebap" in doc.body
+
+        product.is_active = False
+        db.session.commit()
+        db.session.refresh(doc)
+        assert "Adana Kebap" not in doc.body
+
+        db.session.query(RestaurantSearch).delete()
+        db.session.commit()
+        assert rebuild_search_index(db.session.connection()) == 1
+        db.session.commit()
+        assert db.session.get(RestaurantSearch, catalog["restaurant_id"]).name == "Lokanta"
+
+
+def test_tokenize_drops_punctuation_and_caps_terms():
+    assert tokenize(' "Döner"  * OR ') == ["döner", "or"]
+    assert len(tokenize("a " * 20)) == 8
+    assert tokenize("!!!") == []
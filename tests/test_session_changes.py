@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from app.coupon_index import coupon_index
+from app.extensions import db
+from app.identity import identity_cache
+from app.models import Coupon, DiscountType, User, UserRole
+from app.session_changes import has_changes
+
+
+def test_savepoint_rollback_keeps_the_outer_transactions_changes(app, seed_catalog):
+    catalog = seed_catalog()
+    with app.app_context():
+        coupon = Coupon(
+            code="YAZ",
+            discount_type=DiscountType.AMOUNT,
+            value=10,
+            valid_from=datetime.utcnow() - timedelta(days=1),
+            valid_to=datetime.utcnow() + timedelta(days=1),
+        )
+        db.session.add(coupon)
+        db.session.commit()
+        assert coupon_index.get_by_code("YAZ") is not None
+        assert identity_cache.get(catalog["customer_id"]).role == UserRole.CUSTOMER
+
+        db.session.get(User, catalog["customer_id"]).role = UserRole.RESTAURANT_OWNER
+        coupon.is_active = False
+        db.session.flush()
+        savepoint = db.session.begin_nested()
+        db.session.get(User, catalog["owner_id"]).name = "Geri Alinan"
+        db.session.flush()
+        savepoint.rollback()
+        assert has_changes(db.session, "db_wrote")
+        assert has_changes(db.session, "identity_changes")
+
+        db.session.begin_nested().commit()
+        assert has_changes(db.session, "coupons_changed")
+
+        db.session.commit()
+        assert not has_changes(db.session, "coupons_changed")
+        assert identity_cache.get(catalog["customer_id"]).role == UserRole.RESTAURANT_OWNER
+        assert coupon_index.get_by_code("YAZ") is None
+
+
+def test_outer_rollback_discards_changes(app, seed_catalog):
+    catalog = seed_catalog()
+    with app.app_context():
+        db.session.get(User, catalog["customer_id"]).name = "Yeni"
+        db.session.flush()
+        assert has_changes(db.session, "identity_changes")
+        db.session.rollback()
+        assert not has_changes(db.session, "identity_changes")
+        assert not has_changes(db.session, "db_wrote")
@@ -0,0 +1,57 @@
+import pytest
+
+from app.extensions import db
+from app.models import Product
+from app.sql_profiler import QueryBudgetExceeded, RequestProfile, fingerprint
+
+
+def test_fingerprint_folds_literals_and_in_lists():
+    a = fingerprint("SELECT * FROM t WHERE id IN (?, ?, ?) AND name = 'x'")
+    b = fingerprint("SELECT *\n FROM t WHERE id IN (?) AND name = 'yy'")
+    assert a == b == "SELECT * FROM t WHERE id IN (?) AND name = ?"
+
+
+def test_repeated_selects_with_different_keys_are_nplusone_suspects():
+    profile = RequestProfile()
+    for pk in range(6):
+        profile.record("SELECT * FROM Product WHERE product_id = ?", (pk,), 0.001)
+    for _ in range(6):
+        profile.record("SELECT 1", (), 0.001)
+    assert profile.count == 12
+    assert [key for key, _ in profile.nplusone_suspects(5)] == ["SELECT * FROM Product WHERE product_id = ?"]
+
+
+def test_responses_carry_sql_headers(client, login, seed_catalog):
+    catalog = seed_catalog()
+    login(catalog["customer_id"])
+    response = client.get("/customer/orders")
+    assert int(response.headers["X-SQL-Queries"]) >= 1
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert "X-SQL-NPlusOne" not in response.headers
+
+
+def test_lazy_loop_is_flagged(app, client, seed_catalog):
+    catalog = seed_catalog(product_count=6)
+
+    @app.route("/_test/nplusone")
+    def nplusone():
+        return ",".join(db.session.get(Product, pid).name for pid in catalog["product_ids"])
+
+    response = client.get("/_test/nplusone")
+    assert response.headers["X-SQL-NPlusOne"] == "1"
+
+
+def test_query_budget_is_enforced(app, client, login, seed_catalog):
+    catalog = seed_catalog()
+    app.config["SQL_QUERY_BUDGETS"] = {"customer.customer_orders": 0}
+    login(catalog["customer_id"])
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/customer/orders")
+
+
+def test_failed_statements_do_not_leave_timers_behind(app):
+    with app.app_context():
+        with db.engine.connect() as conn:
+            with pytest.raises(Exception):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+            assert conn.info.get("sql_profile_start") == []